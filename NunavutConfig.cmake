@@ -346,6 +346,9 @@ set(NUNAVUT_SUBMODULES_DIR ${CMAKE_CURRENT_LIST_DIR}/submodules)
             The :cmake:command:`add_cyphal_library` function uses this method internally so it is not necessary to use
             this method if defining a library using that function.
 
+        The result is recorded in a manifest under ``CMAKE_CURRENT_BINARY_DIR`` and later configure steps reuse it,
+        without parsing any DSDL, until one of the inputs changes (see ``nnvg --list-manifest``).
+
         - **param** ``LANGUAGE`` **str**:
 
             The language to generate code for. Supported types are ``c`` and ``cpp``.
@@ -465,6 +468,15 @@ function(discover_inputs_and_outputs)
         _add_single_value_once(NUNV_LOCAL_DYNAMIC_ARGS "--list-format" "json")
     endif()
 
+    # Reuse the listing from the previous configure step unless an input has changed since.
+    string(SHA256 NUNV_LOCAL_LIST_MANIFEST_KEY
+        "${NUNV_ARG_WORKING_DIRECTORY};${NUNV_LOCAL_DYNAMIC_ARGS};${NUNV_LOCAL_LOOKUP_DIRS};${NUNV_ARG_DSDL_FILES}"
+    )
+    string(SUBSTRING ${NUNV_LOCAL_LIST_MANIFEST_KEY} 0 16 NUNV_LOCAL_LIST_MANIFEST_KEY)
+    list(APPEND NUNV_LOCAL_DYNAMIC_ARGS
+        "--list-manifest" "${CMAKE_CURRENT_BINARY_DIR}/nunavut_list_manifest_${NUNV_LOCAL_LIST_MANIFEST_KEY}.json"
+    )
+
     # List all inputs to use as the dependencies for the custom command.
     execute_process(
         COMMAND
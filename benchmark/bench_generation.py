@@ -0,0 +1,289 @@
+#
+# Copyright (C) OpenCyphal Development Team  <opencyphal.org>
+# Copyright Amazon.com Inc. or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+"""
+Measures how quickly nnvg parses DSDL, renders templates, and writes files for each target language, ``--jobs``
+level, and render mode, over synthetic DSDL trees (see :mod:`synthetic_dsdl`) and the public regulated data types.
+
+.. code-block:: bash
+
+    # Record results.
+    python benchmark/bench_generation.py --output build/benchmark/baseline.json
+
+    # Later, compare against them. Exits with status 1 if any configuration got slower than the tolerance allows.
+    python benchmark/bench_generation.py --output build/benchmark/current.json \\
+        --compare build/benchmark/baseline.json --tolerance 0.15
+
+Each configuration is run ``--repeat`` times, each time by a new nnvg process writing into an empty output
+directory, and the run with the median wall time is reported. Phase times come from ``nnvg --profile-report``.
+
+``--jobs`` sizes the pool that reads DSDL and, with a render mode other than ``serial``, the pool that renders
+templates: ``processes`` passes ``--render-processes`` and ``threads`` passes ``--render-threads``. In the ``serial``
+mode templates are rendered in the nnvg process whatever the ``--jobs`` level. Phase times of work done by a pool are
+added up over its workers so the throughput of a phase is per second of work rather than per second of wall time.
+"""
+
+import argparse
+import functools
+import itertools
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from synthetic_dsdl import SHAPES, SyntheticTreeSpec, generate_tree
+
+RESULTS_FORMAT_VERSION = 2
+"""
+Version of the results file format. Results with a different version cannot be compared.
+"""
+
+PUBLIC_REGULATED_DATA_TYPES_DIR = (
+    Path(__file__).resolve().parent.parent / "submodules" / "public_regulated_data_types" / "uavcan"
+)
+
+RENDER_MODES = {"serial": [], "processes": ["--render-processes"], "threads": ["--render-threads"]}
+"""
+The nnvg arguments for each render mode.
+"""
+
+_PHASES = ("parse", "namespace", "environment", "template_compile", "render", "line_post_processing", "write")
+
+
+@functools.lru_cache(maxsize=None)
+def _stable_languages() -> Sequence[str]:
+    from nunavut.lang import LanguageContextBuilder  # pylint: disable=import-outside-toplevel
+
+    return list(LanguageContextBuilder().create().get_supported_languages().keys())
+
+
+def run_nnvg(
+    root_namespace_dir: Path, language: str, jobs: int, work_dir: Path, render_mode: str = "serial"
+) -> Dict[str, Any]:
+    """
+    Generate code for a root namespace with a new nnvg process.
+
+    :param Path root_namespace_dir: The root namespace to generate code for.
+    :param str language: The target language.
+    :param int jobs: The value of ``--jobs``.
+    :param Path work_dir: A directory to write generated code and the profile report in. It is emptied first.
+    :param str render_mode: One of :data:`RENDER_MODES`.
+    :return: The wall time of the process, in seconds, and the profile report written by nnvg.
+    """
+    shutil.rmtree(work_dir, ignore_errors=True)
+    work_dir.mkdir(parents=True)
+    report_path = work_dir / "profile.json"
+    nnvg_args = [sys.executable, "-m", "nunavut", "-l", language, "-j", str(jobs)] + RENDER_MODES[render_mode]
+    if language not in _stable_languages():
+        nnvg_args.append("--experimental-languages")
+    nnvg_args.extend(["-O", str(work_dir / "out"), "--profile-report", str(report_path), str(root_namespace_dir)])
+    start = time.perf_counter()
+    subprocess.run(nnvg_args, check=True, stdout=subprocess.DEVNULL)
+    wall_seconds = time.perf_counter() - start
+    report: Dict[str, Any] = json.loads(report_path.read_text(encoding="utf-8"))
+    report["wall_seconds"] = wall_seconds
+    return report
+
+
+def _throughput(count: int, seconds: float) -> Optional[float]:
+    return count / seconds if seconds > 0 else None
+
+
+def benchmark_configuration(
+    tree_name: str,
+    root_namespace_dir: Path,
+    language: str,
+    jobs: int,
+    repeat: int,
+    work_dir: Path,
+    render_mode: str = "serial",
+) -> Dict[str, Any]:
+    """
+    Benchmark generating code for a tree in one language at one ``--jobs`` level and render mode.
+
+    :return: The result of the run with the median wall time.
+    """
+    types = sum(1 for _ in root_namespace_dir.rglob("*.dsdl"))
+    runs = sorted(
+        (run_nnvg(root_namespace_dir, language, jobs, work_dir, render_mode) for _ in range(repeat)),
+        key=lambda run: float(run["wall_seconds"]),
+    )
+    median_run = runs[(len(runs) - 1) // 2]
+    phases = {phase: median_run["phases"].get(phase, {}) for phase in _PHASES}
+    phase_seconds = {phase: float(times.get("wall_seconds", 0.0)) for phase, times in phases.items()}
+    files_written = int(median_run["counters"].get("files_written", 0))
+    return {
+        "tree": tree_name,
+        "language": language,
+        "jobs": jobs,
+        "render_mode": render_mode,
+        "types": types,
+        "files_written": files_written,
+        "wall_seconds": median_run["wall_seconds"],
+        "wall_seconds_runs": [run["wall_seconds"] for run in runs],
+        "wall_seconds_stdev": statistics.stdev(r["wall_seconds"] for r in runs) if len(runs) > 1 else 0.0,
+        "phase_seconds": phase_seconds,
+        "throughput": {
+            "parse_types_per_second": _throughput(types, phase_seconds["parse"]),
+            "render_items_per_second": _throughput(int(phases["render"].get("calls", 0)), phase_seconds["render"]),
+            "write_files_per_second": _throughput(files_written, phase_seconds["write"]),
+            "types_per_second": _throughput(types, median_run["wall_seconds"]),
+        },
+    }
+
+
+def _configuration_key(result: Dict[str, Any]) -> Tuple[str, str, int, str]:
+    return (result["tree"], result["language"], result["jobs"], result["render_mode"])
+
+
+def compare_results(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[Tuple[str, float, float, float]]:
+    """
+    Find configurations that got slower.
+
+    .. code-block:: python
+
+        def _results(wall_seconds):
+            result = {"tree": "t", "language": "c", "jobs": 0, "render_mode": "serial", "wall_seconds": wall_seconds}
+            return {"format": 2, "results": [result]}
+
+        assert compare_results(_results(1.1), _results(1.0), 0.15) == []
+        assert compare_results(_results(1.2), _results(1.0), 0.15)[0][0] == "t c -j 0 serial"
+
+    :param current: The results to check.
+    :param baseline: The results to compare against.
+    :param float tolerance: The fraction by which a configuration's wall time may grow before it is a regression.
+    :return: The configurations, found in both results, that regressed with their baseline and current wall times and
+        the ratio between them.
+    :raises ValueError: If the results were written by incompatible versions of this benchmark.
+    """
+    if current.get("format") != RESULTS_FORMAT_VERSION or baseline.get("format") != RESULTS_FORMAT_VERSION:
+        raise ValueError(f"Only results in format {RESULTS_FORMAT_VERSION} can be compared.")
+    baseline_results = {_configuration_key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        baseline_result = baseline_results.get(_configuration_key(result))
+        if baseline_result is None:
+            continue
+        ratio = result["wall_seconds"] / baseline_result["wall_seconds"]
+        if ratio > 1.0 + tolerance:
+            regressions.append(
+                (
+                    f"{result['tree']} {result['language']} -j {result['jobs']} {result['render_mode']}",
+                    baseline_result["wall_seconds"],
+                    result["wall_seconds"],
+                    ratio,
+                )
+            )
+    return regressions
+
+
+def _format_result(result: Dict[str, Any]) -> str:
+    throughput = result["throughput"]
+
+    def _rate(name: str) -> str:
+        return "-" if throughput[name] is None else f"{throughput[name]:.0f}"
+
+    return (
+        f"{result['tree']:<40} {result['language']:<5} {result['jobs']:>4} {result['render_mode']:<9} "
+        f"{result['wall_seconds']:>8.2f}s "
+        f"{_rate('types_per_second'):>8} {_rate('parse_types_per_second'):>8} "
+        f"{_rate('render_items_per_second'):>8} {_rate('write_files_per_second'):>8}"
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Entry point for ``python benchmark/bench_generation.py``.
+    """
+    defaults = SyntheticTreeSpec()
+    parser = argparse.ArgumentParser(description="Benchmark Nunavut's code generation throughput.")
+    parser.add_argument("--languages", nargs="+", default=["c", "cpp", "py"], help="Target languages to benchmark.")
+    parser.add_argument("--jobs", nargs="+", type=int, default=[0, 1, 4], help="--jobs levels to benchmark.")
+    parser.add_argument(
+        "--render-modes",
+        nargs="+",
+        choices=list(RENDER_MODES),
+        default=list(RENDER_MODES),
+        help="Where templates are rendered: in the nnvg process, in --jobs processes, or in --jobs threads.",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each configuration.")
+    parser.add_argument("--shapes", nargs="*", choices=SHAPES, default=list(SHAPES), help="Synthetic tree shapes.")
+    parser.add_argument("--types", type=int, default=defaults.types, help="Types in each synthetic tree.")
+    parser.add_argument("--depth", type=int, default=defaults.depth, help="Namespace depth of synthetic trees.")
+    parser.add_argument("--fan-in", type=int, default=defaults.fan_in, help="Types used by each synthetic type.")
+    parser.add_argument(
+        "--public-regulated-data-types",
+        type=Path,
+        default=PUBLIC_REGULATED_DATA_TYPES_DIR,
+        help="Root namespace of the public regulated data types. Skipped if it does not exist.",
+    )
+    parser.add_argument("--work-dir", type=Path, help="Directory for DSDL trees and generated code.")
+    parser.add_argument("--output", type=Path, help="File to write the results to as JSON.")
+    parser.add_argument("--compare", type=Path, help="Results to compare against.")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.1, help="Fraction by which wall time may grow before it is a regression."
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="nunavut-benchmark-") as temp_dir:
+        work_dir = args.work_dir if args.work_dir is not None else Path(temp_dir)
+        trees: List[Tuple[str, Path]] = []
+        for shape in args.shapes:
+            spec = SyntheticTreeSpec(types=args.types, depth=args.depth, fan_in=args.fan_in, shape=shape)
+            shutil.rmtree(work_dir / "dsdl" / spec.name, ignore_errors=True)
+            trees.append((spec.name, generate_tree(spec, work_dir / "dsdl" / spec.name)))
+        if args.public_regulated_data_types.is_dir():
+            trees.append(("public_regulated_data_types", args.public_regulated_data_types))
+        else:
+            print(f"Skipping the public regulated data types: {args.public_regulated_data_types} does not exist.")
+
+        print(
+            f"{'tree':<40} {'lang':<5} {'jobs':>4} {'render':<9} {'wall':>9} {'types/s':>8} {'parse/s':>8} "
+            f"{'render/s':>8} {'write/s':>8}"
+        )
+        results = []
+        for tree_name, root_namespace_dir in trees:
+            for language in args.languages:
+                for jobs, render_mode in itertools.product(args.jobs, args.render_modes):
+                    result = benchmark_configuration(
+                        tree_name, root_namespace_dir, language, jobs, args.repeat, work_dir / "run", render_mode
+                    )
+                    print(_format_result(result), flush=True)
+                    results.append(result)
+
+    from nunavut import __version__  # pylint: disable=import-outside-toplevel
+
+    report = {
+        "format": RESULTS_FORMAT_VERSION,
+        "nunavut_version": __version__,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        "results": results,
+    }
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if args.compare is not None:
+        regressions = compare_results(report, json.loads(args.compare.read_text(encoding="utf-8")), args.tolerance)
+        for name, baseline_seconds, current_seconds, ratio in regressions:
+            print(f"REGRESSION {name}: {baseline_seconds:.2f}s -> {current_seconds:.2f}s ({ratio:.2f}x)")
+        if len(regressions) > 0:
+            return 1
+        print(f"No regressions against {args.compare}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#
+# Copyright (C) OpenCyphal Development Team  <opencyphal.org>
+# Copyright Amazon.com Inc. or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+"""
+Microbenchmarks of code paths that run once per type or once per generated line, timed in this process rather than
+through nnvg (see :mod:`bench_generation` for that).
+
+.. code-block:: bash
+
+    python benchmark/bench_micro.py --output build/benchmark/micro.json
+
+* ``output_path_lookup`` - :meth:`nunavut.Namespace.find_output_path_for_type` for the type added last to trees of
+  increasing numbers of namespaces. The time per lookup should not grow with the tree.
+* ``line_post_processing`` - the default C and Python line post-processors applied to rendered text by the generator's
+  line buffer, and, for comparison, one line at a time.
+
+These timings depend on the machine and its load so they are reported rather than checked.
+"""
+
+import argparse
+import functools
+import io
+import json
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from unittest.mock import MagicMock
+
+import pydsdl
+
+from nunavut import Namespace
+from nunavut._postprocessors import LimitEmptyLines, LinePostProcessor, TrimTrailingWhitespace
+from nunavut.jinja import CodeGenerator
+from nunavut.lang import LanguageContextBuilder
+
+
+def _make_type(output_dir: Path, namespace_components: List[str], short_name: str) -> Any:
+    dsdl_type = MagicMock(spec=pydsdl.CompositeType)
+    dsdl_type.full_namespace = ".".join(namespace_components)
+    dsdl_type.namespace_components = namespace_components
+    dsdl_type.short_name = short_name
+    dsdl_type.full_name = f"{dsdl_type.full_namespace}.{short_name}"
+    dsdl_type.version = MagicMock(spec=pydsdl.Version)
+    dsdl_type.version.major = 1
+    dsdl_type.version.minor = 0
+    dsdl_type.source_file_path_to_root = output_dir / namespace_components[0]
+    dsdl_type.source_file_path = output_dir / Path(*namespace_components) / f"{short_name}.1.0.dsdl"
+    return dsdl_type
+
+
+def bench_output_path_lookup(namespace_counts: Iterable[int], lookups: int) -> List[Dict[str, Any]]:
+    """
+    Time output path lookups in trees with one type in each of a number of namespaces.
+
+    :param namespace_counts: The numbers of namespaces to time lookups for.
+    :param int lookups: Lookups in each timed batch.
+    :return: The seconds per lookup, from the fastest of several batches, for each number of namespaces.
+    """
+    lctx = LanguageContextBuilder().set_target_language("c").create()
+    output_dir = Path("out")
+    results = []
+    for namespace_count in namespace_counts:
+        index = Namespace.Identity(output_dir, lctx)
+        types = [_make_type(output_dir, ["animalia", f"genus{i}"], "Species") for i in range(namespace_count)]
+        Namespace.add_types(index, [(t, []) for t in types])
+        lookup = functools.partial(index.find_output_path_for_type, types[-1])
+        seconds = min(timeit.repeat(lookup, number=lookups, repeat=5))
+        results.append({"namespaces": namespace_count, "seconds_per_lookup": seconds / lookups})
+    return results
+
+
+def _rendered_parts(line_count: int, seed: int = 0) -> List[str]:
+    """
+    Lines with trailing whitespace, runs of empty lines, and mixed line endings split into parts of the sizes a
+    template yields.
+    """
+    rng = random.Random(seed)
+    text = "".join(
+        rng.choice(["", "", "", "    ", "\t", "int a;", "  x = 1;  ", "    return y;"]) + rng.choice(["\n", "\r\n"])
+        for _ in range(line_count)
+    )
+    parts = []
+    pos = 0
+    while pos < len(text):
+        size = rng.choice([1, 2, 5, 16, 200])
+        parts.append(text[pos : pos + size])
+        pos += size
+    return parts
+
+
+def _one_line_at_a_time(output_file: io.StringIO, parts: Iterable[str], line_pps: List[LinePostProcessor]) -> None:
+    for line, line_end in re.findall(r"([^\r\n]*)(\r\n|\n)", "".join(parts)):
+        line_and_lineend = (line, line_end)
+        for line_pp in line_pps:
+            line_and_lineend = line_pp(line_and_lineend)
+        output_file.write(line_and_lineend[0])
+        output_file.write(line_and_lineend[1])
+
+
+def bench_line_post_processing(line_count: int) -> Dict[str, Any]:
+    """
+    Time the default line post-processors over rendered text.
+
+    :param int line_count: The number of lines of rendered text.
+    :return: The lines per second through the generator's line buffer and through one call per line.
+    """
+    parts = _rendered_parts(line_count)
+    line_buffer = CodeGenerator._generate_with_line_buffer  # pylint: disable=protected-access
+
+    def _time(implementation: Any) -> float:
+        def _run() -> None:
+            implementation(io.StringIO(), iter(parts), [TrimTrailingWhitespace(), LimitEmptyLines(1)])
+
+        return min(timeit.repeat(_run, number=1, repeat=3))
+
+    return {
+        "lines": line_count,
+        "line_buffer_lines_per_second": line_count / _time(line_buffer),
+        "one_line_at_a_time_lines_per_second": line_count / _time(_one_line_at_a_time),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Entry point for ``python benchmark/bench_micro.py``.
+    """
+    parser = argparse.ArgumentParser(description="Microbenchmarks of Nunavut's per-type and per-line code paths.")
+    parser.add_argument(
+        "--namespaces", nargs="+", type=int, default=[4, 100, 1000], help="Tree sizes to time lookups in."
+    )
+    parser.add_argument("--lookups", type=int, default=1000, help="Lookups in each timed batch.")
+    parser.add_argument("--lines", type=int, default=20000, help="Lines of rendered text to post-process.")
+    parser.add_argument("--output", type=Path, help="File to write the results to as JSON.")
+    args = parser.parse_args(argv)
+
+    lookup_results = bench_output_path_lookup(args.namespaces, args.lookups)
+    for result in lookup_results:
+        print(f"output_path_lookup {result['namespaces']:>6} namespaces {result['seconds_per_lookup'] * 1e9:>10.0f}ns")
+    line_results = bench_line_post_processing(args.lines)
+    print(
+        f"line_post_processing {line_results['lines']} lines "
+        f"{line_results['line_buffer_lines_per_second']:.0f} lines/s batched, "
+        f"{line_results['one_line_at_a_time_lines_per_second']:.0f} lines/s one at a time"
+    )
+
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        report = {"output_path_lookup": lookup_results, "line_post_processing": line_results}
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+#
+# Copyright (C) OpenCyphal Development Team  <opencyphal.org>
+# Copyright Amazon.com Inc. or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+"""
+Generates synthetic DSDL namespace trees of a configurable size and shape for benchmarking code generation.
+
+.. code-block:: bash
+
+    python benchmark/synthetic_dsdl.py --types 500 --depth 3 --fan-in 4 --shape union build/synthetic
+
+Trees are deterministic for a given set of parameters so benchmark results from different runs, or different
+versions of Nunavut, can be compared.
+"""
+
+import argparse
+import random
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+SHAPES = ("struct", "array", "union", "mixed")
+"""
+The shapes of tree :func:`generate_tree` can create:
+
+* ``struct`` - structures of primitive fields and composite fields.
+* ``array`` - structures made mostly of fixed and variable-length arrays of primitives and composites.
+* ``union`` - mostly tagged unions.
+* ``mixed`` - a mix of the above.
+"""
+
+_PRIMITIVES = {
+    "bool": 1,
+    "uint8": 8,
+    "uint16": 16,
+    "uint32": 32,
+    "uint64": 64,
+    "int8": 8,
+    "int16": 16,
+    "int32": 32,
+    "int64": 64,
+    "float16": 16,
+    "float32": 32,
+    "float64": 64,
+    "truncated uint5": 5,
+    "saturated int12": 12,
+}
+"""
+Primitive types and their bit lengths.
+"""
+
+_MAX_COMPOSITION_LEVEL = 4
+"""
+Types are only used by other types up to this many levels deep so the size of types stays reasonable.
+"""
+
+
+@dataclass(frozen=True)
+class SyntheticTreeSpec:
+    """
+    The parameters of a synthetic DSDL tree.
+
+    :param str root_namespace: The name of the root namespace.
+    :param int types: The number of data types to generate.
+    :param int depth: The number of levels of nested namespaces below the root namespace that types are spread across.
+    :param int fan_in: The number of other types each type uses as fields, where enough types exist.
+    :param str shape: One of :data:`SHAPES`.
+    :param float service_ratio: The fraction of types that are service types.
+    :param int seed: Seed for the choices made while generating the tree.
+    """
+
+    root_namespace: str = "synthetic"
+    types: int = 200
+    depth: int = 2
+    fan_in: int = 3
+    shape: str = "mixed"
+    service_ratio: float = 0.1
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        """
+        A name identifying these parameters, for example in benchmark results.
+        """
+        return f"{self.root_namespace}-{self.shape}-t{self.types}-d{self.depth}-f{self.fan_in}"
+
+
+@dataclass(frozen=True)
+class _SyntheticType:
+    namespace: str
+    short_name: str
+    level: int
+    max_bits: Optional[int]
+    """
+    The most bits the type takes up as a field of another type or None for service types.
+    """
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.namespace}.{self.short_name}"
+
+
+class _TypeWriter:
+    """
+    Writes the DSDL of each type, choosing fields according to the tree's shape.
+    """
+
+    def __init__(self, spec: SyntheticTreeSpec):
+        self._spec = spec
+        self._random = random.Random(spec.seed)
+
+    def definition(self, index: int, dependencies: List[_SyntheticType]) -> Tuple[str, Optional[int]]:
+        """
+        The DSDL of a type and the most bits it takes up as a field, or None if it is a service type.
+        """
+        if self._random.random() < self._spec.service_ratio:
+            request, _ = self._section(index, dependencies[: len(dependencies) // 2])
+            response, _ = self._section(index + 1, dependencies[len(dependencies) // 2 :])
+            return (request + "---\n" + response, None)
+        return self._section(index, dependencies)
+
+    def _section(self, index: int, dependencies: List[_SyntheticType]) -> Tuple[str, int]:
+        shape = self._spec.shape if self._spec.shape != "mixed" else SHAPES[index % (len(SHAPES) - 1)]
+        fields = []
+        if shape == "union":
+            lines = ["@union"]
+            for field_index in range(2 + len(dependencies) % 2):
+                fields.append(self._primitive_field(f"value_{field_index}", False))
+            for field_index, dependency in enumerate(dependencies):
+                fields.append(self._composite_field(f"field_{field_index}", dependency, False))
+        else:
+            lines = [f"uint8 CONSTANT_{index % 7} = {index % 256}"]
+            for field_index in range(3):
+                fields.append(self._primitive_field(f"value_{field_index}", shape == "array"))
+            for field_index, dependency in enumerate(dependencies):
+                fields.append(self._composite_field(f"field_{field_index}", dependency, shape == "array"))
+            if self._random.random() < 0.2:
+                fields.append(("void3", 3))
+                fields.append(("uint5 padded", 5))
+        lines.extend(field for field, _ in fields)
+
+        # Not the exact size but enough to hold every field, including any tag and padding.
+        max_bits = sum(bits + 8 for _, bits in fields) + 8
+        max_bits += -max_bits % 8
+        if self._random.random() < 0.5:
+            lines.append("@sealed")
+        else:
+            lines.append(f"@extent {max_bits * 2}")
+            max_bits = max_bits * 2 + 32
+        return ("\n".join(lines) + "\n", max_bits)
+
+    def _primitive_field(self, name: str, array_heavy: bool) -> Tuple[str, int]:
+        primitive = self._random.choice(sorted(_PRIMITIVES))
+        if array_heavy or self._random.random() < 0.2:
+            capacity = self._random.choice((2, 4, 16, 64))
+            return (self._array(primitive, capacity, name), 8 + capacity * _PRIMITIVES[primitive])
+        return (f"{primitive} {name}", _PRIMITIVES[primitive])
+
+    def _composite_field(self, name: str, dependency: _SyntheticType, array_heavy: bool) -> Tuple[str, int]:
+        assert dependency.max_bits is not None
+        type_name = f"{dependency.full_name}.1.0"
+        # Only arrays of types that do not use other types so the size of types stays reasonable.
+        if dependency.level == 0 and (array_heavy or self._random.random() < 0.2):
+            capacity = self._random.choice((2, 3, 4))
+            return (self._array(type_name, capacity, name), 8 + capacity * dependency.max_bits)
+        return (f"{type_name} {name}", dependency.max_bits)
+
+    def _array(self, element_type: str, capacity: int, name: str) -> str:
+        return f"{element_type}[{'<=' if self._random.random() < 0.5 else ''}{capacity}] {name}"
+
+
+def generate_tree(spec: SyntheticTreeSpec, output_dir: Path) -> Path:
+    """
+    Write a synthetic DSDL tree.
+
+    :param SyntheticTreeSpec spec: The parameters of the tree.
+    :param Path output_dir: The directory to write the root namespace directory into.
+    :return: The root namespace directory.
+    :raises ValueError: If the parameters are invalid.
+    """
+    if spec.shape not in SHAPES:
+        raise ValueError(f"Unknown shape {spec.shape}. Expected one of {', '.join(SHAPES)}.")
+    if spec.types < 1 or spec.depth < 0 or spec.fan_in < 0:
+        raise ValueError(f"Invalid synthetic tree parameters: {spec}")
+
+    root_dir = output_dir / spec.root_namespace
+    namespaces = [spec.root_namespace]
+    for level in range(spec.depth):
+        namespaces = [f"{parent}.ns{level}_{child}" for parent in namespaces for child in range(2)]
+
+    writer = _TypeWriter(spec)
+    choices = random.Random(spec.seed + 1)
+    types: List[_SyntheticType] = []
+    for index in range(spec.types):
+        namespace = namespaces[index % len(namespaces)]
+        usable = [t for t in types if t.level < _MAX_COMPOSITION_LEVEL and t.max_bits is not None]
+        dependencies = choices.sample(usable, min(spec.fan_in, len(usable)))
+        definition, max_bits = writer.definition(index, dependencies)
+        level = 1 + max(d.level for d in dependencies) if len(dependencies) > 0 else 0
+        synthetic_type = _SyntheticType(namespace, f"Type{index}", level, max_bits)
+        type_dir = output_dir.joinpath(*namespace.split("."))
+        type_dir.mkdir(parents=True, exist_ok=True)
+        (type_dir / f"{synthetic_type.short_name}.1.0.dsdl").write_text(definition, encoding="utf-8")
+        types.append(synthetic_type)
+    return root_dir
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Entry point for ``python benchmark/synthetic_dsdl.py``.
+    """
+    defaults = SyntheticTreeSpec()
+    parser = argparse.ArgumentParser(description="Generate a synthetic DSDL tree for benchmarking.")
+    parser.add_argument("output_dir", type=Path, help="Directory to write the root namespace directory into.")
+    parser.add_argument("--root-namespace", default=defaults.root_namespace, help="Name of the root namespace.")
+    parser.add_argument("--types", type=int, default=defaults.types, help="Number of types to generate.")
+    parser.add_argument("--depth", type=int, default=defaults.depth, help="Levels of nested namespaces.")
+    parser.add_argument("--fan-in", type=int, default=defaults.fan_in, help="Other types used by each type.")
+    parser.add_argument("--shape", choices=SHAPES, default=defaults.shape, help="The kind of types to generate.")
+    parser.add_argument(
+        "--service-ratio", type=float, default=defaults.service_ratio, help="Fraction of types that are services."
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Seed for the random choices made.")
+    args = parser.parse_args(argv)
+    spec = SyntheticTreeSpec(
+        root_namespace=args.root_namespace,
+        types=args.types,
+        depth=args.depth,
+        fan_in=args.fan_in,
+        shape=args.shape,
+        service_ratio=args.service_ratio,
+        seed=args.seed,
+    )
+    print(generate_tree(spec, args.output_dir))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -492,6 +492,7 @@ pytest_collect_file = Sybil(
         "**/.*",
         "**/CONTRIBUTING.rst",
         "**/verification/*",
+        "benchmark/*",
         "**/prof/*",
         "*.j2",
         "*.png",
@@ -5,10 +5,12 @@
 #
 
 import sys
+from pathlib import Path
 from typing import Dict
 import re
 
 import setuptools
+from setuptools.command.build_py import build_py
 
 if int(setuptools.__version__.split(".")[0]) < 30:
     print(
@@ -33,12 +35,34 @@ if not match:
 pydsdl_version_specifier = f"pydsdl {match.group(1)} {match.group(2)}"
 package_data = {"": ["*.j2", "**/*.css", "**/*.js", "*.ini", "*.json", "*.hpp", "*.h"]}
 
+
+class BuildPyWithPrecompiledTemplates(build_py):
+    """
+    Also compiles the built-in templates into the built package (see nunavut.jinja.precompile). This needs nunavut's
+    dependencies to be importable when building. If they are not, the package is built without precompiled templates
+    and compiles them when they are first used instead.
+    """
+
+    def run(self) -> None:
+        super().run()
+        sys.path.insert(0, self.build_lib)
+        try:
+            from nunavut.jinja.precompile import precompile_templates  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            print(f"warning: not precompiling templates ({e})", file=sys.stderr)
+            return
+        finally:
+            sys.path.remove(self.build_lib)
+        precompile_templates(Path(self.build_lib, "nunavut", "jinja", "precompiled"))
+
+
 if sys.version_info < (3, 9):
     # For version 3.8 we need to add importlib_resources as a dependency. This seems to blow away the values
     # in setup.cfg so we need to specify them here.
     setuptools.setup(
         version=version["__version__"],
         package_data=package_data,
+        cmdclass={"build_py": BuildPyWithPrecompiledTemplates},
         install_requires=["importlib_resources", pydsdl_version_specifier],
     )
 else:
@@ -46,5 +70,6 @@ else:
     setuptools.setup(
         version=version["__version__"],
         package_data=package_data,
+        cmdclass={"build_py": BuildPyWithPrecompiledTemplates},
         install_requires=[pydsdl_version_specifier],
     )
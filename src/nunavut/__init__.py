@@ -15,33 +15,90 @@ The input to the nunavut library is a list of templates and a list of
 invoking the ``nunavut.generate_all`` method.
 
 """
+import importlib as _importlib
 import sys as _sys
+import typing as _typing
 
-from ._generators import AbstractGenerator
-from ._generators import generate_all
-from ._generators import generate_all_for_language
-from ._generators import generate_all_from_namespace
-from ._generators import generate_all_from_namespace_with_generators
-from ._generators import basic_language_context_builder_from_args
-from ._namespace import Namespace
-from ._utilities import TEMPLATE_SUFFIX
-from ._utilities import DefaultValue
-from ._utilities import ResourceType
-from ._utilities import ResourceSearchPolicy
-from ._utilities import YesNoDefault
 from ._version import __author__
 from ._version import __copyright__
 from ._version import __email__
 from ._version import __license__
 from ._version import __version__
-from .jinja import CodeGenerator
-from .jinja import DSDLCodeGenerator
-from .jinja import SupportGenerator
-from .lang import Language
-from .lang import LanguageContext
-from .lang import LanguageContextBuilder
-from .lang import UnsupportedLanguageError
-from .lang._config import LanguageConfig
+
+if _typing.TYPE_CHECKING:  # pragma: no cover
+    from ._generators import AbstractGenerator
+    from ._generators import generate_all
+    from ._generators import generate_all_for_language
+    from ._generators import generate_all_from_namespace
+    from ._generators import generate_all_from_namespace_with_generators
+    from ._generators import basic_language_context_builder_from_args
+    from ._namespace import Namespace
+    from ._profiling import GenerationProfile
+    from ._utilities import TEMPLATE_SUFFIX
+    from ._utilities import DefaultValue
+    from ._utilities import ResourceType
+    from ._utilities import ResourceSearchPolicy
+    from ._utilities import YesNoDefault
+    from .jinja import CodeGenerator
+    from .jinja import DSDLCodeGenerator
+    from .jinja import SupportGenerator
+    from .lang import Language
+    from .lang import LanguageContext
+    from .lang import LanguageContextBuilder
+    from .lang import UnsupportedLanguageError
+    from .lang._config import LanguageConfig
+
+_LAZY_ATTRIBUTES = {
+    "AbstractGenerator": "._generators",
+    "generate_all": "._generators",
+    "generate_all_for_language": "._generators",
+    "generate_all_from_namespace": "._generators",
+    "generate_all_from_namespace_with_generators": "._generators",
+    "basic_language_context_builder_from_args": "._generators",
+    "Namespace": "._namespace",
+    "GenerationProfile": "._profiling",
+    "TEMPLATE_SUFFIX": "._utilities",
+    "DefaultValue": "._utilities",
+    "ResourceType": "._utilities",
+    "ResourceSearchPolicy": "._utilities",
+    "YesNoDefault": "._utilities",
+    "CodeGenerator": ".jinja",
+    "DSDLCodeGenerator": ".jinja",
+    "SupportGenerator": ".jinja",
+    "Language": ".lang",
+    "LanguageContext": ".lang",
+    "LanguageContextBuilder": ".lang",
+    "UnsupportedLanguageError": ".lang",
+    "LanguageConfig": ".lang._config",
+}
+"""
+The module each public attribute is defined in. These modules, which load pydsdl, Jinja, and the language support,
+are only imported when one of their attributes is first used so that commands like ``nnvg --version`` start quickly.
+"""
+
+
+def __getattr__(name: str) -> _typing.Any:
+    """
+    Import public attributes on first use (see :pep:`562`).
+
+    .. code-block:: python
+
+        import nunavut
+
+        assert nunavut.YesNoDefault.YES.value == 1
+
+    """
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(_importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> _typing.List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
 
 if _sys.version_info[:2] < (3, 8):  # pragma: no cover
     print("A newer version of Python is required", file=_sys.stderr)
@@ -59,6 +116,7 @@ __all__ = [
     "generate_all_from_namespace",
     "generate_all_from_namespace_with_generators",
     "basic_language_context_builder_from_args",
+    "GenerationProfile",
     "Language",
     "LanguageConfig",
     "LanguageContext",
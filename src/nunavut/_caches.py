@@ -0,0 +1,595 @@
+#
+# Copyright (C) OpenCyphal Development Team  <opencyphal.org>
+# Copyright Amazon.com Inc. or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+"""
+Persistent caches used to avoid repeating work between invocations of Nunavut.
+
+.. warning::
+
+    Parse cache entries are stored using :mod:`pickle`. Only point Nunavut at cache directories that are written to by
+    Nunavut itself and that are not writable by untrusted parties.
+
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle  # nosec
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import pydsdl
+
+from ._manifest import ListingManifest
+from ._namespace import ParseResultKey, ParseResultStore
+from ._profiling import count
+from ._version import __version__
+
+_logger = logging.getLogger(__name__)
+
+
+class PersistentParseResultStore(ParseResultStore):
+    """
+    A :class:`ParseResultStore <nunavut._namespace.ParseResultStore>` that also keeps parse results in a directory on
+    disk so that later invocations can skip the pydsdl frontend for DSDL files that have not changed.
+
+    Each entry is keyed on the resolved path and content hash of a DSDL file combined with the lookup directories,
+    a listing of the files in them, the pydsdl version, and the Nunavut version in use. Adding a file to a lookup
+    directory, such as a new minor version of a type, can change how references resolve so it starts a new set of
+    entries. Entries also record the content hash of every file in the dependency closure of the parsed type and are
+    discarded if any of these files have changed.
+
+    .. invisible-code-block: python
+
+        from nunavut._caches import PersistentParseResultStore
+        from pathlib import Path
+
+        cache_dir = gen_paths_for_module.out_dir / Path("parse_cache")
+
+    .. code-block:: python
+
+        store = PersistentParseResultStore(cache_dir, lookup_directories=["/path/to/uavcan"])
+
+        # The directory is created as needed and starts out empty.
+        assert cache_dir.is_dir()
+        assert store.evict() == 0
+
+    :param Path cache_dir: The directory to store entries under. This is created if it does not exist.
+    :param Iterable lookup_directories: The root namespace and lookup directories used when parsing. These, and the
+        paths of the files in them, are part of each entry's key.
+    :param Iterable context: Additional values that change how files are parsed (e.g. frontend options). These are
+        also part of each entry's key.
+    :param int max_size_bytes: Eviction removes the least recently used entries until the cache is no larger than
+        this. 0 disables the size limit.
+    :param float max_age_seconds: Eviction removes entries that have not been used for longer than this. 0 disables
+        the age limit.
+    """
+
+    ENTRY_SUFFIX = ".pickle"
+    """
+    File suffix used for entries in the cache directory.
+    """
+
+    DEFAULT_MAX_SIZE_BYTES = 256 * 1024 * 1024
+    """
+    Default limit for the total size of all entries.
+    """
+
+    DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 60 * 60.0
+    """
+    Default limit for the time since an entry was last used.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        lookup_directories: Optional[Iterable[Union[str, Path]]] = None,
+        context: Optional[Iterable[Any]] = None,
+        max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+    ):
+        super().__init__()
+        self._cache_dir = Path(cache_dir) / Path("parse")
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._max_size_bytes = max_size_bytes
+        self._max_age_seconds = max_age_seconds
+        resolved_lookup_directories = sorted(str(Path(d).resolve()) for d in (lookup_directories or []))
+        context_hash = hashlib.sha256()
+        for key_part in (
+            pydsdl.__version__,
+            __version__,
+            *resolved_lookup_directories,
+            ListingManifest.listing_digest(resolved_lookup_directories),
+            *(repr(c) for c in (context or [])),
+        ):
+            context_hash.update(key_part.encode("utf-8"))
+            context_hash.update(b"\0")
+        self._context_digest = context_hash.hexdigest()
+        self._disk_hits = 0
+
+    @property
+    def cache_dir(self) -> Path:
+        """
+        The directory entries are stored in.
+        """
+        return self._cache_dir
+
+    @property
+    def disk_hits(self) -> int:
+        """
+        The number of lookups answered by loading an entry from the cache directory.
+        """
+        return self._disk_hits
+
+    # +--[ParseResultStore]-----------------------------------------------------------------------------------------+
+    def get(self, source_file: Path) -> Optional[Tuple[pydsdl.CompositeType, List[pydsdl.CompositeType]]]:
+        result = self._results.get(self.key(source_file))
+        if result is None:
+            result = self._load(source_file)
+            if result is not None:
+                self._results[self.key(source_file)] = result
+        if result is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return result
+
+    def put(
+        self, dsdl_type: pydsdl.CompositeType, input_types: List[pydsdl.CompositeType]
+    ) -> Tuple[pydsdl.CompositeType, List[pydsdl.CompositeType]]:
+        result = super().put(dsdl_type, input_types)
+        try:
+            self._store(dsdl_type, input_types)
+        except OSError as e:
+            _logger.warning("Failed to write parse cache entry for %s: %s", dsdl_type.source_file_path, e)
+        return result
+
+    # +--[PUBLIC]---------------------------------------------------------------------------------------------------+
+    def evict(self) -> int:
+        """
+        Remove entries that are older than the maximum age and then remove the least recently used entries until the
+        cache is within its size limit.
+
+        :return: The number of entries removed.
+        """
+        now = time.time()
+        entries: List[Tuple[float, int, Path]] = []
+        removed = 0
+        for entry in self._cache_dir.glob(f"*/*{self.ENTRY_SUFFIX}"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if 0 < self._max_age_seconds < now - stat.st_mtime:
+                removed += self._remove(entry)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, entry))
+
+        if self._max_size_bytes > 0:
+            total_size = sum(size for _, size, _ in entries)
+            entries.sort()
+            for _, size, entry in entries:
+                if total_size <= self._max_size_bytes:
+                    break
+                removed += self._remove(entry)
+                total_size -= size
+
+        if removed > 0:
+            _logger.info("Evicted %d entries from parse cache %s", removed, self._cache_dir)
+        return removed
+
+    # +--[PRIVATE]--------------------------------------------------------------------------------------------------+
+    def _entry_path(self, source_file: Path) -> Path:
+        resolved_path, content_digest = self.key(source_file)
+        entry_hash = hashlib.sha256()
+        for key_part in (self._context_digest, str(resolved_path), content_digest):
+            entry_hash.update(key_part.encode("utf-8"))
+            entry_hash.update(b"\0")
+        entry_name = entry_hash.hexdigest()
+        return self._cache_dir / Path(entry_name[:2]) / Path(entry_name + self.ENTRY_SUFFIX)
+
+    def _load(self, source_file: Path) -> Optional[Tuple[pydsdl.CompositeType, List[pydsdl.CompositeType]]]:
+        entry_path = self._entry_path(source_file)
+        try:
+            with open(entry_path, "rb") as entry_file:
+                entry: Dict[str, Any] = pickle.load(entry_file)  # nosec
+        except FileNotFoundError:
+            return None
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            _logger.debug("Discarding unreadable parse cache entry %s: %s", entry_path, e)
+            self._remove(entry_path)
+            return None
+
+        for input_path, input_digest in entry["inputs"]:
+            try:
+                if self.key(Path(input_path))[1] != input_digest:
+                    break
+            except FileNotFoundError:
+                break
+        else:
+            # Record the use so eviction keeps the most recently used entries.
+            try:
+                os.utime(entry_path)
+            except OSError:
+                pass
+            self._disk_hits += 1
+            count("parse_cache_disk_hits")
+            return (entry["dsdl_type"], entry["input_types"])
+
+        _logger.debug("Parse cache entry for %s is stale.", source_file)
+        self._remove(entry_path)
+        return None
+
+    def _store(self, dsdl_type: pydsdl.CompositeType, input_types: List[pydsdl.CompositeType]) -> None:
+        entry_path = self._entry_path(dsdl_type.source_file_path)
+        entry = {
+            "dsdl_type": dsdl_type,
+            "input_types": input_types,
+            "inputs": [
+                (str(path), digest)
+                for path, digest in {self.key(t.source_file_path) for t in [dsdl_type, *input_types]}
+            ],
+        }
+        entry_path.parent.mkdir(exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see a partial entry.
+        handle, temp_name = tempfile.mkstemp(dir=entry_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as entry_file:
+                pickle.dump(entry, entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_name, entry_path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _remove(entry_path: Path) -> int:
+        try:
+            entry_path.unlink()
+            return 1
+        except OSError:
+            return 0
+
+
+class ResidentParseResultStore(ParseResultStore):
+    """
+    A :class:`ParseResultStore <nunavut._namespace.ParseResultStore>` that is kept in memory across many generation
+    runs by a long-lived process such as ``nnvg --serve``. Call :meth:`begin_run` before each run to discard results
+    for DSDL files that have changed, or that depend on files that have changed, since the previous run.
+
+    Files are compared by modification time and size and are only hashed again if these differ or if the file was
+    modified within :data:`ListingManifest.MTIME_RESOLUTION_NS` of being hashed.
+
+    .. invisible-code-block: python
+
+        from nunavut._caches import ResidentParseResultStore
+        from pathlib import Path
+        import pydsdl
+
+        dsdl_dir = gen_paths_for_module.out_dir / Path("resident")
+        dsdl_dir.mkdir()
+        dsdl_file = dsdl_dir / Path("Resident.1.0.dsdl")
+        dsdl_file.write_text("@sealed")
+
+        def _parse():
+            return pydsdl.read_files(dsdl_file, dsdl_dir)[0][0]
+
+    .. code-block:: python
+
+        store = ResidentParseResultStore()
+        store.put(_parse(), [])
+
+        # Results survive between runs while their files are unchanged.
+        assert store.begin_run() == 0
+        assert store.get(dsdl_file) is not None
+
+        dsdl_file.write_text("@sealed # changed")
+        assert store.begin_run() == 1
+        assert store.get(dsdl_file) is None
+
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        # The modification time, size, time of hashing, and digest of each file hashed.
+        self._stats: Dict[Path, Tuple[int, int, int, str]] = {}
+        self._input_keys: Dict[ParseResultKey, List[ParseResultKey]] = {}
+
+    # +--[ParseResultStore]-----------------------------------------------------------------------------------------+
+    def key(self, source_file: Path) -> ParseResultKey:
+        try:
+            return self._keys[source_file]
+        except KeyError:
+            pass
+        resolved = source_file.resolve()
+        key = self._keys.get(resolved)
+        if key is None:
+            stat = resolved.stat()
+            recorded = self._stats.get(resolved)
+            if (
+                recorded is not None
+                and recorded[1] == stat.st_size
+                and stat.st_mtime_ns == recorded[0] < recorded[2] - ListingManifest.MTIME_RESOLUTION_NS
+            ):
+                digest = recorded[3]
+            else:
+                hashed_ns = time.time_ns()
+                digest = hashlib.sha256(resolved.read_bytes()).hexdigest()
+                self._stats[resolved] = (stat.st_mtime_ns, stat.st_size, hashed_ns, digest)
+            key = (resolved, digest)
+            self._keys[resolved] = key
+        self._keys[source_file] = key
+        return key
+
+    def put(
+        self, dsdl_type: pydsdl.CompositeType, input_types: List[pydsdl.CompositeType]
+    ) -> Tuple[pydsdl.CompositeType, List[pydsdl.CompositeType]]:
+        result = super().put(dsdl_type, input_types)
+        self._input_keys[self.key(dsdl_type.source_file_path)] = [
+            self.key(input_type.source_file_path) for input_type in input_types
+        ]
+        return result
+
+    # +--[PUBLIC]---------------------------------------------------------------------------------------------------+
+    def begin_run(self) -> int:
+        """
+        Check every file this store has results for and discard results that are stale. Keys computed during the
+        previous run are forgotten so relative paths are resolved against the current working directory again.
+
+        :return: The number of results discarded.
+        """
+        self._keys.clear()
+        current_keys: Dict[ParseResultKey, bool] = {}
+
+        def _is_current(result_key: ParseResultKey) -> bool:
+            if result_key not in current_keys:
+                try:
+                    current_keys[result_key] = self.key(result_key[0]) == result_key
+                except OSError:
+                    current_keys[result_key] = False
+            return current_keys[result_key]
+
+        stale = [
+            result_key
+            for result_key in self._results
+            if not _is_current(result_key) or not all(_is_current(k) for k in self._input_keys.get(result_key, []))
+        ]
+        for result_key in stale:
+            del self._results[result_key]
+            self._input_keys.pop(result_key, None)
+        # Forget files that no result refers to anymore.
+        for unused_path in [path for path in self._stats if path not in self._keys]:
+            del self._stats[unused_path]
+        if len(stale) > 0:
+            _logger.debug("Discarded %d stale parse results.", len(stale))
+        return len(stale)
+
+
+class GenerationGraph:
+    """
+    A record, kept in the output directory, of the inputs each output was last generated from. This lets a later run
+    skip rendering outputs whose inputs have not changed.
+
+    An output is only rendered again if any of these have changed since it was last generated:
+
+    * the DSDL files of its type and of every type it is built from. Namespace and index files, which are rendered
+      from every type, are compared against all DSDL files. Support files do not depend on any DSDL files.
+    * the *context*: the Nunavut version, the language configuration and generator settings given to the graph, and
+      every template file the generators could use. A change to any template renders every output again since
+      templates include and import each other.
+    * the output file itself, compared by modification time and size, so outputs that were edited or deleted are
+      generated again.
+
+    Input files are compared by modification time and size first and, if these differ, by content hash.
+
+    .. invisible-code-block: python
+
+        from nunavut._caches import GenerationGraph
+        from pathlib import Path
+
+        out_dir = gen_paths_for_module.out_dir / Path("graph_out")
+        out_dir.mkdir()
+        template = gen_paths_for_module.out_dir / Path("Graph.j2")
+        template.write_text("{{ T }}")
+        output = out_dir / Path("graph.h")
+
+        def _run(graph: GenerationGraph) -> bool:
+            graph.prepare([], [template])
+            render = graph.create_render_filter()
+            rendered = render(output, template)
+            if rendered:
+                output.write_text("generated")
+            graph.store([output])
+            return rendered
+
+    .. code-block:: python
+
+        # Everything is rendered the first time.
+        assert _run(GenerationGraph(out_dir, context=["c"]))
+
+        # Nothing has changed so the output is skipped.
+        assert not _run(GenerationGraph(out_dir, context=["c"]))
+
+        # Different settings render everything again.
+        assert _run(GenerationGraph(out_dir, context=["cpp"]))
+
+    :param Path outdir: The output directory. The graph is stored in :data:`FILE_NAME` within it.
+    :param Iterable context: Values, such as language options, that change what outputs are generated from the same
+        inputs.
+    """
+
+    FILE_NAME = ".nunavut_generation_graph.json"
+    """
+    Name of the file the graph is stored in within the output directory.
+    """
+
+    FORMAT_VERSION = 1
+    """
+    Version of the graph file format. Graphs with a different version are ignored.
+    """
+
+    def __init__(self, outdir: Union[str, Path], context: Iterable[Any]):
+        self._graph_path = Path(outdir) / Path(self.FILE_NAME)
+        self._context = [__version__, *(repr(c) for c in context)]
+        self._previous = self._load()
+        self._files: Dict[str, List[Any]] = {}
+        self._outputs: Dict[str, Dict[str, Any]] = {}
+        self._context_digest = ""
+        self._namespace_digest = ""
+        self._recorded_ns = time.time_ns()
+
+    @property
+    def graph_path(self) -> Path:
+        """
+        The file the graph is stored in.
+        """
+        return self._graph_path
+
+    def prepare(self, dsdl_types: Iterable[pydsdl.CompositeType], template_files: Iterable[Path]) -> None:
+        """
+        Record the inputs of a generation run. This must be called before any outputs are filtered.
+
+        :param Iterable dsdl_types: Every type outputs are generated for. Namespace and index files depend on all of
+            these.
+        :param Iterable template_files: Every template the generators could render outputs with.
+        """
+        context_hash = hashlib.sha256()
+        for key_part in (*self._context, *(f"{t}:{self._file_digest(Path(t))}" for t in sorted(template_files))):
+            context_hash.update(key_part.encode("utf-8"))
+            context_hash.update(b"\0")
+        self._context_digest = context_hash.hexdigest()
+        self._namespace_digest = self._inputs_digest(dsdl_types)
+        if self._previous.get("context") != self._context_digest:
+            _logger.info("Generating all outputs since the templates or generator settings have changed.")
+
+    def create_render_filter(
+        self, render_filter: Optional[Callable[[Path, Path], bool]] = None, uses_dsdl: bool = True
+    ) -> Callable[[Path, Path], bool]:
+        """
+        Create a render filter for generators that selects the outputs that need to be generated.
+
+        :param render_filter: Another render filter. Outputs are only rendered if both filters select them.
+        :param bool uses_dsdl: If False then the outputs, like support files, do not depend on any DSDL files and are
+            only rendered again if the context changes.
+        :return: A filter suitable for the ``render_filter`` argument of :class:`nunavut.jinja.CodeGenerator`.
+        """
+
+        def _render_filter(output_path: Path, template_path: Path) -> bool:
+            # Generatables are paths that also carry the type they are generated from.
+            definition = getattr(output_path, "definition", None)
+            if not uses_dsdl:
+                inputs_digest = ""
+            elif definition is None:
+                inputs_digest = self._namespace_digest
+            else:
+                inputs_digest = self._inputs_digest([definition, *getattr(output_path, "input_types", [])])
+            output_key = str(Path(output_path))
+            needed = not self._is_current(output_key, inputs_digest)
+            if render_filter is not None and not render_filter(output_path, template_path):
+                if needed:
+                    # The output is out of date but was not generated so it must be considered again next time.
+                    return False
+            elif needed:
+                self._outputs[output_key] = {"inputs": inputs_digest}
+                return True
+            self._outputs[output_key] = self._previous.get("outputs", {}).get(output_key, {"inputs": inputs_digest})
+            return False
+
+        return _render_filter
+
+    def store(self, outputs: Iterable[Path]) -> None:
+        """
+        Write the graph after a successful generation run. Failures to write the graph are logged and otherwise
+        ignored.
+
+        :param Iterable outputs: Every output of the run.
+        """
+        graph: Dict[str, Any] = {
+            "format": self.FORMAT_VERSION,
+            "context": self._context_digest,
+            "recorded_ns": self._recorded_ns,
+            "files": self._files,
+            "outputs": {},
+        }
+        for output_path in outputs:
+            output_key = str(Path(output_path))
+            entry = self._outputs.get(output_key)
+            if entry is None:
+                continue
+            try:
+                stat = os.stat(output_key)
+            except OSError:
+                continue
+            graph["outputs"][output_key] = {"inputs": entry["inputs"], "stat": [stat.st_mtime_ns, stat.st_size]}
+        try:
+            self._graph_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so concurrent readers never see a partial graph.
+            handle, temp_name = tempfile.mkstemp(dir=self._graph_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(handle, "w", encoding="utf-8") as graph_file:
+                    json.dump(graph, graph_file)
+                os.replace(temp_name, self._graph_path)
+            except BaseException:
+                Path(temp_name).unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            _logger.warning("Failed to write generation graph %s: %s", self._graph_path, e)
+
+    # +--[PRIVATE]--------------------------------------------------------------------------------------------------+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            graph: Dict[str, Any] = json.loads(self._graph_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            _logger.debug("Ignoring unreadable generation graph %s: %s", self._graph_path, e)
+            return {}
+        if not isinstance(graph, dict) or graph.get("format") != self.FORMAT_VERSION:
+            return {}
+        return graph
+
+    def _is_current(self, output_key: str, inputs_digest: str) -> bool:
+        if self._previous.get("context") != self._context_digest:
+            return False
+        entry = self._previous.get("outputs", {}).get(output_key)
+        if entry is None or entry["inputs"] != inputs_digest:
+            return False
+        try:
+            stat = os.stat(output_key)
+        except OSError:
+            return False
+        return bool([stat.st_mtime_ns, stat.st_size] == entry["stat"])
+
+    def _inputs_digest(self, dsdl_types: Iterable[pydsdl.CompositeType]) -> str:
+        inputs = sorted({str(t.source_file_path.resolve()) for t in dsdl_types})
+        inputs_hash = hashlib.sha256()
+        for input_file in inputs:
+            inputs_hash.update(f"{input_file}:{self._file_digest(Path(input_file))}".encode("utf-8"))
+            inputs_hash.update(b"\0")
+        return inputs_hash.hexdigest()
+
+    def _file_digest(self, file_path: Path) -> str:
+        """
+        The content hash of a file, reusing the hash recorded by the previous run if the file's modification time
+        and size are unchanged.
+        """
+        file_key = str(file_path)
+        recorded = self._files.get(file_key)
+        if recorded is not None:
+            return str(recorded[2])
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return ""
+        recorded = self._previous.get("files", {}).get(file_key)
+        racy_after_ns = self._previous.get("recorded_ns", 0) - ListingManifest.MTIME_RESOLUTION_NS
+        if recorded is not None and recorded[1] == stat.st_size and stat.st_mtime_ns == recorded[0] < racy_after_ns:
+            digest = str(recorded[2])
+        else:
+            digest = hashlib.sha256(file_path.read_bytes()).hexdigest()
+        self._files[file_key] = [stat.st_mtime_ns, stat.st_size, digest]
+        return digest
@@ -10,16 +10,24 @@ pydsdl AST into source code.
 """
 
 import abc
+import contextlib
+import itertools
+import json
+import logging
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Mapping, Optional, Type, Union
 
-from ._namespace import Generatable, Namespace
+from ._caches import GenerationGraph, PersistentParseResultStore
+from ._namespace import Generatable, Namespace, ParseResultStore
+from ._profiling import GenerationProfile, count, measure
 from ._utilities import ResourceType, YesNoDefault
 from .lang import LanguageContext, LanguageContextBuilder
 from .lang._language import Language
 
+_logger = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True)
 class GenerationResult:
@@ -48,6 +56,12 @@ class GenerationResult:
     The set of template files used to generate the `generated_files`.
     """
 
+    skipped_files: List[Path] = field(default_factory=list)
+    """
+    The generated and support files that were left untouched because their contents would not have changed. This is
+    only populated when generating with ``write_if_changed`` enabled.
+    """
+
     def __add__(self, other: Any) -> "GenerationResult":
         """
         If there exists an isomorphism between this object and other, return a union of the two as a new result.
@@ -104,6 +118,7 @@ class GenerationResult:
             self.generated_files + other.generated_files,
             [*{*(self.support_files + other.support_files)}],
             [*{*(self.template_files + other.template_files)}],
+            self.skipped_files + other.skipped_files,
         )
 
 
@@ -144,6 +159,7 @@ class AbstractGenerator(metaclass=abc.ABCMeta):
             self._index_files = [Path(p) for p in index_file]
         else:
             self._index_files = []
+        self._skipped_files: List[Path] = []
 
     @classmethod
     def generate_namespace_types_from_trinary(
@@ -194,6 +210,13 @@ class AbstractGenerator(metaclass=abc.ABCMeta):
         """
         return self._index_files
 
+    @property
+    def skipped_files(self) -> List[Path]:
+        """
+        Files this generator left untouched because their contents would not have changed.
+        """
+        return self._skipped_files
+
     @abc.abstractmethod
     def get_templates(self) -> Iterable[Path]:
         """
@@ -390,8 +413,9 @@ def generate_all(
         If True then no files will be generated/written but all logic will be exercised with commensurate logging and
         errors.
     :param int jobs:
-        The number of parallel jobs to use when generating code. If 1 then no parallelism is used. If 0 then the
-        number of jobs is determined by the number of CPUs available.
+        The number of parallel jobs to use when parsing DSDL and, if the ``render_processes`` or ``render_threads``
+        generator argument is set, when rendering templates. If 1 then no parallelism is used. If 0 then the number of
+        jobs is determined by the number of CPUs available.
 
         .. note:: By default, any multiprocessing jobs used will not have a timeout set. To set a timeout for any jobs
             set the environment variable ``NUNAVUT_JOB_TIMEOUT_SECONDS`` to the desired timeout in fractional seconds.
@@ -443,6 +467,38 @@ def generate_all(
     )
 
 
+def create_parse_store(
+    root_namespace_directories_or_names: Iterable[Union[str, Path]],
+    allow_unregulated_fixed_port_id: bool = False,
+    parse_cache_dir: Optional[Union[str, Path]] = None,
+    parse_cache_max_size: int = 256,
+    parse_cache_max_age: float = 30,
+) -> ParseResultStore:
+    """
+    Create the store of parse results :func:`generate_all_for_language` uses for a given set of arguments.
+
+    :param root_namespace_directories_or_names: The root namespace directories DSDL is parsed with.
+    :param allow_unregulated_fixed_port_id: The frontend option DSDL is parsed with.
+    :param parse_cache_dir: A directory to persist parsed DSDL types in between invocations. If None then the
+        ``NUNAVUT_PARSE_CACHE_DIR`` environment variable is used, if set. If neither is provided then results are only
+        kept in memory.
+    :param parse_cache_max_size: The maximum size of the parse cache in MiB. 0 disables the limit.
+    :param parse_cache_max_age: The maximum number of days since a parse cache entry was last used. 0 disables the limit.
+    :return: A new store.
+    """
+    if parse_cache_dir is None:
+        parse_cache_dir = os.environ.get("NUNAVUT_PARSE_CACHE_DIR", None) or None
+    if parse_cache_dir is None:
+        return ParseResultStore()
+    return PersistentParseResultStore(
+        parse_cache_dir,
+        lookup_directories=root_namespace_directories_or_names,
+        context=[allow_unregulated_fixed_port_id],
+        max_size_bytes=parse_cache_max_size * 1024 * 1024,
+        max_age_seconds=parse_cache_max_age * 24 * 60 * 60,
+    )
+
+
 def generate_all_for_language(
     language_context: LanguageContext,
     target_files: Iterable[Union[str, Path]],
@@ -457,6 +513,11 @@ def generate_all_for_language(
     omit_dependencies: bool = False,
     code_generator_type: Optional[Type[AbstractGenerator]] = None,
     support_generator_type: Optional[Type[AbstractGenerator]] = None,
+    parse_cache_dir: Optional[Union[str, Path]] = None,
+    parse_cache_max_size: int = 256,
+    parse_cache_max_age: float = 30,
+    parse_store: Optional[ParseResultStore] = None,
+    profile: Optional[GenerationProfile] = None,
     **generator_args: Any,
 ) -> GenerationResult:
     """
@@ -477,8 +538,9 @@ def generate_all_for_language(
     :param dry_run: If True then no files will be generated/written but all logic will be exercised with commensurate
         logging and errors.
     :param int jobs:
-        The number of parallel jobs to use when generating code. If 1 then no parallelism is used. If 0 then the
-        number of jobs is determined by the number of CPUs available.
+        The number of parallel jobs to use when parsing DSDL and, if the ``render_processes`` or ``render_threads``
+        generator argument is set, when rendering templates. If 1 then no parallelism is used. If 0 then the number of
+        jobs is determined by the number of CPUs available.
 
         .. note:: By default, any multiprocessing jobs used will not have a timeout set. To set a timeout for any jobs
             set the environment variable ``NUNAVUT_JOB_TIMEOUT_SECONDS`` to the desired timeout in fractional seconds.
@@ -494,12 +556,83 @@ def generate_all_for_language(
     :param code_generator_type: The type of code generator to use. If None then the default code generator is used.
     :param support_generator_type: The type of support generator to use. If None then the default support generator is
         used.
+    :param parse_cache_dir: A directory to persist parsed DSDL types in between invocations. If None then the
+        ``NUNAVUT_PARSE_CACHE_DIR`` environment variable is used, if set. If neither is provided then no persistent cache
+        is used. See :class:`nunavut._caches.PersistentParseResultStore` for details.
+    :param parse_cache_max_size: The maximum size of the parse cache in MiB. 0 disables the limit.
+    :param parse_cache_max_age: The maximum number of days since a parse cache entry was last used. 0 disables the limit.
+    :param parse_store: A store of parse results to use instead of creating one from the ``parse_cache_`` arguments.
+        Passing the same store to several calls that use the same root namespace directories and
+        ``allow_unregulated_fixed_port_id`` setting avoids parsing any DSDL file more than once. See
+        :func:`create_parse_store`.
+    :param profile: If given, the time spent in each phase of generation and counters of cache hits and misses are
+        recorded in this profile. See :class:`nunavut._profiling.GenerationProfile`.
     :param generator_args: Additional arguments to pass into the generator constructors. See the documentation for
         specific generator types for details on supported arguments.
     :return: A dataclass containing explicit inputs, discovered inputs, and determined outputs.
     :raises pydsdl.FrontendError: Exceptions thrown from the pydsdl frontend. For example, parsing malformed DSDL will
         raise this exception.
     """
+    with profile.activate() if profile is not None else contextlib.nullcontext():
+        return _generate_all_for_language(
+            language_context,
+            target_files,
+            root_namespace_directories_or_names,
+            outdir,
+            resource_types,
+            embed_auditing_info,
+            dry_run,
+            jobs,
+            no_overwrite,
+            allow_unregulated_fixed_port_id,
+            omit_dependencies,
+            code_generator_type,
+            support_generator_type,
+            parse_cache_dir,
+            parse_cache_max_size,
+            parse_cache_max_age,
+            parse_store,
+            **generator_args,
+        )
+
+
+def _generate_all_for_language(
+    language_context: LanguageContext,
+    target_files: Iterable[Union[str, Path]],
+    root_namespace_directories_or_names: Iterable[Union[str, Path]],
+    outdir: Path,
+    resource_types: int,
+    embed_auditing_info: bool,
+    dry_run: bool,
+    jobs: int,
+    no_overwrite: bool,
+    allow_unregulated_fixed_port_id: bool,
+    omit_dependencies: bool,
+    code_generator_type: Optional[Type[AbstractGenerator]],
+    support_generator_type: Optional[Type[AbstractGenerator]],
+    parse_cache_dir: Optional[Union[str, Path]],
+    parse_cache_max_size: int,
+    parse_cache_max_age: float,
+    parse_store: Optional[ParseResultStore],
+    **generator_args: Any,
+) -> GenerationResult:
+    """
+    :func:`generate_all_for_language` once any profile is active.
+    """
+    if parse_store is None:
+        if isinstance(root_namespace_directories_or_names, (str, Path)):
+            root_namespace_directories_or_names = [root_namespace_directories_or_names]
+        else:
+            root_namespace_directories_or_names = list(root_namespace_directories_or_names)
+        parse_store = create_parse_store(
+            root_namespace_directories_or_names,
+            allow_unregulated_fixed_port_id,
+            parse_cache_dir,
+            parse_cache_max_size,
+            parse_cache_max_age,
+        )
+
+    parse_store_counts = (parse_store.hits, parse_store.misses)
     index = Namespace.read_files(
         outdir,
         language_context,
@@ -509,8 +642,15 @@ def generate_all_for_language(
         float(os.environ.get("NUNAVUT_JOB_TIMEOUT_SECONDS", 0)),
         allow_unregulated_fixed_port_id=allow_unregulated_fixed_port_id,
         omit_dependencies=omit_dependencies,
+        parse_store=parse_store,
     )
 
+    count("parse_store_hits", parse_store.hits - parse_store_counts[0])
+    count("parse_store_misses", parse_store.misses - parse_store_counts[1])
+
+    if isinstance(parse_store, PersistentParseResultStore):
+        parse_store.evict()
+
     return generate_all_from_namespace(
         index,
         resource_types,
@@ -519,6 +659,7 @@ def generate_all_for_language(
         no_overwrite,
         code_generator_type,
         support_generator_type,
+        jobs,
         **generator_args,
     )
 
@@ -531,6 +672,8 @@ def generate_all_from_namespace(
     no_overwrite: bool = False,
     code_generator_type: Optional[Type[AbstractGenerator]] = None,
     support_generator_type: Optional[Type[AbstractGenerator]] = None,
+    jobs: int = 1,
+    incremental: bool = False,
     **generator_args: Any,
 ) -> GenerationResult:
     """
@@ -549,6 +692,13 @@ def generate_all_from_namespace(
     :param code_generator_type: The type of code generator to use. If None then the default code generator is used.
     :param support_generator_type: The type of support generator to use. If None then the default support generator is
         used.
+    :param jobs: The number of workers the code generator may render types with if the ``render_processes`` or
+        ``render_threads`` generator argument is set. If 1 then no parallelism is used. If 0 then the number of jobs is
+        determined by the number of CPUs available.
+    :param incremental: If True then a record of the inputs of each output is kept in the output directory and outputs
+        whose inputs, templates, and settings have not changed since the last incremental run are not rendered again.
+        See :class:`nunavut._caches.GenerationGraph` for details. Outputs that are not rendered are listed as
+        skipped in the result.
     :param generator_args: Additional arguments to pass into the generator constructors. See the documentation for
         specific generator types for details on supported arguments.
     :return: A dataclass containing explicit inputs, discovered inputs, and determined outputs.
@@ -574,14 +724,81 @@ def generate_all_from_namespace(
 
         support_generator_type = SupportGenerator
 
+    graph: Optional[GenerationGraph] = None
+    if incremental and not dry_run:
+        context = _incremental_generation_context(
+            index.get_language_context(), resource_types, embed_auditing_info, generator_args
+        )
+        if context is None:
+            _logger.info("Generating all outputs since a post-processor does not provide a cache_key.")
+        else:
+            graph = GenerationGraph(index.base_output_path, context)
+    if graph is not None:
+        render_filter = generator_args.get("render_filter")
+        generator_args["render_filter"] = graph.create_render_filter(render_filter)
+        support_generator_args["render_filter"] = graph.create_render_filter(render_filter, uses_dsdl=False)
+
     code_generator = code_generator_type(
-        index, resource_types, embed_auditing_info=embed_auditing_info, **generator_args
+        index, resource_types, embed_auditing_info=embed_auditing_info, jobs=jobs, **generator_args
     )
     support_generator = support_generator_type(
         index, resource_types, embed_auditing_info=embed_auditing_info, **support_generator_args
     )
 
-    return generate_all_from_namespace_with_generators(index, code_generator, support_generator, dry_run, no_overwrite)
+    if graph is None:
+        return generate_all_from_namespace_with_generators(
+            index, code_generator, support_generator, dry_run, no_overwrite
+        )
+
+    graph.prepare(
+        itertools.chain.from_iterable(
+            [dsdl_type, *getattr(output_path, "input_types", [])]
+            for dsdl_type, output_path in index.get_all_datatypes()
+        ),
+        set(code_generator.get_templates()).union(support_generator.get_templates()),
+    )
+    result = generate_all_from_namespace_with_generators(
+        index, code_generator, support_generator, dry_run, no_overwrite
+    )
+    graph.store(itertools.chain(result.generated_files, result.support_files))
+    return result
+
+
+_INCREMENTAL_GENERATION_ARGS = (
+    "builtin_template_path",
+    "generate_namespace_types",
+    "index_file",
+    "lstrip_blocks",
+    "search_policy",
+    "support_templates_dir",
+    "templates_dir",
+    "trim_blocks",
+)
+"""
+Generator arguments that change what is rendered from the same inputs and templates.
+"""
+
+
+def _incremental_generation_context(
+    language_context: LanguageContext, resource_types: int, embed_auditing_info: bool, generator_args: Mapping[str, Any]
+) -> Optional[List[Any]]:
+    """
+    The settings that, if changed, require every output to be generated again when generating incrementally, or None
+    if a post-processor does not give its settings (see :meth:`nunavut._postprocessors.PostProcessor.cache_key`).
+    """
+    context: List[Any] = [
+        language_context.get_target_language().name,
+        json.dumps(language_context.config.sections(), sort_keys=True, default=str),
+        resource_types,
+        embed_auditing_info,
+    ]
+    context.extend((name, generator_args.get(name)) for name in _INCREMENTAL_GENERATION_ARGS)
+    for post_processor in generator_args.get("post_processors") or []:
+        cache_key = post_processor.cache_key()
+        if cache_key is None:
+            return None
+        context.append((type(post_processor).__module__, type(post_processor).__qualname__, cache_key))
+    return context
 
 
 def generate_all_from_namespace_with_generators(
@@ -629,4 +846,5 @@ def generate_all_from_namespace_with_generators(
         generated_files,
         support_files,
         template_files,
+        code_generator.skipped_files + support_generator.skipped_files,
     )
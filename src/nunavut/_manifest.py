@@ -0,0 +1,206 @@
+#
+# Copyright (C) OpenCyphal Development Team  <opencyphal.org>
+# Copyright Amazon.com Inc. or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+"""
+Manifests of the files listed by dry runs. This module only uses the Python standard library so that listing files
+recorded in a manifest does not load pydsdl or any of Nunavut's generation logic.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from ._version import __version__
+
+_logger = logging.getLogger(__name__)
+
+
+class ListingManifest:
+    """
+    A file recording the inputs and outputs found by a dry run so that later runs can list them without parsing any
+    DSDL or building any generators.
+
+    The manifest is only reused if it was recorded with the same key and Nunavut version, none of the recorded input
+    files have changed, and no files have been added to or removed from the watched directories. Files are compared
+    by modification time and size first and, if these differ, by content hash so that touching a file without
+    changing it does not invalidate the manifest. Files modified within :data:`MTIME_RESOLUTION_NS` of the manifest
+    being written are always compared by content hash since a later change may not have altered their modification
+    time.
+
+    .. invisible-code-block: python
+
+        from nunavut._manifest import ListingManifest
+        from pathlib import Path
+
+        dsdl_dir = gen_paths_for_module.out_dir / Path("manifest_dsdl")
+        dsdl_dir.mkdir()
+        dsdl_file = dsdl_dir / Path("Type.1.0.dsdl")
+        dsdl_file.write_text("@sealed")
+        manifest_path = gen_paths_for_module.out_dir / Path("manifest.json")
+
+    .. code-block:: python
+
+        manifest = ListingManifest(manifest_path, key=["--target-language", "c"])
+        assert manifest.load() is None
+
+        manifest.store([dsdl_file], ["Type_1_0.h"], watched_directories=[dsdl_dir])
+        assert manifest.load() == {"inputs": [str(dsdl_file)], "outputs": ["Type_1_0.h"]}
+
+        # Different arguments need a different listing.
+        assert ListingManifest(manifest_path, key=["--target-language", "cpp"]).load() is None
+
+        # So does a new type in a watched directory.
+        (dsdl_dir / Path("Other.1.0.dsdl")).write_text("@sealed")
+        assert manifest.load() is None
+
+    :param Path manifest_path: The file to read and write the manifest from and to.
+    :param Iterable key: Values, such as command-line arguments, that the listing depends on.
+    """
+
+    FORMAT_VERSION = 1
+    """
+    Version of the manifest file format. Manifests with a different version are ignored.
+    """
+
+    MTIME_RESOLUTION_NS = 2 * 1000 * 1000 * 1000
+    """
+    The coarsest file system timestamp resolution to allow for when comparing modification times.
+    """
+
+    def __init__(self, manifest_path: Union[str, Path], key: Iterable[Any]):
+        self._manifest_path = Path(manifest_path)
+        key_hash = hashlib.sha256()
+        for key_part in (__version__, *(repr(k) for k in key)):
+            key_hash.update(key_part.encode("utf-8"))
+            key_hash.update(b"\0")
+        self._key_digest = key_hash.hexdigest()
+
+    @property
+    def manifest_path(self) -> Path:
+        """
+        The file the manifest is stored in.
+        """
+        return self._manifest_path
+
+    def load(self) -> Optional[Dict[str, List[str]]]:
+        """
+        Read the manifest if it is still valid.
+
+        :return: A dictionary with ``inputs`` and ``outputs`` lists or None if there is no valid manifest.
+        """
+        try:
+            manifest: Dict[str, Any] = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            _logger.debug("Ignoring unreadable listing manifest %s: %s", self._manifest_path, e)
+            return None
+
+        if manifest.get("format") != self.FORMAT_VERSION or manifest.get("key") != self._key_digest:
+            _logger.debug("Listing manifest %s was recorded for different arguments.", self._manifest_path)
+            return None
+
+        if self.listing_digest(manifest["watched_directories"]) != manifest["listing"]:
+            _logger.debug("Listing manifest %s is stale: files were added or removed.", self._manifest_path)
+            return None
+
+        touched = False
+        racy_after_ns = manifest["recorded_ns"] - self.MTIME_RESOLUTION_NS
+        try:
+            for file_path, (mtime_ns, size, digest) in manifest["files"].items():
+                stat = os.stat(file_path)
+                if stat.st_mtime_ns == mtime_ns and stat.st_size == size and mtime_ns < racy_after_ns:
+                    continue
+                if stat.st_size != size or self._digest(Path(file_path)) != digest:
+                    _logger.debug("Listing manifest %s is stale: %s changed.", self._manifest_path, file_path)
+                    return None
+                manifest["files"][file_path] = [stat.st_mtime_ns, size, digest]
+                touched = True
+        except OSError as e:
+            _logger.debug("Listing manifest %s is stale: %s", self._manifest_path, e)
+            return None
+
+        if touched:
+            # Record the new modification times so later runs do not hash these files again.
+            self._write(manifest)
+        return {"inputs": manifest["inputs"], "outputs": manifest["outputs"]}
+
+    def store(
+        self,
+        inputs: Iterable[Union[str, Path]],
+        outputs: Iterable[Union[str, Path]],
+        watched_directories: Iterable[Union[str, Path]] = (),
+    ) -> None:
+        """
+        Record a listing. Failures to write the manifest are logged and otherwise ignored.
+
+        :param Iterable inputs: The input files. These are listed and watched for changes.
+        :param Iterable outputs: The output files. These are listed but not watched.
+        :param Iterable watched_directories: Directories whose contents the listing depends on. These, and all
+            directories below them, are watched for added or removed files.
+        """
+        inputs = [str(i) for i in inputs]
+        watched = sorted({str(d) for d in watched_directories})
+        manifest: Dict[str, Any] = {
+            "format": self.FORMAT_VERSION,
+            "key": self._key_digest,
+            "recorded_ns": time.time_ns(),
+            "inputs": inputs,
+            "outputs": [str(o) for o in outputs],
+            "watched_directories": watched,
+            "listing": self.listing_digest(watched),
+            "files": {},
+        }
+        try:
+            for file_path in inputs:
+                stat = os.stat(file_path)
+                manifest["files"][file_path] = [stat.st_mtime_ns, stat.st_size, self._digest(Path(file_path))]
+        except OSError as e:
+            _logger.warning("Not writing listing manifest %s: %s", self._manifest_path, e)
+            return
+        self._write(manifest)
+
+    @staticmethod
+    def listing_digest(watched_directories: Iterable[Union[str, Path]]) -> str:
+        """
+        A hash of the paths of all files below the given directories. Directories that do not exist contribute
+        nothing.
+
+        :param Iterable watched_directories: The directories to list.
+        :return: The hex digest of the listing.
+        """
+        listing_hash = hashlib.sha256()
+        for watched_directory in watched_directories:
+            for directory, directory_names, file_names in os.walk(watched_directory):
+                directory_names.sort()
+                for name in sorted(file_names):
+                    listing_hash.update(os.path.join(directory, name).encode("utf-8", "surrogateescape"))
+                    listing_hash.update(b"\0")
+        return listing_hash.hexdigest()
+
+    # +--[PRIVATE]--------------------------------------------------------------------------------------------------+
+    @staticmethod
+    def _digest(file_path: Path) -> str:
+        return hashlib.sha256(file_path.read_bytes()).hexdigest()
+
+    def _write(self, manifest: Dict[str, Any]) -> None:
+        try:
+            self._manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so concurrent readers never see a partial manifest.
+            handle, temp_name = tempfile.mkstemp(dir=self._manifest_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(handle, "w", encoding="utf-8") as manifest_file:
+                    json.dump(manifest, manifest_file)
+                os.replace(temp_name, self._manifest_path)
+            except BaseException:
+                Path(temp_name).unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            _logger.warning("Failed to write listing manifest %s: %s", self._manifest_path, e)
@@ -47,19 +47,22 @@ The one Namespace type can play three roles:
 ```
 """
 
-import collections
+import hashlib
 import itertools
 import logging
 import multiprocessing
 import multiprocessing.pool
+import os
+import queue
+import re
 import sys
+import time
 from functools import singledispatchmethod
 from os import PathLike
 from pathlib import Path
 from typing import (
     Any,
     Callable,
-    Deque,
     Generator,
     ItemsView,
     Iterable,
@@ -76,6 +79,7 @@ from typing import (
 
 import pydsdl
 
+from ._profiling import active_profile, measure
 from .lang import Language, LanguageContext
 from .lang._common import IncludeGenerator
 
@@ -108,24 +112,213 @@ class NotAsyncResult:
     synchronously when the get method is called.
     """
 
-    def __init__(self, read_method: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+    def __init__(
+        self,
+        read_method: Callable[..., Any],
+        args: Tuple[Any, ...],
+        callback: Optional[Callable[[Any], None]] = None,
+        error_callback: Optional[Callable[[BaseException], None]] = None,
+    ) -> None:
         self.read_method = read_method
         self.args = args
+        self.callback = callback
+        self.error_callback = error_callback
         self._logger = logging.getLogger(NotAsyncResult.__name__)
 
     def get(self, timeout: Optional[Any] = None) -> Any:
         """
-        Perform the work synchronously.
+        Perform the work synchronously. Any callbacks provided to the constructor are invoked before this method
+        returns or raises.
         """
         if timeout is not None and timeout > 0:
             self._logger.debug(
                 "Timeout value for read_method '%s' ignored when not doing multiple jobs.", self.read_method.__name__
             )
-        return self.read_method(*self.args)
+        try:
+            result = self.read_method(*self.args)
+        except Exception as e:
+            if self.error_callback is not None:
+                self.error_callback(e)
+            raise
+        if self.callback is not None:
+            self.callback(result)
+        return result
 
 
 ApplyMethodT = TypeVar("ApplyMethodT", bound=Callable[..., AsyncResultProtocol])
 
+ParseResultKey = Tuple[Path, str]
+"""
+Key used to store parse results: the resolved path to a DSDL file and the hex digest of its contents.
+"""
+
+
+class ParseResultStore:
+    """
+    Run-scoped store of pydsdl parse results keyed by the resolved path and content hash of each DSDL file.
+
+    :func:`pydsdl.read_files` returns the transitive closure of types a target depends on. Every type in that closure
+    is fully parsed so the store records each of them the first time it is seen. Any later request for one of these
+    files is answered from the store instead of invoking the frontend again. This keeps the number of parses
+    proportional to the number of definitions rather than to the number of definitions multiplied by their fan-in.
+
+    .. invisible-code-block: python
+
+        from nunavut._namespace import ParseResultStore
+        from pathlib import Path
+
+        dsdl_file = gen_paths_for_module.out_dir / Path("Foo.1.0.dsdl")
+        dsdl_file.write_text("@sealed")
+
+    .. code-block:: python
+
+        store = ParseResultStore()
+
+        # Nothing has been parsed yet.
+        assert store.get(dsdl_file) is None
+        assert store.misses == 1
+
+        # Keys combine the resolved path with a digest of the file's contents.
+        resolved_path, digest = store.key(dsdl_file)
+        assert resolved_path == dsdl_file.resolve()
+        assert len(digest) > 0
+
+    """
+
+    def __init__(self) -> None:
+        self._results: dict[ParseResultKey, Tuple[pydsdl.CompositeType, List[pydsdl.CompositeType]]] = {}
+        self._keys: dict[Path, ParseResultKey] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self) -> int:
+        """
+        The number of lookups answered by this store.
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """
+        The number of lookups this store could not answer.
+        """
+        return self._misses
+
+    def key(self, source_file: Path) -> ParseResultKey:
+        """
+        The key for a given DSDL file. Keys are computed once per path for the lifetime of the store.
+
+        :param Path source_file: Path to a DSDL file.
+        :return: The resolved path to the file and a digest of its contents.
+        :raises FileNotFoundError: If the file does not exist.
+        """
+        try:
+            return self._keys[source_file]
+        except KeyError:
+            pass
+        resolved = source_file.resolve()
+        try:
+            key = self._keys[resolved]
+        except KeyError:
+            key = (resolved, hashlib.sha256(resolved.read_bytes()).hexdigest())
+            self._keys[resolved] = key
+        self._keys[source_file] = key
+        return key
+
+    def get(self, source_file: Path) -> Optional[Tuple[pydsdl.CompositeType, List[pydsdl.CompositeType]]]:
+        """
+        Get a stored parse result for a DSDL file.
+
+        :param Path source_file: Path to a DSDL file.
+        :return: The type defined in the file and the types it depends on or None if the file has not been parsed.
+        """
+        result = self._results.get(self.key(source_file))
+        if result is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return result
+
+    def put(
+        self, dsdl_type: pydsdl.CompositeType, input_types: List[pydsdl.CompositeType]
+    ) -> Tuple[pydsdl.CompositeType, List[pydsdl.CompositeType]]:
+        """
+        Store the parse result for a type.
+
+        :param pydsdl.CompositeType dsdl_type: A type parsed by pydsdl.
+        :param List[pydsdl.CompositeType] input_types: The types ``dsdl_type`` depends on.
+        :return: The stored result.
+        """
+        result = (dsdl_type, input_types)
+        self._results[self.key(dsdl_type.source_file_path)] = result
+        return result
+
+    def __contains__(self, source_file: object) -> bool:
+        if not isinstance(source_file, Path):
+            return False
+        return self.key(source_file) in self._results
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+
+def _read_files_measured(*args: Any) -> Tuple[Any, float, float]:
+    """
+    :func:`pydsdl.read_files` also returning the wall and CPU time it took as measured by the process it ran in.
+    """
+    start_wall = time.perf_counter()
+    start_cpu = time.thread_time()
+    result = pydsdl.read_files(*args)
+    return result, time.perf_counter() - start_wall, time.thread_time() - start_cpu
+
+
+_REFERENCED_NAME_PATTERN = re.compile(r"(?<!\w)([A-Za-z_]\w*)\.(\d+)\.(\d+)(?!\d)")
+
+
+def _dependency_closure(
+    dsdl_type: pydsdl.CompositeType,
+    candidates: List[pydsdl.CompositeType],
+    referenced_names: dict[Path, frozenset[Tuple[str, int, int]]],
+) -> List[pydsdl.CompositeType]:
+    """
+    The types ``dsdl_type`` depends on, taken from ``candidates``, which must hold its full dependency closure.
+
+    A definition can only depend on a type it names, either as a field or in a constant expression, and it must name
+    it as ``Name.major.minor`` with or without the namespace. Walking the fields alone misses the types named only in
+    constant expressions so the names are taken from the source text instead. Names in comments or of same-named types
+    in other namespaces may add a few more inputs than reading the type's file would have but never fewer, and the
+    result only depends on the definitions themselves.
+
+    :param pydsdl.CompositeType dsdl_type: The type to find the dependencies of.
+    :param List[pydsdl.CompositeType] candidates: A dependency closure ``dsdl_type`` is part of.
+    :param referenced_names: Cache of the names found in each source file.
+    :return: The transitive closure of the types ``dsdl_type`` depends on, in the order of ``candidates``.
+    """
+    by_name: dict[Tuple[str, int, int], List[pydsdl.CompositeType]] = {}
+    for candidate in candidates:
+        by_name.setdefault((candidate.short_name, candidate.version.major, candidate.version.minor), []).append(
+            candidate
+        )
+
+    found: set[int] = set()
+    pending = [dsdl_type]
+    while pending:
+        source_file = pending.pop().source_file_path
+        names = referenced_names.get(source_file)
+        if names is None:
+            names = frozenset(
+                (name, int(major), int(minor))
+                for name, major, minor in _REFERENCED_NAME_PATTERN.findall(source_file.read_text(encoding="utf-8"))
+            )
+            referenced_names[source_file] = names
+        for name in names:
+            for referenced in by_name.get(name, []):
+                if referenced is not dsdl_type and id(referenced) not in found:
+                    found.add(id(referenced))
+                    pending.append(referenced)
+    return [t for t in candidates if id(t) in found]
+
 
 def _read_files_strategy(
     index: "Namespace",
@@ -134,42 +327,98 @@ def _read_files_strategy(
     job_timeout_seconds: float,
     omit_dependencies: bool,
     args: Iterable[Any],
+    parse_store: ParseResultStore,
+    max_in_flight: int = 1,
 ) -> "Namespace":
     """
     Strategy for reading a set of dsdl files and building a namespace tree. This strategy is compatible with both
-    synchronous and asynchronous invocation of the pydsdl.read_files method.
+    synchronous and asynchronous invocation of the pydsdl.read_files method. Files already held by the
+    ``parse_store`` are not read again.
+
+    Work is scheduled as results complete rather than in waves: up to ``max_in_flight`` reads are outstanding at any
+    time and, as each one finishes, its results are added to the index and the next file that is still unread is
+    submitted. Because results are recorded as soon as they arrive, files discovered as dependencies of earlier reads
+    are not submitted at all.
     """
     if isinstance(dsdl_files, (str, Path)):
         fileset = {Path(dsdl_files)}
     else:
         fileset = {Path(file) for file in dsdl_files}
-    resolve_cache: dict[Path, Path] = {}
-
-    def _resolve_file(file: Path) -> Path:
-        # limit filesystem access by caching resolved files. This assumes the non-canonical path form
-        # is consistent. If not this would not limit filesystem access but would be correct.
-        if file not in resolve_cache:
-            resolve_cache[file] = file.resolve()
-        return resolve_cache[file]
-
-    running_lookups: list[AsyncResultProtocol] = []
-    already_read: set[Path] = set()
-    while fileset:
-        next_file = fileset.pop()
-        running_lookups.append(apply_method(pydsdl.read_files, args=itertools.chain([next_file], args)))
-        already_read.add(_resolve_file(next_file))
-        if not fileset:
-            for lookup in running_lookups:
-                if job_timeout_seconds <= 0:
-                    target_type, dependent_types = lookup.get()
-                else:
-                    target_type, dependent_types = lookup.get(timeout=job_timeout_seconds)
-                Namespace.add_types(index, (target_type[0], dependent_types))
-                if not omit_dependencies:
-                    for dependent_type in dependent_types:
-                        if _resolve_file(dependent_type.source_file_path) not in already_read:
-                            fileset.add(dependent_type.source_file_path)
-            running_lookups.clear()
+
+    def _add_result(target_type: pydsdl.CompositeType, dependent_types: List[pydsdl.CompositeType]) -> None:
+        with measure("namespace"):
+            Namespace.add_types(index, (target_type, dependent_types))
+            if omit_dependencies:
+                return
+            # The dependent types are a transitive closure and have all been parsed so we add each of them directly
+            # rather than reading their files again. The closure of each of them is part of this closure but pydsdl
+            # does not say which part, so it is rebuilt from the types each definition names (see
+            # _dependency_closure).
+            for dependent_type in dependent_types:
+                dependent_key = parse_store.key(dependent_type.source_file_path)
+                if dependent_key not in already_read:
+                    already_read.add(dependent_key)
+                    stored = parse_store.get(dependent_type.source_file_path)
+                    if stored is None:
+                        stored = parse_store.put(
+                            dependent_type, _dependency_closure(dependent_type, dependent_types, referenced_names)
+                        )
+                    Namespace.add_types(index, stored)
+
+    # When profiling, reads are timed where they run since that may be another process.
+    profile = active_profile()
+    read_method = pydsdl.read_files if profile is None else _read_files_measured
+
+    # Completed results, or the exceptions raised by failed reads, are delivered here by the apply_method callbacks.
+    completed: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+    in_flight = 0
+    already_read: set[ParseResultKey] = set()
+    referenced_names: dict[Path, frozenset[Tuple[str, int, int]]] = {}
+    while fileset or in_flight > 0:
+        while fileset and in_flight < max_in_flight:
+            next_file = fileset.pop()
+            try:
+                next_key: Optional[ParseResultKey] = parse_store.key(next_file)
+            except FileNotFoundError:
+                # Paths relative to a root namespace directory are only resolved by pydsdl.
+                next_key = None
+            if next_key is not None:
+                if next_key in already_read:
+                    continue
+                already_read.add(next_key)
+                stored = parse_store.get(next_file)
+                if stored is not None:
+                    _add_result(*stored)
+                    continue
+            lookup = apply_method(
+                read_method,
+                args=tuple(itertools.chain([next_file], args)),
+                callback=completed.put,
+                error_callback=completed.put,
+            )
+            in_flight += 1
+            if apply_method is NotAsyncResult:
+                # Synchronous reads are completed right away so that the files they parse are not read again.
+                lookup.get()
+
+        if in_flight == 0:
+            continue
+
+        try:
+            result = completed.get(timeout=job_timeout_seconds if job_timeout_seconds > 0 else None)
+        except queue.Empty as e:
+            raise multiprocessing.TimeoutError(
+                f"No read_files job completed within {job_timeout_seconds} seconds."
+            ) from e
+        in_flight -= 1
+        if isinstance(result, BaseException):
+            raise result
+        if profile is not None:
+            result, wall, cpu = result
+            profile.record("parse", wall, cpu, item=result[0][0].source_file_path.as_posix())
+        target_type, dependent_types = result
+        already_read.add(parse_store.key(target_type[0].source_file_path))
+        _add_result(*parse_store.put(target_type[0], dependent_types))
 
     return index
 
@@ -550,6 +799,7 @@ class Namespace(pydsdl.Any):  # pylint: disable=too-many-public-methods
         print_output_handler: Optional[Callable[[Path, int, str], None]] = None,
         allow_unregulated_fixed_port_id: bool = False,
         omit_dependencies: bool = False,
+        parse_store: Optional[ParseResultStore] = None,
     ) -> "Namespace":
         """
         For a given set of dsdl_files, read the files and build a namespace tree.
@@ -564,11 +814,17 @@ class Namespace(pydsdl.Any):  # pylint: disable=too-many-public-methods
         :param Path | str | Iterable[Path | str] lookup_directories: See :meth:`pydsdl.read_files`.
         :param Callable[[Path, int, str], None] print_output_handler: A callback to handle print output.
         :param bool allow_unregulated_fixed_port_id: Allow unregulated fixed port ids.
+        :param bool omit_dependencies: If True then dependent types are not added to the namespace tree.
+        :param ParseResultStore parse_store: Parse results to share between calls within the same run. If None then a
+                    new store is used for this call only.
         :return: A new namespace index that contains trees of datatypes.
         """
         if not index.is_index:
             raise ValueError("Namespace passed in as index argument is not an index namespace.")
 
+        if parse_store is None:
+            parse_store = ParseResultStore()
+
         args = (
             root_namespace_directories_or_names,
             lookup_directories,
@@ -577,11 +833,22 @@ class Namespace(pydsdl.Any):  # pylint: disable=too-many-public-methods
         )
         if jobs == 1:
             # Don't use multiprocessing when jobs is 1.
-            return _read_files_strategy(index, NotAsyncResult, dsdl_files, job_timeout_seconds, omit_dependencies, args)
+            return _read_files_strategy(
+                index, NotAsyncResult, dsdl_files, job_timeout_seconds, omit_dependencies, args, parse_store
+            )
         else:
-            with multiprocessing.pool.Pool(processes=None if jobs == 0 else jobs) as pool:
+            processes = (os.cpu_count() or 1) if jobs == 0 else jobs
+            with multiprocessing.pool.Pool(processes=processes) as pool:
+                # Keep a second job queued for each worker so none of them sit idle while results are handed back.
                 return _read_files_strategy(
-                    index, pool.apply_async, dsdl_files, job_timeout_seconds, omit_dependencies, args
+                    index,
+                    pool.apply_async,
+                    dsdl_files,
+                    job_timeout_seconds,
+                    omit_dependencies,
+                    args,
+                    parse_store,
+                    max_in_flight=processes * 2,
                 )
 
     @read_files.register
@@ -598,6 +865,7 @@ class Namespace(pydsdl.Any):  # pylint: disable=too-many-public-methods
         print_output_handler: Optional[Callable[[Path, int, str], None]] = None,
         allow_unregulated_fixed_port_id: bool = False,
         omit_dependencies: bool = False,
+        parse_store: Optional[ParseResultStore] = None,
     ) -> pydsdl.Any:
         """
         For a given set of dsdl_files, read the files and build a namespace tree.
@@ -613,6 +881,8 @@ class Namespace(pydsdl.Any):  # pylint: disable=too-many-public-methods
         :param Path | str | Iterable[Path | str] lookup_directories: See :meth:`pydsdl.read_files`.
         :param Callable[[Path, int, str], None] print_output_handler: A callback to handle print output.
         :param bool allow_unregulated_fixed_port_id: Allow unregulated fixed port ids.
+        :param bool omit_dependencies: If True then dependent types are not added to the namespace tree.
+        :param ParseResultStore parse_store: Parse results to share between calls within the same run.
         :return: A new namespace index that contains trees of datatypes.
         """
         return cls.read_files(
@@ -625,6 +895,7 @@ class Namespace(pydsdl.Any):  # pylint: disable=too-many-public-methods
             print_output_handler,
             allow_unregulated_fixed_port_id,
             omit_dependencies,
+            parse_store,
         )
 
     @read_files.register
@@ -641,6 +912,7 @@ class Namespace(pydsdl.Any):  # pylint: disable=too-many-public-methods
         print_output_handler: Optional[Callable[[Path, int, str], None]] = None,
         allow_unregulated_fixed_port_id: bool = False,
         omit_dependencies: bool = False,
+        parse_store: Optional[ParseResultStore] = None,
     ) -> pydsdl.Any:
         """
         For a given set of dsdl_files, read the files and build a namespace tree.
@@ -656,6 +928,8 @@ class Namespace(pydsdl.Any):  # pylint: disable=too-many-public-methods
         :param Path | str | Iterable[Path | str] lookup_directories: See :meth:`pydsdl.read_files`.
         :param Callable[[Path, int, str], None] print_output_handler: A callback to handle print output.
         :param bool allow_unregulated_fixed_port_id: Allow unregulated fixed port ids.
+        :param bool omit_dependencies: If True then dependent types are not added to the namespace tree.
+        :param ParseResultStore parse_store: Parse results to share between calls within the same run.
         :return: A new namespace index that contains trees of datatypes.
         """
         return cls.read_files(
@@ -668,6 +942,7 @@ class Namespace(pydsdl.Any):  # pylint: disable=too-many-public-methods
             print_output_handler,
             allow_unregulated_fixed_port_id,
             omit_dependencies,
+            parse_store,
         )
 
     DefaultOutputStem = "_"
@@ -722,6 +997,11 @@ class Namespace(pydsdl.Any):  # pylint: disable=too-many-public-methods
         self._data_type_to_outputs: dict[pydsdl.CompositeType, Generatable] = {}
         self._nested_namespaces: dict[str, Namespace] = {}
 
+        # Index of every type in the tree to its output. These are only populated on the index namespace.
+        self._index_namespace: Namespace = self if self._parent is None else self._parent._index_namespace
+        self._type_index: dict[pydsdl.CompositeType, Generatable] = {}
+        self._type_name_index: dict[Tuple[str, int, int], Generatable] = {}
+
         if self._parent is not None and not self.is_index:  # pragma: no cover
             self._parent._nested_namespaces[self._namespace_components[-1]] = self
 
@@ -943,8 +1223,8 @@ class Namespace(pydsdl.Any):  # pylint: disable=too-many-public-methods
 
     def find_output_path_for_type(self, compound_type: Union["Namespace", pydsdl.CompositeType]) -> Path:
         """
-        Searches the entire namespace tree to find a mapping of the type to an
-        output file path.
+        Finds the output file path for a type anywhere in this namespace tree. This is a constant-time lookup in an
+        index maintained by the tree's index namespace as types are added.
 
         :param pydsdl.CompositeType compound_type: A Namespace or pydsdl.CompositeType to find the output pathfor.
         :return: The path where a file will be generated for a given type.
@@ -952,10 +1232,17 @@ class Namespace(pydsdl.Any):  # pylint: disable=too-many-public-methods
         """
         if isinstance(compound_type, Namespace):
             return compound_type.output_path
-        else:
-            # pylint: disable=protected-access
-            root_namespace = self.get_index_namespace().get_root_namespace(compound_type.source_file_path_to_root.name)
-            return root_namespace._bfs_search_for_output_path(compound_type)  # pylint: disable=protected-access
+        index = self._index_namespace
+        try:
+            return index._type_index[compound_type]  # pylint: disable=protected-access
+        except KeyError:
+            pass
+        # Equivalent types may be distinct objects (e.g. when parsed by different pydsdl invocations) so also try
+        # the type's name and version.
+        try:
+            return index._type_name_index[self._type_name_key(compound_type)]  # pylint: disable=protected-access
+        except KeyError:
+            raise KeyError(compound_type) from None
 
     def add_data_type(
         self, dsdl_type: pydsdl.CompositeType, input_types: List[pydsdl.CompositeType], extension: Optional[str]
@@ -985,6 +1272,9 @@ class Namespace(pydsdl.Any):  # pylint: disable=too-many-public-methods
         output_file = Path(self._base_output_path) / IncludeGenerator.make_path(dsdl_type, language, extension)
         output_generatable = Generatable(dsdl_type, input_types, output_file)
         self._data_type_to_outputs[dsdl_type] = output_generatable
+        index = self._index_namespace
+        index._type_index[dsdl_type] = output_generatable  # pylint: disable=protected-access
+        index._type_name_index[self._type_name_key(dsdl_type)] = output_generatable  # pylint: disable=protected-access
         return output_generatable
 
     # +--[DUCK TYPING: pydsdl.CompositeType]-----------------------------------------------------------------------+
@@ -1064,19 +1354,9 @@ class Namespace(pydsdl.Any):  # pylint: disable=too-many-public-methods
 
     # +--[PRIVATE]------------------------------------------------------------------------------------------------+
 
-    def _bfs_search_for_output_path(self, data_type: pydsdl.CompositeType) -> Path:
-        search_queue: Deque[Namespace] = collections.deque()
-        search_queue.appendleft(self)
-        while len(search_queue) > 0:
-            namespace = search_queue.pop()
-            try:
-                return namespace._data_type_to_outputs[data_type]  # pylint: disable=protected-access
-            except KeyError:
-                pass
-            for nested_namespace in namespace._nested_namespaces.values():  # pylint: disable=protected-access
-                search_queue.appendleft(nested_namespace)
-
-        raise KeyError(data_type)
+    @staticmethod
+    def _type_name_key(data_type: pydsdl.CompositeType) -> Tuple[str, int, int]:
+        return (data_type.full_name, data_type.version.major, data_type.version.minor)
 
     @classmethod
     def _recursive_data_type_generator(
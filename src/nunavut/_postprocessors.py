@@ -7,6 +7,8 @@
 Module containing post processing logic to run on generated files.
 """
 import abc
+import concurrent.futures
+import os
 import pathlib
 import typing
 import re
@@ -27,6 +29,17 @@ class PostProcessor(metaclass=abc.ABCMeta):
     def __call__(self, generated: typing.Any) -> typing.Optional[typing.Any]:
         raise NotImplementedError()
 
+    def cache_key(self) -> typing.Optional[typing.Any]:
+        """
+        The settings of this post-processor that change what it does to generated files. Incremental generation
+        compares these with the settings outputs were last generated with, so the value must be the same from one run
+        to the next; use strings, numbers, and tuples of these rather than objects whose ``repr`` includes an address.
+
+        :return: The settings, or None if they cannot be given. This is the default. If any post-processor returns None
+            incremental generation generates every output again.
+        """
+        return None
+
 
 class FilePostProcessor(PostProcessor):
     """
@@ -64,6 +77,25 @@ class FilePostProcessor(PostProcessor):
         """
         raise NotImplementedError()
 
+    @property
+    def batched(self) -> bool:
+        """
+        If True then generators may defer this post-processor until all files have been generated and then hand it
+        every file at once through :meth:`process_files`. Any post-processors following this one are deferred for
+        each file as well so they still run in order.
+        """
+        return False
+
+    def process_files(self, generated: typing.List[pathlib.Path]) -> typing.List[pathlib.Path]:
+        """
+        Performs the post-processing action on several generated files. The default implementation invokes this
+        object once for each file in order.
+
+        :param generated: The paths of the generated files.
+        :return: A list, of the same length as ``generated``, containing the path returned for each file.
+        """
+        return [self(path) for path in generated]
+
 
 class LinePostProcessor(PostProcessor):
     """
@@ -83,10 +115,30 @@ class LinePostProcessor(PostProcessor):
         impact on generation performance. Some underlying generators (e.g. Jinja)
         are optimized to stream output based on internal buffer sizes and are not
         line oriented. For such implementations nunavut will have to create
-        an intermediate line buffer which may impact performance.
+        an intermediate line buffer which may impact performance. Generators hand lines to
+        post-processors in batches through :meth:`process_lines`, which built-in
+        post-processors override to avoid calling into Python once per line.
 
     """
 
+    def process_lines(self, lines: typing.List[typing.Tuple[str, str]]) -> typing.List[typing.Tuple[str, str]]:
+        """
+        Performs a post-processing action on a batch of consecutive generated lines. The
+        default implementation invokes this object once for each line in order.
+
+        :param lines: A list of 2-tuples as described for :meth:`__call__`.
+        :return: A list, of the same length as ``lines``, containing the result of
+                 processing each line.
+        :raises ValueError: If processing a line returns None.
+        """
+        processed = [self(line_and_lineend) for line_and_lineend in lines]
+        if None in processed:
+            raise ValueError(
+                "line post processor must return a 2-tuple. To elide a line return a tuple of empty"
+                "strings. None is not a valid value."
+            )
+        return processed
+
     @abc.abstractmethod
     def __call__(self, line_and_lineend: typing.Tuple[str, str]) -> typing.Tuple[str, str]:
         """
@@ -128,6 +180,9 @@ class SetFileMode(FilePostProcessor):
         generated.chmod(self._file_mode)
         return generated
 
+    def cache_key(self) -> typing.Optional[typing.Any]:
+        return self._file_mode
+
 
 class ExternalProgramEditInPlace(FilePostProcessor):
     """
@@ -143,21 +198,111 @@ class ExternalProgramEditInPlace(FilePostProcessor):
     :param bool check: By default, if the external program returns a non-zero
         exit status a :code:`subprocess.CalledProcessError` is raised. Set
         this argument to :code:`False` to ignore external program errors.
+
+    :param bool batch: If :code:`True` the program is run once for many files, after
+        all files have been generated, instead of once per file. The paths of
+        the files are appended to the command, in as few invocations as the
+        operating system's command line length limit allows. The program must
+        accept multiple files.
+
+    :param int jobs: When batching, the number of invocations of the program to
+        run concurrently. Files are spread across at least this many
+        invocations. 0 uses one invocation per CPU.
     """
 
-    def __init__(self, command_line: typing.List[str], check: bool = True):
+    # Space reserved, beyond the command line and the environment, when sizing batched invocations.
+    _ARG_MAX_HEADROOM = 4096
+
+    def __init__(self, command_line: typing.List[str], check: bool = True, batch: bool = False, jobs: int = 1):
         self._command_line = command_line
         self._check = check
+        self._batch = batch
+        self._jobs = jobs
+
+    @property
+    def batched(self) -> bool:
+        return self._batch
+
+    def cache_key(self) -> typing.Optional[typing.Any]:
+        # How files are batched and spread over invocations does not change what the program does to them.
+        return (tuple(str(arg) for arg in self._command_line), self._check)
 
     def __call__(self, generated: pathlib.Path) -> pathlib.Path:
-        run_args = self._command_line + [str(generated)]
+        self._run([generated])
+        return generated
+
+    def process_files(self, generated: typing.List[pathlib.Path]) -> typing.List[pathlib.Path]:
+        if len(generated) == 0:
+            return []
+        jobs = self._jobs if self._jobs > 0 else (os.cpu_count() or 1)
+        chunks = self._chunk_files(generated, -(-len(generated) // jobs))
+        if jobs == 1 or len(chunks) == 1:
+            for chunk in chunks:
+                self._run(chunk)
+        else:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+                # Consume the results so any error from the program is raised here.
+                list(executor.map(self._run, chunks))
+        return list(generated)
+
+    def _run_args(self, generated: typing.List[pathlib.Path]) -> typing.List[str]:
+        run_args = self._command_line + [str(path) for path in generated]
         # If a python file is passed in we prepend the python executable currently in-use
         # to reduce inconsistencies between the environment nunavut is running in and
         # the default environment for a given system.
         if len(run_args) > 0 and str(run_args[0]).endswith(".py"):
             run_args = [sys.executable] + run_args
-        subprocess_run(run_args, check=self._check)
-        return generated
+        return run_args
+
+    def _run(self, generated: typing.List[pathlib.Path]) -> None:
+        subprocess_run(self._run_args(generated), check=self._check)
+
+    @staticmethod
+    def _arg_size(arg: str) -> int:
+        # Each argument occupies its encoded bytes, a terminator, and a pointer in the new process' argv.
+        return len(os.fsencode(arg)) + 1 + 8
+
+    @classmethod
+    def _arg_max(cls) -> int:
+        """
+        The number of bytes available for the arguments and environment of a new process.
+        """
+        try:
+            arg_max = os.sysconf("SC_ARG_MAX")
+        except (AttributeError, ValueError, OSError):
+            arg_max = -1
+        if arg_max <= 0:
+            # CreateProcess on Windows limits the command line to 32767 characters.
+            arg_max = 32767
+        return arg_max
+
+    def _chunk_files(
+        self, generated: typing.List[pathlib.Path], max_files: int
+    ) -> typing.List[typing.List[pathlib.Path]]:
+        """
+        Split files into groups of at most ``max_files`` that can each be passed to a single invocation of the
+        program without exceeding the operating system's limit on the size of a command line.
+        """
+        budget = (
+            self._arg_max()
+            - sum(self._arg_size(arg) for arg in self._run_args([]))
+            - sum(self._arg_size(f"{name}={value}") for name, value in os.environ.items())
+            - self._ARG_MAX_HEADROOM
+        )
+        chunks: typing.List[typing.List[pathlib.Path]] = []
+        chunk: typing.List[pathlib.Path] = []
+        chunk_size = 0
+        for path in generated:
+            path_size = self._arg_size(str(path))
+            if len(chunk) > 0 and (len(chunk) >= max_files or chunk_size + path_size > budget):
+                chunks.append(chunk)
+                chunk = []
+                chunk_size = 0
+            chunk.append(path)
+            chunk_size += path_size
+        if len(chunk) > 0:
+            chunks.append(chunk)
+        return chunks
 
 
 # +---------------------------------------------------------------------------+
@@ -178,6 +323,9 @@ class TrimTrailingWhitespace(LinePostProcessor):
     def __init__(self):  # type: ignore
         self._trailing_ws_pattern = re.compile(r"\s+$")
 
+    def cache_key(self) -> typing.Optional[typing.Any]:
+        return ()
+
     def __call__(self, line_and_lineend: typing.Tuple[str, str]) -> typing.Tuple[str, str]:
         match_obj = self._trailing_ws_pattern.search(line_and_lineend[0])
         if match_obj is not None:
@@ -185,6 +333,10 @@ class TrimTrailingWhitespace(LinePostProcessor):
         else:
             return line_and_lineend
 
+    def process_lines(self, lines: typing.List[typing.Tuple[str, str]]) -> typing.List[typing.Tuple[str, str]]:
+        # str.rstrip removes exactly the characters matched by \s so this is equivalent to calling this object.
+        return [(line.rstrip(), lineend) for line, lineend in lines]
+
 
 class LimitEmptyLines(LinePostProcessor):
     """
@@ -200,6 +352,9 @@ class LimitEmptyLines(LinePostProcessor):
         self._max_empty_lines = max_empty_lines
         self._empty_line_count = 0
 
+    def cache_key(self) -> typing.Optional[typing.Any]:
+        return self._max_empty_lines
+
     def __call__(self, line_and_lineend: typing.Tuple[str, str]) -> typing.Tuple[str, str]:
         if len(line_and_lineend[0]) == 0:
             self._empty_line_count += 1
@@ -210,3 +365,17 @@ class LimitEmptyLines(LinePostProcessor):
             return ("", "")
         else:
             return line_and_lineend
+
+    def process_lines(self, lines: typing.List[typing.Tuple[str, str]]) -> typing.List[typing.Tuple[str, str]]:
+        processed = []
+        empty_line_count = self._empty_line_count
+        max_empty_lines = self._max_empty_lines
+        elided = ("", "")
+        for line_and_lineend in lines:
+            if len(line_and_lineend[0]) == 0:
+                empty_line_count += 1
+            else:
+                empty_line_count = 0
+            processed.append(elided if empty_line_count > max_empty_lines else line_and_lineend)
+        self._empty_line_count = empty_line_count
+        return processed
@@ -0,0 +1,369 @@
+#
+# Copyright (C) OpenCyphal Development Team  <opencyphal.org>
+# Copyright Amazon.com Inc. or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+"""
+Optional instrumentation of generation runs. Generation code reports the time it spends in each phase with
+:func:`measure` and notable events with :func:`count`. Both do nothing unless a :class:`GenerationProfile` is active.
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from ._version import __version__
+
+_Times = List[float]
+"""
+Number of calls, wall time, and CPU time.
+"""
+
+
+def _add_times(times: _Times, calls: float, wall: float, cpu: float) -> None:
+    times[0] += calls
+    times[1] += wall
+    times[2] += cpu
+
+
+def _times_as_dict(times: _Times) -> Dict[str, Any]:
+    return {"calls": int(times[0]), "wall_seconds": times[1], "cpu_seconds": times[2]}
+
+
+class _Phase:
+    def __init__(self) -> None:
+        self.times: _Times = [0, 0.0, 0.0]
+        self.items: Dict[str, _Times] = {}
+        self.templates: Dict[str, _Times] = {}
+
+    def add(self, item: Optional[str], template: Optional[str], calls: float, wall: float, cpu: float) -> None:
+        _add_times(self.times, calls, wall, cpu)
+        if item is not None:
+            _add_times(self.items.setdefault(item, [0, 0.0, 0.0]), calls, wall, cpu)
+        if template is not None:
+            _add_times(self.templates.setdefault(template, [0, 0.0, 0.0]), calls, wall, cpu)
+
+
+class GenerationProfile:
+    """
+    Wall and CPU time spent in each phase of generation, and counters of cache hits, misses, and files written. Pass
+    a profile to :func:`nunavut.generate_all_for_language` (or :func:`nunavut.generate_all`) to record a run in it,
+    or use ``nnvg --profile-report FILE``. The phases are:
+
+    * ``parse`` - parsing DSDL files with pydsdl, for each target file parsed.
+    * ``namespace`` - building the namespace tree from parse results.
+    * ``environment`` - creating the template loaders and environments of generators.
+    * ``template_compile`` - compiling templates, for each template.
+    * ``render`` - rendering templates, for each type (or file, for files not generated from a type) and for each
+      template.
+    * ``line_post_processing`` and ``file_post_processing`` - running post-processors, for each post-processor type.
+    * ``write`` - writing generated files and any other file handling not part of the above.
+
+    A phase measured while another phase is being measured on the same thread is not counted as part of the outer
+    phase, so each phase's times are exclusive. Times measured on several threads or worker processes are added
+    together and can add up to more than the wall time of the run. CPU time is that of the measuring thread.
+
+    Profiles created with ``template_calls`` set also count the calls to, and the cumulative wall time spent in, each
+    filter and test of the template environments created while the profile is active (see
+    :func:`instrument_template_call`). The time of a filter includes the time of any filters or tests it calls.
+
+    .. invisible-code-block: python
+
+        from nunavut._profiling import GenerationProfile, count, measure
+
+    .. code-block:: python
+
+        profile = GenerationProfile()
+        with profile.activate():
+            with measure("render", "animal.Cat.1.0", "StructureType.j2"):
+                with measure("template_compile", "StructureType.j2"):
+                    pass
+            count("template_cache_hits")
+
+        report = profile.as_dict()
+        assert report["runs"]["calls"] == 1
+        assert report["phases"]["render"]["items"]["animal.Cat.1.0"]["calls"] == 1
+        assert report["phases"]["render"]["templates"]["StructureType.j2"]["calls"] == 1
+        assert report["phases"]["template_compile"]["calls"] == 1
+        assert report["counters"] == {"template_cache_hits": 1}
+
+        # Outside of an active profile nothing is recorded.
+        count("template_cache_hits")
+        assert profile.as_dict()["counters"] == {"template_cache_hits": 1}
+
+    Calls to filters and tests are ranked by the time spent in them:
+
+    .. code-block:: python
+
+        from nunavut._profiling import instrument_template_call
+
+        slow = instrument_template_call("filter", "slow", lambda value: sum(range(100000)))
+        fast = instrument_template_call("filter", "fast", lambda value: value)
+
+        profile = GenerationProfile(template_calls=True)
+        with profile.activate():
+            slow(1)
+            fast(1)
+            fast(2)
+
+        assert [f["name"] for f in profile.as_dict()["template_calls"]["filters"]] == ["slow", "fast"]
+        assert profile.as_dict()["template_calls"]["filters"][1]["calls"] == 2
+        assert profile.format_template_calls().splitlines()[1].split()[-1] == "slow"
+
+    :param bool template_calls: If True, calls to template filters and tests are recorded.
+    """
+
+    def __init__(self, template_calls: bool = False) -> None:
+        self._lock = threading.Lock()
+        self._phases: Dict[str, _Phase] = {}
+        self._counters: Dict[str, int] = {}
+        self._runs: _Times = [0, 0.0, 0.0]
+        self._template_calls: Optional[Dict[Tuple[str, str], List[float]]] = {} if template_calls else None
+
+    @property
+    def records_template_calls(self) -> bool:
+        """
+        If calls to template filters and tests are recorded in this profile.
+        """
+        return self._template_calls is not None
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator["GenerationProfile"]:
+        """
+        Record everything measured or counted in the current context, and in the threads and worker processes
+        generation starts from it, in this profile until the returned context manager exits. The wall and CPU time
+        of the whole block is recorded as a run.
+        """
+        token = _active_profile.set(self)
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield self
+        finally:
+            with self._lock:
+                _add_times(self._runs, 1, time.perf_counter() - start_wall, time.process_time() - start_cpu)
+            _active_profile.reset(token)
+
+    def record(
+        self, phase: str, wall: float, cpu: float, item: Optional[str] = None, template: Optional[str] = None
+    ) -> None:
+        """
+        Add a measurement taken elsewhere, for example in a worker process, to a phase.
+
+        :param str phase: The phase measured.
+        :param float wall: Wall time in seconds.
+        :param float cpu: CPU time in seconds.
+        :param Optional[str] item: What the phase was measured for (e.g. a DSDL file or type).
+        :param Optional[str] template: The template the phase was measured for.
+        """
+        with self._lock:
+            self._phases.setdefault(phase, _Phase()).add(item, template, 1, wall, cpu)
+
+    def count(self, counter: str, increment: int = 1) -> None:
+        """
+        Add to a counter.
+
+        :param str counter: The counter's name.
+        :param int increment: The amount to add.
+        """
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + increment
+
+    def record_template_call(self, kind: str, name: str, seconds: float) -> None:
+        """
+        Add a call to a template filter or test. Does nothing if this profile does not record template calls.
+
+        :param str kind: ``filter`` or ``test``.
+        :param str name: The name templates use for the filter or test.
+        :param float seconds: The wall time of the call.
+        """
+        if self._template_calls is None:
+            return
+        with self._lock:
+            calls = self._template_calls.setdefault((kind, name), [0, 0.0])
+            calls[0] += 1
+            calls[1] += seconds
+
+    def merge(self, other: Dict[str, Any]) -> None:
+        """
+        Add the phases, counters, and template calls of another profile, given as returned by :meth:`as_dict`, to
+        this one. Runs are not merged.
+        """
+        with self._lock:
+            for phase_name, phase_dict in other.get("phases", {}).items():
+                phase = self._phases.setdefault(phase_name, _Phase())
+                _add_times(phase.times, phase_dict["calls"], phase_dict["wall_seconds"], phase_dict["cpu_seconds"])
+                for breakdown, times in (("items", phase.items), ("templates", phase.templates)):
+                    for name, item_dict in phase_dict.get(breakdown, {}).items():
+                        _add_times(
+                            times.setdefault(name, [0, 0.0, 0.0]),
+                            item_dict["calls"],
+                            item_dict["wall_seconds"],
+                            item_dict["cpu_seconds"],
+                        )
+            for counter, value in other.get("counters", {}).items():
+                self._counters[counter] = self._counters.get(counter, 0) + value
+            if self._template_calls is not None:
+                for kind, ranked in other.get("template_calls", {}).items():
+                    for entry in ranked:
+                        calls = self._template_calls.setdefault((kind[:-1], entry["name"]), [0, 0.0])
+                        calls[0] += entry["calls"]
+                        calls[1] += entry["seconds"]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Everything recorded as a JSON-compatible dictionary.
+        """
+        with self._lock:
+            phases: Dict[str, Any] = {}
+            for phase_name, phase in sorted(self._phases.items()):
+                phase_dict = _times_as_dict(phase.times)
+                for breakdown, times in (("items", phase.items), ("templates", phase.templates)):
+                    if len(times) > 0:
+                        phase_dict[breakdown] = {name: _times_as_dict(t) for name, t in sorted(times.items())}
+                phases[phase_name] = phase_dict
+            report = {
+                "nunavut_version": __version__,
+                "runs": _times_as_dict(self._runs),
+                "phases": phases,
+                "counters": dict(sorted(self._counters.items())),
+            }
+            if self._template_calls is not None:
+                report["template_calls"] = {
+                    f"{kind}s": [
+                        {"name": name, "calls": int(calls[0]), "seconds": calls[1]}
+                        for (_, name), calls in self._rank_template_calls(kind)
+                    ]
+                    for kind in ("filter", "test")
+                }
+            return report
+
+    def format_template_calls(self, limit: Optional[int] = None) -> str:
+        """
+        A table of the template filters and tests called, ranked by the cumulative time spent in them.
+
+        :param Optional[int] limit: The number of filters and tests to list. All are listed if None.
+        :return: The table or an empty string if this profile does not record template calls.
+        """
+        if self._template_calls is None:
+            return ""
+        with self._lock:
+            ranked = self._rank_template_calls()
+        lines = [f"{'seconds':>10} {'calls':>9} {'us/call':>9}  {'kind':<6} name"]
+        for (kind, name), calls in ranked[:limit]:
+            per_call = 1000000 * calls[1] / calls[0] if calls[0] > 0 else 0.0
+            lines.append(f"{calls[1]:>10.4f} {int(calls[0]):>9} {per_call:>9.1f}  {kind:<6} {name}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, report_path: Union[str, Path]) -> None:
+        """
+        Write :meth:`as_dict` to a file as JSON.
+
+        :param report_path: The file to write. This is replaced if it exists.
+        """
+        Path(report_path).write_text(json.dumps(self.as_dict(), indent=2) + "\n", encoding="utf-8")
+
+    # +--[PRIVATE]--------------------------------------------------------------------------------------------------+
+    def _rank_template_calls(self, kind: Optional[str] = None) -> List[Tuple[Tuple[str, str], List[float]]]:
+        assert self._template_calls is not None
+        return sorted(
+            (item for item in self._template_calls.items() if kind is None or item[0][0] == kind),
+            key=lambda item: (-item[1][1], item[0]),
+        )
+
+
+_active_profile: "contextvars.ContextVar[Optional[GenerationProfile]]" = contextvars.ContextVar(
+    "GenerationProfile", default=None
+)
+
+_measuring = threading.local()
+"""
+The stack of measurements in progress on each thread. Each entry holds the time measured by nested measurements.
+"""
+
+
+def active_profile() -> Optional[GenerationProfile]:
+    """
+    The profile being recorded in the current context, if any.
+    """
+    return _active_profile.get()
+
+
+@contextlib.contextmanager
+def _measure(profile: GenerationProfile, phase: str, item: Optional[str], template: Optional[str]) -> Iterator[None]:
+    stack = getattr(_measuring, "stack", None)
+    if stack is None:
+        stack = []
+        _measuring.stack = stack
+    nested = [0.0, 0.0]
+    stack.append(nested)
+    start_wall = time.perf_counter()
+    start_cpu = time.thread_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - start_wall
+        cpu = time.thread_time() - start_cpu
+        stack.pop()
+        if len(stack) > 0:
+            stack[-1][0] += wall
+            stack[-1][1] += cpu
+        profile.record(phase, wall - nested[0], cpu - nested[1], item, template)
+
+
+def measure(
+    phase: str, item: Optional[str] = None, template: Optional[str] = None
+) -> "contextlib.AbstractContextManager[None]":
+    """
+    Measure the time spent in a block as part of a phase of the active profile. Does nothing if no profile is active.
+
+    :param str phase: The phase to add the time to.
+    :param Optional[str] item: What the phase is being measured for (e.g. a DSDL file or type).
+    :param Optional[str] template: The template the phase is being measured for.
+    """
+    profile = _active_profile.get()
+    if profile is None:
+        return contextlib.nullcontext()
+    return _measure(profile, phase, item, template)
+
+
+def count(counter: str, increment: int = 1) -> None:
+    """
+    Add to a counter of the active profile. Does nothing if no profile is active.
+
+    :param str counter: The counter's name.
+    :param int increment: The amount to add.
+    """
+    profile = _active_profile.get()
+    if profile is not None:
+        profile.count(counter, increment)
+
+
+def instrument_template_call(kind: str, name: str, template_callable: Callable) -> Callable:
+    """
+    Wrap a template filter or test so that calls to it are recorded in the active profile if that profile records
+    template calls. The wrapper keeps the attributes Jinja uses to decide how to call the filter or test.
+
+    :param str kind: ``filter`` or ``test``.
+    :param str name: The name templates use for the filter or test.
+    :param Callable template_callable: The filter or test.
+    :return: The wrapped filter or test.
+    """
+
+    @functools.wraps(template_callable)
+    def _instrumented(*args: Any, **kwargs: Any) -> Any:
+        profile = _active_profile.get()
+        if profile is None or not profile.records_template_calls:
+            return template_callable(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return template_callable(*args, **kwargs)
+        finally:
+            profile.record_template_call(kind, name, time.perf_counter() - start)
+
+    return _instrumented
@@ -441,6 +441,20 @@ def _make_parser(parser_type: Type[ParserT]) -> ParserT:
         ).lstrip(),
     )
 
+    extended_group.add_argument(
+        "--write-if-changed",
+        action="store_true",
+        help=textwrap.dedent(
+            """
+
+        Only replace existing files if their contents would change. Unchanged files,
+        including any post-processing, are left untouched so their modification times
+        are preserved and build systems do not rebuild what depends on them.
+
+    """
+        ).lstrip(),
+    )
+
     extended_group.add_argument(
         "--file-mode",
         default=0o444,
@@ -531,7 +545,7 @@ def _make_parser(parser_type: Type[ParserT]) -> ParserT:
             """
 
         Limits the number of subprocesses nnvg can use to parallelize type discovery
-        and code generation.
+        and, with --render-processes or --render-threads, template rendering.
 
         If set to 0 then the number of jobs will be set to the number of CPUs available
         on the system.
@@ -543,6 +557,99 @@ def _make_parser(parser_type: Type[ParserT]) -> ParserT:
         ).lstrip(),
     )
 
+    render_mode_group = run_mode_group.add_mutually_exclusive_group()
+
+    render_mode_group.add_argument(
+        "--render-processes",
+        action="store_true",
+        help=textwrap.dedent(
+            """
+
+        Use --jobs subprocesses to render templates. Each subprocess compiles the
+        templates it uses so this is only faster for large sets of types. Without
+        this option, or --render-threads, templates are rendered in the main process.
+
+    """
+        ).lstrip(),
+    )
+
+    render_mode_group.add_argument(
+        "--render-threads",
+        action="store_true",
+        help=textwrap.dedent(
+            """
+
+        Use --jobs threads within the nnvg process to render templates. Type discovery
+        still uses subprocesses.
+
+    """
+        ).lstrip(),
+    )
+
+    run_mode_group.add_argument(
+        "--parse-cache-dir",
+        type=Path,
+        help=textwrap.dedent(
+            """
+
+        A directory to keep parsed DSDL types in between invocations. DSDL files that
+        have not changed since they were cached are not parsed again. Entries are keyed
+        on file contents, lookup directories, and the versions of pydsdl and nunavut.
+
+        Defaults to the value of the NUNAVUT_PARSE_CACHE_DIR environment variable. If
+        neither is set then no cache is used.
+
+        This directory must not be writable by untrusted parties.
+
+    """
+        ).lstrip(),
+    )
+
+    run_mode_group.add_argument(
+        "--parse-cache-max-size",
+        type=int,
+        default=256,
+        help=textwrap.dedent(
+            """
+
+        The maximum size, in MiB, of the parse cache. The least recently used entries are
+        removed after each run until the cache is within this limit. 0 disables the limit.
+
+    """
+        ).lstrip(),
+    )
+
+    run_mode_group.add_argument(
+        "--parse-cache-max-age",
+        type=float,
+        default=30,
+        help=textwrap.dedent(
+            """
+
+        The maximum time, in days, since a parse cache entry was last used. Older entries
+        are removed after each run. 0 disables the limit.
+
+    """
+        ).lstrip(),
+    )
+
+    run_mode_group.add_argument(
+        "--template-cache-dir",
+        type=Path,
+        help=textwrap.dedent(
+            """
+
+        A directory to keep compiled templates in between invocations. Templates whose
+        source has not changed are loaded from this cache instead of being compiled
+        again. Entries are keyed on template contents, template settings, and the
+        version of nunavut.
+
+        This directory must not be writable by untrusted parties.
+
+    """
+        ).lstrip(),
+    )
+
     run_mode_group.add_argument(
         "--list-outputs",
         action="store_true",
@@ -635,6 +742,157 @@ def _make_parser(parser_type: Type[ParserT]) -> ParserT:
         ).lstrip(),
     )
 
+    run_mode_group.add_argument(
+        "--job-file",
+        type=Path,
+        help=textwrap.dedent(
+            """
+
+        Run several jobs, listed in a JSON or TOML file, in this one process. Each job is
+        given as the command-line arguments it would otherwise be run with:
+
+            {"jobs": [{"args": ["-l", "c", "-O", "out/c", "dsdl/uavcan"]},
+                      {"args": ["-l", "cpp", "-O", "out/cpp", "dsdl/uavcan"]}]}
+
+        Jobs share parsed DSDL and compiled templates. --dry-run and the --list-* options
+        given alongside --job-file apply to every job and produce one combined listing.
+        TOML job files (ending in .toml) require Python 3.11 or newer.
+
+    """
+        ).lstrip(),
+    )
+
+    run_mode_group.add_argument(
+        "--incremental",
+        action="store_true",
+        help=textwrap.dedent(
+            """
+
+        Record the inputs each output was generated from in a file in --outdir and, on later
+        runs with this option, only render outputs whose DSDL, or the DSDL of any type they
+        use, has changed. All outputs are rendered again if any template, the language
+        configuration, or the generation options change. Outputs that were edited or deleted
+        since they were generated are also rendered again.
+
+    """
+        ).lstrip(),
+    )
+
+    run_mode_group.add_argument(
+        "--watch",
+        action="store_true",
+        help=textwrap.dedent(
+            """
+
+        Generate and then keep watching the DSDL root namespace directories and template
+        directories for changes. Each change regenerates only the outputs it affects: outputs
+        of types that use a changed DSDL file and outputs rendered from a changed template.
+        Parsed DSDL and compiled templates are kept in memory between changes. Use -v to see
+        what is regenerated and Ctrl-C to stop.
+
+    """
+        ).lstrip(),
+    )
+
+    run_mode_group.add_argument(
+        "--watch-interval",
+        type=float,
+        default=0.5,
+        metavar="SECONDS",
+        help="How often --watch checks for changes.",
+    )
+
+    run_mode_group.add_argument(
+        "--serve",
+        type=Path,
+        metavar="SOCKET",
+        help=textwrap.dedent(
+            """
+
+        Run a generation server listening on the given Unix domain socket instead of generating
+        anything. The server keeps parsed DSDL and compiled templates in memory so later runs sent
+        to it with --connect only parse and compile what has changed. Stop the server with Ctrl-C.
+
+    """
+        ).lstrip(),
+    )
+
+    run_mode_group.add_argument(
+        "--connect",
+        type=Path,
+        metavar="SOCKET",
+        help=textwrap.dedent(
+            """
+
+        Send all other arguments to a server started with --serve on the given socket and wait for
+        it to run them. The server runs them in the current directory and with the current values
+        of CYPHAL_PATH, DSDL_INCLUDE_PATH, and any NUNAVUT_ environment variables.
+
+        example ::
+
+            nnvg --serve /tmp/nnvg.sock &
+            nnvg --connect /tmp/nnvg.sock -l c -O build/c path/to/uavcan
+
+    """
+        ).lstrip(),
+    )
+
+    run_mode_group.add_argument(
+        "--list-manifest",
+        type=Path,
+        help=textwrap.dedent(
+            """
+
+        A file to record the results of --list-inputs and --list-outputs in when used with
+        --dry-run. Later dry runs with the same arguments list the recorded files, without
+        parsing DSDL or loading templates, until any input file changes or files are added to
+        or removed from the namespaces or template directories involved. Only arguments that
+        can change which files are listed, like the targets, the language, its options, and
+        the output and template directories, are compared. Recording a listing does not load
+        templates either, and DSDL is parsed through a cache kept next to the manifest, unless
+        --parse-cache-dir is given, so only the files that changed are parsed again.
+
+        example ::
+
+            nnvg --dry-run --list-inputs --list-outputs --list-manifest build/nnvg_manifest.json \\
+                 -l c path/to/uavcan
+
+    """
+        ).lstrip(),
+    )
+
+    run_mode_group.add_argument(
+        "--profile-report",
+        type=Path,
+        metavar="FILE",
+        help=textwrap.dedent(
+            """
+
+        Write a JSON report of the wall and CPU time spent in each phase of generation to
+        the given file. Phases include parsing each DSDL file, building namespaces,
+        creating template environments, compiling templates, rendering each type and
+        template, post-processing, and writing files. The report also counts cache hits
+        and misses and the files written. With --job-file the report covers every job.
+
+    """
+        ).lstrip(),
+    )
+
+    run_mode_group.add_argument(
+        "--profile-template-calls",
+        action="store_true",
+        help=textwrap.dedent(
+            """
+
+        Count the calls to, and the cumulative time spent in, each filter and test used by
+        templates. The filters and tests are printed to stderr ranked by the time spent in
+        them and, if --profile-report is given, added to the report. This slows rendering
+        down slightly.
+
+    """
+        ).lstrip(),
+    )
+
     # +-----------------------------------------------------------------------+
     # | Post-Processing Options
     # +-----------------------------------------------------------------------+
@@ -744,6 +1002,34 @@ def _make_parser(parser_type: Type[ParserT]) -> ParserT:
         ).lstrip(),
     )
 
+    ln_pp_group.add_argument(
+        "-pp-rpb",
+        "--pp-run-program-batch",
+        action="store_true",
+        help=textwrap.dedent(
+            """
+
+        Run the program specified by --pp-run-program once for many files, after all
+        files are generated, instead of once for each file. The paths of the generated
+        files are appended to the command line in as few invocations as the operating
+        system's command line length limit allows, and these invocations are spread
+        across --jobs concurrent processes. The program must accept multiple files.
+
+        example ::
+
+            # invokes clang-format with the "in-place" argument on all generated files
+            # at once.
+
+            nnvg --outdir include -l c -pp-rp clang-format -pp-rpa=-i -pp-rpb dsdl
+
+        This has no effect on files generated with --write-if-changed that already
+        exist, since the program must run on each of these before it can be compared
+        to the existing file.
+
+    """
+        ).lstrip(),
+    )
+
     # +-----------------------------------------------------------------------+
     # | Language Options
     # +-----------------------------------------------------------------------+
@@ -0,0 +1,122 @@
+#
+# Copyright (C) OpenCyphal Development Team  <opencyphal.org>
+# Copyright Amazon.com Inc. or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+"""
+Thin client that forwards command-line arguments to a generation server started with ``nnvg --serve``. This module
+only uses the Python standard library so forwarding a request does not load any of Nunavut's generation logic.
+
+.. code-block:: bash
+
+    nnvg --serve /tmp/nnvg.sock &
+    nnvg --connect /tmp/nnvg.sock -l c -O build/c dsdl/uavcan
+
+The server runs each request in the client's working directory and with the client's values of the environment
+variables that change how Nunavut finds DSDL (see :data:`FORWARDED_ENVIRONMENT_VARIABLES`). Output and the exit
+status of the request are written back as if the client had run the command itself.
+"""
+
+import json
+import os
+import socket
+import sys
+from typing import Any, Dict, List, Optional, Sequence, TextIO, Tuple
+
+FORWARDED_ENVIRONMENT_VARIABLES = ("CYPHAL_PATH", "DSDL_INCLUDE_PATH")
+"""
+Environment variables sent with each request. Variables starting with :data:`FORWARDED_ENVIRONMENT_PREFIX` are also
+sent.
+"""
+
+FORWARDED_ENVIRONMENT_PREFIX = "NUNAVUT_"
+"""
+Prefix of the names of other environment variables sent with each request.
+"""
+
+
+def split_connect_args(argv: Sequence[str]) -> Tuple[Optional[str], List[str]]:
+    """
+    Remove ``--connect SOCKET`` from command-line arguments.
+
+    .. code-block:: python
+
+        from nunavut.cli.client import split_connect_args
+
+        assert split_connect_args(["--connect", "nnvg.sock", "-l", "c"]) == ("nnvg.sock", ["-l", "c"])
+        assert split_connect_args(["-l", "c", "--connect=nnvg.sock"]) == ("nnvg.sock", ["-l", "c"])
+        assert split_connect_args(["-l", "c"]) == (None, ["-l", "c"])
+
+    :param Sequence[str] argv: Command-line arguments, not including the program name.
+    :return: The socket to connect to, or None if ``--connect`` was not given, and the remaining arguments.
+    """
+    socket_path: Optional[str] = None
+    remaining: List[str] = []
+    args = iter(argv)
+    for arg in args:
+        if arg == "--":
+            remaining.append(arg)
+            remaining.extend(args)
+        elif arg == "--connect":
+            socket_path = next(args, None)
+            if socket_path is None:
+                raise ValueError("--connect requires the path to the server's socket.")
+        elif arg.startswith("--connect="):
+            socket_path = arg[len("--connect=") :]
+        else:
+            remaining.append(arg)
+    return (socket_path, remaining)
+
+
+def forwarded_environment() -> Dict[str, str]:
+    """
+    The environment variables to send with a request.
+    """
+    return {
+        name: value
+        for name, value in os.environ.items()
+        if name in FORWARDED_ENVIRONMENT_VARIABLES or name.startswith(FORWARDED_ENVIRONMENT_PREFIX)
+    }
+
+
+def forward(
+    socket_path: str, args: Sequence[str], stdout: Optional[TextIO] = None, stderr: Optional[TextIO] = None
+) -> int:
+    """
+    Send command-line arguments to a generation server and wait for it to run them.
+
+    :param str socket_path: The Unix domain socket the server is listening on.
+    :param Sequence[str] args: The command-line arguments to run, not including the program name.
+    :param TextIO stdout: Where to write the standard output of the request. Defaults to :data:`sys.stdout`.
+    :param TextIO stderr: Where to write the standard error of the request. Defaults to :data:`sys.stderr`.
+    :return: The exit status of the request.
+    """
+    request = {"args": list(args), "cwd": os.getcwd(), "env": forwarded_environment()}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        with connection.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode("utf-8") + b"\n")
+            stream.flush()
+            response: Dict[str, Any] = json.loads(stream.readline())
+    (stdout or sys.stdout).write(response["stdout"])
+    (stderr or sys.stderr).write(response["stderr"])
+    return int(response["returncode"])
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Entry point for ``python -m nunavut.cli.client --connect SOCKET [nnvg arguments]``.
+    """
+    try:
+        socket_path, args = split_connect_args(sys.argv[1:] if argv is None else argv)
+    except ValueError as e:
+        sys.stderr.write(f"{e}\n")
+        socket_path = None
+    if socket_path is None:
+        sys.stderr.write("usage: python -m nunavut.cli.client --connect SOCKET [nnvg arguments]\n")
+        return 2
+    return forward(socket_path, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
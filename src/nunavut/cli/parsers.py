@@ -82,6 +82,9 @@ class NunavutArgumentParser(argparse.ArgumentParser):
     - **pp_run_program_arg**
         The original arguments are replaced with post_processors.
 
+    - **pp_run_program_batch**
+        The original arguments are replaced with post_processors.
+
     Arguments Modified
     ------------------
 
@@ -183,6 +186,9 @@ class NunavutArgumentParser(argparse.ArgumentParser):
         # Generator arguments
         args.generate_namespace_types = YesNoDefault.YES if args.generate_namespace_types else YesNoDefault.DEFAULT
 
+        if getattr(args, "watch", False) and args.dry_run:
+            self.error("--watch cannot be used with --dry-run, --list-inputs, or --list-outputs.")
+
         # Can't list configuration as csv. Has to be a structured return format.
         if args.list_configuration and args.list_format in ("scsv", "csv"):
             self.error(
@@ -408,10 +414,16 @@ class NunavutArgumentParser(argparse.ArgumentParser):
             del args.pp_max_emptylines
         if hasattr(args, "pp_run_program") and args.pp_run_program is not None:
             post_processors.append(
-                ExternalProgramEditInPlace(_build_ext_program_postprocessor_args(args.pp_run_program))
+                ExternalProgramEditInPlace(
+                    _build_ext_program_postprocessor_args(args.pp_run_program),
+                    batch=getattr(args, "pp_run_program_batch", False),
+                    jobs=getattr(args, "jobs", 1),
+                )
             )
             del args.pp_run_program
             del args.pp_run_program_arg
+        if hasattr(args, "pp_run_program_batch"):
+            del args.pp_run_program_batch
 
         post_processors.append(SetFileMode(args.file_mode))
 
@@ -9,16 +9,48 @@ Objects that utilize command-line inputs to run a program using Nunavut.
 
 import argparse
 import itertools
+import json
 import logging
+import os
 import sys
+import tempfile
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 
-from .._generators import basic_language_context_builder_from_args, generate_all
+from .._profiling import GenerationProfile
 from .._utilities import ResourceType
-from ..lang import LanguageContext
 from .listers import Lister
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .._manifest import ListingManifest
+    from .._generators import GenerationResult
+    from .._namespace import ParseResultStore
+    from ..lang import LanguageContext
+
+# The generation modules, which load pydsdl and Jinja, are imported by the methods that need them so commands that do
+# not generate, like listing files recorded in a manifest, start quickly.
+
+
+def _create_profile(args: argparse.Namespace) -> Optional[GenerationProfile]:
+    """
+    Create the profile the arguments request with ``--profile-report`` or ``--profile-template-calls``, if any.
+    """
+    profile_template_calls = bool(getattr(args, "profile_template_calls", False))
+    if getattr(args, "profile_report", None) is None and not profile_template_calls:
+        return None
+    return GenerationProfile(template_calls=profile_template_calls)
+
+
+def _report_profile(args: argparse.Namespace, profile: GenerationProfile) -> None:
+    """
+    Write the profile report and print the ranked template calls as the arguments request.
+    """
+    profile_report = getattr(args, "profile_report", None)
+    if profile_report is not None:
+        profile.write(profile_report)
+    if profile.records_template_calls:
+        sys.stderr.write(profile.format_template_calls())
+
 
 class StandardArgparseRunner:
     """
@@ -28,6 +60,36 @@ class StandardArgparseRunner:
     :param argparse.Namespace args: The command line arguments.
     """
 
+    LISTING_ARGS = (
+        "allow_unregulated_fixed_port_id",
+        "configuration",
+        "generate_namespace_types",
+        "include_experimental_languages",
+        "index_file",
+        "language_options",
+        "namespace_output_stem",
+        "no_target_namespaces",
+        "omit_dependencies",
+        "outdir",
+        "output_extension",
+        "resource_types",
+        "root_namespace_directories_or_names",
+        "search_policy",
+        "support_templates_dir",
+        "target_files",
+        "target_language",
+        "templates_dir",
+    )
+    """
+    Arguments that can change which files are listed as inputs or outputs by a dry run. Any other argument, such as
+    one that only changes how files are rendered or how the run is parallelized, does not invalidate a listing.
+    """
+
+    LISTING_ENVIRONMENT_VARIABLES = ("CYPHAL_PATH", "DSDL_INCLUDE_PATH")
+    """
+    Environment variables that can change which files are listed as inputs or outputs by a dry run.
+    """
+
     def __init__(self, args: argparse.Namespace):
         self._args = args
 
@@ -43,36 +105,137 @@ class StandardArgparseRunner:
         Perform actions defined by the arguments this object was created with. This may generate outputs where
         the arguments have requested this action.
         """
+        lister_object = self.generate()
+        cmdline = getattr(self._args, "job_cmdline", None) or sys.argv
+        if self._args.list_configuration and len(cmdline) > 0:
+            lister_object["cmdline"] = cmdline
+
+        Lister.get_lister(self._args.list_format, self._args.list_to_file).list(lister_object)
+
+        return 0
+
+    def generate(self) -> Dict[str, Any]:
+        """
+        Generate, or list, files as the arguments this object was created with request.
+
+        :return: The configuration, inputs, and outputs the arguments requested listings of.
+        """
         lister_object: Dict[str, Any] = {}
         if self._args.list_configuration:
+            from .._generators import (  # pylint: disable=import-outside-toplevel
+                basic_language_context_builder_from_args,
+            )
+
             lister_object["configuration"] = self.list_configuration(
                 basic_language_context_builder_from_args(**vars(self.args)).create()
             )
-            if len(sys.argv) > 0:
-                lister_object["cmdline"] = sys.argv
 
-        result = generate_all(**vars(self.args))
+        profile = _create_profile(self._args)
+        if profile is not None:
+            self._args.profile = profile
+
+        manifest = self._get_listing_manifest()
+        listing = None
+        if manifest is not None:
+            listing = manifest.load()
+            if listing is not None:
+                logging.info("Listing files recorded in %s", manifest.manifest_path)
+        if listing is None:
+            from .._generators import generate_all  # pylint: disable=import-outside-toplevel
+
+            generate_args = dict(vars(self.args))
+            if manifest is not None:
+                # Only the names of the files are recorded, which do not depend on what the templates contain, so
+                # no template is loaded. DSDL is parsed through a persistent cache, next to the manifest unless another
+                # one is given, so that only the files that changed since the listing was recorded are parsed again.
+                from ..jinja import (  # pylint: disable=import-outside-toplevel
+                    DSDLCodeListingGenerator,
+                    SupportListingGenerator,
+                )
+
+                generate_args["code_generator_type"] = DSDLCodeListingGenerator
+                generate_args["support_generator_type"] = SupportListingGenerator
+                if generate_args.get("parse_cache_dir") is None and not os.environ.get("NUNAVUT_PARSE_CACHE_DIR"):
+                    generate_args["parse_cache_dir"] = manifest.manifest_path.with_suffix(".parse_cache")
+
+            result = generate_all(**generate_args)
+
+            if len(result.skipped_files) > 0:
+                logging.info(
+                    "%d of %d files were unchanged and not rewritten.",
+                    len(result.skipped_files),
+                    len(result.generated_files) + len(result.support_files),
+                )
+
+            listing = {"inputs": self._list_inputs(result), "outputs": self._list_outputs(result)}
+            if manifest is not None:
+                manifest.store(listing["inputs"], listing["outputs"], self._list_watched_directories(result))
 
         if self._args.list_inputs:
-            input_dsdl = {str(p) for p in set(result.template_files)}
-            for _, target_data in result.generator_targets.items():
-                input_dsdl.add(str(target_data.definition.source_file_path.resolve()))
-                input_dsdl.update({str(d.source_file_path.resolve()) for d in target_data.input_types})
-            lister_object["inputs"] = list(input_dsdl)
+            lister_object["inputs"] = listing["inputs"]
 
         if self._args.list_outputs:
-            file_iterators = []
-            if self._args.resource_types != ResourceType.NONE.value:
-                file_iterators.append(result.support_files)
-            if (self._args.resource_types & ResourceType.ONLY.value) == 0:
-                file_iterators.append(result.generated_files)
-            lister_object["outputs"] = [str(p.resolve()) for p in itertools.chain(*file_iterators)]
+            lister_object["outputs"] = listing["outputs"]
 
-        Lister.get_lister(self._args.list_format, self._args.list_to_file).list(lister_object)
+        if profile is not None:
+            _report_profile(self._args, profile)
 
-        return 0
+        return lister_object
 
-    def list_configuration(self, lctx: LanguageContext) -> Dict[str, Any]:
+    def _get_listing_manifest(self) -> Optional["ListingManifest"]:
+        """
+        The manifest to reuse listings from, if the arguments request one for a dry run that lists files.
+        """
+        if getattr(self._args, "list_manifest", None) is None:
+            return None
+        if not self._args.dry_run or not (self._args.list_inputs or self._args.list_outputs):
+            logging.debug("--list-manifest is only used for dry runs that list inputs or outputs.")
+            return None
+        from .._manifest import ListingManifest  # pylint: disable=import-outside-toplevel
+
+        key: List[Any] = [Path.cwd()]
+        for name in self.LISTING_ARGS:
+            value = getattr(self._args, name, None)
+            if name in ("target_files", "root_namespace_directories_or_names") and value is not None:
+                # These are collected into sets so their order changes from one run to the next.
+                value = sorted(str(v) for v in value)
+            key.append((name, value))
+        key.extend((k, os.environ.get(k)) for k in self.LISTING_ENVIRONMENT_VARIABLES)
+        return ListingManifest(self._args.list_manifest, key)
+
+    def _list_inputs(self, result: "GenerationResult") -> List[str]:
+        input_dsdl = {str(p) for p in set(result.template_files)}
+        for _, target_data in result.generator_targets.items():
+            input_dsdl.add(str(target_data.definition.source_file_path.resolve()))
+            input_dsdl.update({str(d.source_file_path.resolve()) for d in target_data.input_types})
+        return list(input_dsdl)
+
+    def _list_outputs(self, result: "GenerationResult") -> List[str]:
+        file_iterators = []
+        if self._args.resource_types != ResourceType.NONE.value:
+            file_iterators.append(result.support_files)
+        if (self._args.resource_types & ResourceType.ONLY.value) == 0:
+            file_iterators.append(result.generated_files)
+        return [str(p.resolve()) for p in itertools.chain(*file_iterators)]
+
+    def _list_watched_directories(self, result: "GenerationResult") -> Set[Path]:
+        """
+        The root namespace directories of all listed DSDL files and any template directories. Adding files to these
+        can change what a dry run lists.
+        """
+        watched_directories: Set[Path] = set()
+        for _, target_data in result.generator_targets.items():
+            for dsdl_type in [target_data.definition, *target_data.input_types]:
+                source_file_path = dsdl_type.source_file_path.resolve()
+                watched_directories.add(source_file_path.parents[len(dsdl_type.full_namespace.split(".")) - 1])
+        for templates_arg in ("templates_dir", "support_templates_dir"):
+            templates_dirs = getattr(self._args, templates_arg, None) or []
+            if not isinstance(templates_dirs, list):
+                templates_dirs = [templates_dirs]
+            watched_directories.update(Path(templates_dir).resolve() for templates_dir in templates_dirs)
+        return watched_directories
+
+    def list_configuration(self, lctx: "LanguageContext") -> Dict[str, Any]:
         """
         List the configuration of the language context to an object.
         """
@@ -84,6 +247,148 @@ class StandardArgparseRunner:
         return config
 
 
+class JobFileRunner:
+    """
+    Runs every job in a job file within a single process. Jobs that use the same root namespace directories share
+    parse results, so each DSDL file is only parsed once, and all jobs share compiled templates through a template
+    cache (see ``--template-cache-dir``). The inputs and outputs listed by each job are combined into one listing.
+
+    Job files are JSON, or TOML if the file name ends with ``.toml`` (Python 3.11 or newer), and contain a list of
+    jobs each given as the command-line arguments for that job:
+
+    .. code-block:: json
+
+        {
+            "jobs": [
+                {"args": ["--target-language", "c", "--outdir", "build/c", "dsdl/uavcan"]},
+                {"args": ["--target-language", "cpp", "--outdir", "build/cpp", "dsdl/uavcan"]}
+            ]
+        }
+
+    Relative paths in job arguments are relative to the current working directory.
+
+    .. invisible-code-block: python
+
+        import json
+        from pathlib import Path
+        from nunavut.cli import _make_parser
+        from nunavut.cli.parsers import NunavutArgumentParser
+        from nunavut.cli.runners import JobFileRunner
+
+        job_file = gen_paths.out_dir / Path("jobs.json")
+        job_file.write_text(json.dumps({"jobs": [{"args": ["-l", "c"]}, {"args": ["-l", "py"]}]}))
+        parser = _make_parser(NunavutArgumentParser)
+
+        runner = JobFileRunner(parser.parse_args(["--job-file", str(job_file)]), parser)
+        assert [job_args.target_language for job_args in runner.load_jobs()] == ["c", "py"]
+
+    :param argparse.Namespace args: The command line arguments. ``job_file`` names the job file. Any of
+        ``--dry-run``, ``--list-inputs``, ``--list-outputs``, or ``--list-configuration`` are applied to every job and
+        ``--list-format`` and ``--list-to-file`` control how the combined listing is written.
+    :param argparse.ArgumentParser parser: The parser used to interpret the arguments of each job.
+    """
+
+    def __init__(self, args: argparse.Namespace, parser: argparse.ArgumentParser):
+        self._args = args
+        self._parser = parser
+        self._parse_stores: Dict[Tuple[Any, ...], "ParseResultStore"] = {}
+
+    def load_jobs(self) -> List[argparse.Namespace]:
+        """
+        Read and parse the arguments of every job in the job file.
+
+        :return: The parsed arguments of each job in the order they appear in the job file.
+        :raises ValueError: If the job file is not structured as documented for this class.
+        """
+        job_file = Path(self._args.job_file)
+        if job_file.suffix == ".toml":
+            if sys.version_info >= (3, 11):
+                import tomllib  # pylint: disable=import-outside-toplevel
+
+                job_document = tomllib.loads(job_file.read_text(encoding="utf-8"))
+            else:  # pragma: no cover
+                raise RuntimeError("TOML job files require Python 3.11 or newer.")
+        else:
+            job_document = json.loads(job_file.read_text(encoding="utf-8"))
+
+        jobs = job_document.get("jobs") if isinstance(job_document, dict) else None
+        if not isinstance(jobs, list) or len(jobs) == 0:
+            raise ValueError(f"{job_file} must contain a non-empty list of jobs.")
+
+        parsed_jobs = []
+        for job in jobs:
+            if not isinstance(job, dict) or not isinstance(job.get("args"), list):
+                raise ValueError(f"Each job in {job_file} must have a list of args: {job}")
+            job_args = self._parser.parse_args([str(arg) for arg in job["args"]])
+            job_args.job_cmdline = [str(arg) for arg in job["args"]]
+            if getattr(job_args, "job_file", None) is not None:
+                raise ValueError(f"Jobs in {job_file} cannot themselves use --job-file.")
+            for run_mode in ("dry_run", "list_inputs", "list_outputs", "list_configuration"):
+                if getattr(self._args, run_mode):
+                    setattr(job_args, run_mode, True)
+            parsed_jobs.append(job_args)
+        return parsed_jobs
+
+    def run(self) -> int:
+        """
+        Run each job in order and then list the combined results.
+        """
+        jobs = self.load_jobs()
+        profile = _create_profile(self._args)
+        with tempfile.TemporaryDirectory(prefix="nunavut-templates-") as shared_template_cache_dir:
+            job_listings = []
+            for job_index, job_args in enumerate(jobs):
+                logging.info("Running job %d of %d", job_index + 1, len(jobs))
+                self._prepare_job(job_args, Path(shared_template_cache_dir))
+                if profile is not None and _create_profile(job_args) is None:
+                    job_args.profile = profile
+                job_listings.append(StandardArgparseRunner(job_args).generate())
+                job_listings[-1]["args"] = job_args.job_cmdline
+        if profile is not None:
+            _report_profile(self._args, profile)
+
+        lister_object: Dict[str, Any] = {}
+        for listing_key in ("inputs", "outputs"):
+            if any(listing_key in job_listing for job_listing in job_listings):
+                lister_object[listing_key] = list(
+                    dict.fromkeys(itertools.chain(*(job_listing.get(listing_key, []) for job_listing in job_listings)))
+                )
+        if self._args.list_format not in ("csv", "scsv"):
+            lister_object["jobs"] = job_listings
+        Lister.get_lister(self._args.list_format, self._args.list_to_file).list(lister_object)
+
+        return 0
+
+    def _prepare_job(self, job_args: argparse.Namespace, shared_template_cache_dir: Path) -> None:
+        """
+        Set up the caches a job shares with the other jobs just before it runs.
+        """
+        if job_args.template_cache_dir is None:
+            job_args.template_cache_dir = shared_template_cache_dir
+        job_args.parse_store = self._get_parse_store(job_args)
+
+    def _get_parse_store(self, job_args: argparse.Namespace) -> "ParseResultStore":
+        """
+        The parse results shared by all jobs that parse DSDL the same way as the given job.
+        """
+        store_key = (
+            tuple(sorted(str(Path(d).resolve()) for d in job_args.root_namespace_directories_or_names)),
+            job_args.allow_unregulated_fixed_port_id,
+            job_args.parse_cache_dir,
+        )
+        if store_key not in self._parse_stores:
+            from .._generators import create_parse_store  # pylint: disable=import-outside-toplevel
+
+            self._parse_stores[store_key] = create_parse_store(
+                job_args.root_namespace_directories_or_names,
+                job_args.allow_unregulated_fixed_port_id,
+                job_args.parse_cache_dir,
+                job_args.parse_cache_max_size,
+                job_args.parse_cache_max_age,
+            )
+        return self._parse_stores[store_key]
+
+
 # --[ MAIN ]-----------------------------------------------------------------------------------------------------------
 def main(command_line_args: Optional[Any] = None) -> int:
     """
@@ -119,4 +424,26 @@ def main(command_line_args: Optional[Any] = None) -> int:
 
     logging.info("Running %s using sys.prefix: %s", Path(__file__).name, sys.prefix)
 
+    if getattr(args, "connect", None) is not None:
+        from .client import forward, split_connect_args  # pylint: disable=import-outside-toplevel
+
+        # The arguments were validated above so every --connect left in them is the option rather than a value.
+        _, forwarded_args = split_connect_args(sys.argv[1:] if command_line_args is None else command_line_args)
+        return forward(str(args.connect), forwarded_args)
+
+    if getattr(args, "serve", None) is not None:
+        from .server import serve  # pylint: disable=import-outside-toplevel
+
+        return serve(args.serve, parser)
+
+    if getattr(args, "watch", False):
+        from .watch import WatchRunner  # pylint: disable=import-outside-toplevel
+
+        return WatchRunner(
+            parser, sys.argv[1:] if command_line_args is None else command_line_args, args.watch_interval
+        ).run()
+
+    if getattr(args, "job_file", None) is not None:
+        return JobFileRunner(args, parser).run()
+
     return StandardArgparseRunner(args).run()
@@ -0,0 +1,233 @@
+#
+# Copyright (C) OpenCyphal Development Team  <opencyphal.org>
+# Copyright Amazon.com Inc. or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+"""
+Long-lived generation server started with ``nnvg --serve SOCKET``. The server keeps parsed DSDL and compiled
+templates in memory between requests so that repeated runs, sent by ``nnvg --connect SOCKET`` (see
+:mod:`nunavut.cli.client`), only parse DSDL files and compile templates that have changed since the last request.
+
+Requests and responses are single lines of JSON sent over a Unix domain socket. A request contains the command-line
+``args`` to run, the client's ``cwd``, and the ``env`` variables the client forwarded. The response contains the
+``returncode``, ``stdout``, and ``stderr`` of the request. Requests are run one at a time in the order they arrive.
+
+.. warning::
+
+    Anyone who can connect to the socket can generate files anywhere the server can write to. The socket is created
+    accessible only to the user running the server and should be placed in a directory other users cannot write to.
+
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import stat
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+
+from .._caches import ResidentParseResultStore
+from ..jinja.environment import CodeGenMemoryBytecodeCache
+from .client import forwarded_environment
+from .runners import JobFileRunner, StandardArgparseRunner
+
+if not hasattr(socket, "AF_UNIX"):  # pragma: no cover
+    raise ImportError("nnvg --serve requires support for Unix domain sockets.")
+
+_logger = logging.getLogger(__name__)
+
+
+class _ServerJobFileRunner(JobFileRunner):
+    """
+    Runs job files with the caches of a :class:`GenerationServer`.
+    """
+
+    def __init__(self, args: argparse.Namespace, parser: argparse.ArgumentParser, server: "GenerationServer"):
+        super().__init__(args, parser)
+        self._server = server
+
+    def _prepare_job(self, job_args: argparse.Namespace, shared_template_cache_dir: Path) -> None:
+        self._server.prepare_args(job_args)
+
+
+class _GenerationRequestHandler(socketserver.StreamRequestHandler):
+    server: "GenerationServer"
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+            response = self.server.run_request(request["args"], request["cwd"], request.get("env", {}))
+        except (ValueError, KeyError, TypeError) as e:
+            response = {"returncode": 2, "stdout": "", "stderr": f"Invalid request: {e}\n"}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class GenerationServer(socketserver.UnixStreamServer):
+    """
+    Runs nnvg command lines received over a Unix domain socket while keeping parse results and compiled templates in
+    memory between them. Parse results are kept for each distinct set of root namespace directories and are
+    revalidated at the start of each request (see :class:`nunavut._caches.ResidentParseResultStore`). Compiled
+    templates are recompiled when their source changes (see
+    :class:`nunavut.jinja.environment.CodeGenMemoryBytecodeCache`).
+
+    :param socket_path: The socket to listen on. A stale socket left behind by a server that is no longer running is
+        replaced.
+    :param argparse.ArgumentParser parser: The parser used to interpret the arguments of each request.
+    :raises RuntimeError: If another server is already listening on ``socket_path``.
+    """
+
+    def __init__(self, socket_path: Union[str, Path], parser: argparse.ArgumentParser):
+        self._socket_path = Path(socket_path)
+        self._parser = parser
+        self._parse_stores: Dict[Tuple[Any, ...], ResidentParseResultStore] = {}
+        self._bytecode_cache = CodeGenMemoryBytecodeCache()
+        self._remove_stale_socket()
+        previous_umask = os.umask(0o077)
+        try:
+            super().__init__(str(self._socket_path), _GenerationRequestHandler)
+        finally:
+            os.umask(previous_umask)
+
+    @property
+    def socket_path(self) -> Path:
+        """
+        The socket this server listens on.
+        """
+        return self._socket_path
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            self._socket_path.unlink()
+        except OSError:
+            pass
+
+    def prepare_args(self, args: argparse.Namespace) -> None:
+        """
+        Use this server's caches for a generation run.
+
+        :param argparse.Namespace args: The parsed arguments of the run.
+        """
+        args.template_bytecode_cache = self._bytecode_cache
+        store_key = (
+            tuple(sorted(str(Path(d).resolve()) for d in args.root_namespace_directories_or_names)),
+            args.allow_unregulated_fixed_port_id,
+        )
+        parse_store = self._parse_stores.get(store_key)
+        if parse_store is None:
+            parse_store = ResidentParseResultStore()
+            self._parse_stores[store_key] = parse_store
+        else:
+            parse_store.begin_run()
+        args.parse_store = parse_store
+
+    def run_request(self, args: List[str], cwd: str, env: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Run a command line in a given working directory and environment.
+
+        :param List[str] args: The command-line arguments, not including the program name.
+        :param str cwd: The directory to run in.
+        :param Dict[str, str] env: Values for the environment variables Nunavut reads. Any of these variables that
+            are not given are unset while the request runs.
+        :return: A dictionary with the ``returncode``, ``stdout``, and ``stderr`` of the request.
+        """
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        previous_cwd = os.getcwd()
+        previous_env = forwarded_environment()
+        try:
+            os.chdir(cwd)
+            self._set_environment(env)
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                returncode = self._run(args, stderr)
+        except OSError as e:
+            stderr.write(f"{e}\n")
+            returncode = 1
+        finally:
+            os.chdir(previous_cwd)
+            self._set_environment(previous_env)
+        return {"returncode": returncode, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+    # +--[PRIVATE]--------------------------------------------------------------------------------------------------+
+    def _remove_stale_socket(self) -> None:
+        try:
+            if not stat.S_ISSOCK(self._socket_path.stat().st_mode):
+                raise RuntimeError(f"{self._socket_path} exists and is not a socket.")
+        except FileNotFoundError:
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(str(self._socket_path))
+            except ConnectionRefusedError:
+                _logger.info("Removing stale socket %s", self._socket_path)
+                self._socket_path.unlink()
+                return
+        raise RuntimeError(f"Another server is already listening on {self._socket_path}.")
+
+    @staticmethod
+    def _set_environment(env: Dict[str, str]) -> None:
+        for name in forwarded_environment():
+            if name not in env:
+                del os.environ[name]
+        os.environ.update(env)
+
+    def _run(self, args: List[str], stderr: io.StringIO) -> int:
+        try:
+            parsed_args = self._parser.parse_args(args)
+        except SystemExit as e:
+            # Raised for invalid arguments and by --help and --version.
+            return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        if getattr(parsed_args, "serve", None) is not None or getattr(parsed_args, "watch", False):
+            stderr.write("--serve and --watch cannot be sent to a server.\n")
+            return 2
+        parsed_args.job_cmdline = list(args)
+
+        root_logger = logging.getLogger()
+        previous_handlers = root_logger.handlers[:]
+        previous_level = root_logger.level
+        request_handler = logging.StreamHandler(stderr)
+        request_handler.setFormatter(logging.Formatter("%(message)s"))
+        root_logger.handlers = [request_handler]
+        root_logger.setLevel({0: logging.WARNING, 1: logging.INFO}.get(parsed_args.verbose, logging.DEBUG))
+        try:
+            if getattr(parsed_args, "job_file", None) is not None:
+                return _ServerJobFileRunner(parsed_args, self._parser, self).run()
+            self.prepare_args(parsed_args)
+            return StandardArgparseRunner(parsed_args).run()
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logging.exception("Request failed: %s", " ".join(args))
+            return 1
+        finally:
+            root_logger.handlers = previous_handlers
+            root_logger.setLevel(previous_level)
+
+
+def serve(socket_path: Union[str, Path], parser: argparse.ArgumentParser) -> int:
+    """
+    Run a :class:`GenerationServer` until interrupted.
+
+    :param socket_path: The socket to listen on.
+    :param argparse.ArgumentParser parser: The parser used to interpret the arguments of each request.
+    :return: The exit status for the server process.
+    """
+
+    def _stop(signal_number: int, _: Any) -> None:
+        raise KeyboardInterrupt(f"Received signal {signal_number}")
+
+    # Stop on SIGTERM as well as Ctrl-C so the socket is removed.
+    signal.signal(signal.SIGTERM, _stop)
+    with GenerationServer(socket_path, parser) as server:
+        _logger.info("Serving generation requests on %s", server.socket_path)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
@@ -0,0 +1,249 @@
+#
+# Copyright (C) OpenCyphal Development Team  <opencyphal.org>
+# Copyright Amazon.com Inc. or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+"""
+Watch mode for ``nnvg --watch`` which regenerates outputs as DSDL and templates are edited.
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .._caches import ResidentParseResultStore
+from .._generators import GenerationResult, generate_all
+from ..jinja.environment import CodeGenMemoryBytecodeCache
+
+_logger = logging.getLogger(__name__)
+
+
+class WatchRunner:
+    """
+    Generates code and then polls the root namespace directories and template directories, regenerating whenever a
+    DSDL file or template changes. Parsed DSDL and compiled templates are kept in memory between generations so only
+    changed DSDL files, and the types that depend on them, are parsed again. Only outputs affected by a change are
+    rendered again:
+
+    * the outputs of types defined in, or depending on, a changed DSDL file.
+    * namespace and index files if any DSDL file changed.
+    * outputs generated from a changed template. If the changed template is not used to generate any output directly
+      (e.g. it is only included or imported by other templates) every output is generated again.
+    * outputs that are new or have been deleted.
+
+    Because the command line is interpreted again for each generation, DSDL files added to target directories are
+    picked up. Changes to any other files, such as configuration files, are not watched for.
+
+    .. invisible-code-block: python
+
+        from pathlib import Path
+        from nunavut.cli import _make_parser
+        from nunavut.cli.parsers import NunavutArgumentParser
+        from nunavut.cli.watch import WatchRunner
+
+        dsdl_dir = gen_paths_for_module.out_dir / Path("watched")
+        dsdl_dir.mkdir()
+        (dsdl_dir / Path("Thing.1.0.dsdl")).write_text("@sealed")
+        out_dir = gen_paths_for_module.out_dir / Path("watched_out")
+        argv = ["-l", "c", "--outdir", str(out_dir), str(dsdl_dir)]
+
+    .. code-block:: python
+
+        watcher = WatchRunner(_make_parser(NunavutArgumentParser), argv)
+
+        # The first poll generates everything.
+        assert watcher.poll()
+        assert (out_dir / Path("watched", "Thing_1_0.h")).exists()
+
+        # Later polls only generate again if something changed.
+        assert not watcher.poll()
+
+    :param argparse.ArgumentParser parser: The parser used to interpret ``argv``.
+    :param Sequence[str] argv: The command-line arguments to generate with, not including the program name. Any
+        ``--watch`` argument is ignored.
+    :param float interval: The number of seconds to wait between polls.
+    """
+
+    DEFAULT_INTERVAL_SECONDS = 0.5
+    """
+    The default time between polls.
+    """
+
+    def __init__(
+        self, parser: argparse.ArgumentParser, argv: Sequence[str], interval: float = DEFAULT_INTERVAL_SECONDS
+    ):
+        self._parser = parser
+        self._argv = [arg for arg in argv if arg != "--watch"]
+        self._interval = interval
+        self._stopped = threading.Event()
+        self._parse_store = ResidentParseResultStore()
+        self._bytecode_cache = CodeGenMemoryBytecodeCache()
+        self._snapshot: Optional[Dict[Path, Tuple[int, int]]] = None
+        self._result: Optional[GenerationResult] = None
+        # The template each output was generated from by the last generation.
+        self._output_templates: Dict[Path, Path] = {}
+        # Changes not yet handled by a successful generation.
+        self._changed_dsdl: Set[Path] = set()
+        self._changed_templates: Set[Path] = set()
+
+    @property
+    def result(self) -> Optional[GenerationResult]:
+        """
+        The result of the last successful generation.
+        """
+        return self._result
+
+    def run(self) -> int:
+        """
+        Poll for changes until :meth:`stop` is called or the process is interrupted.
+        """
+        try:
+            while not self._stopped.is_set():
+                self.poll()
+                self._stopped.wait(self._interval)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    def stop(self) -> None:
+        """
+        Stop :meth:`run`.
+        """
+        self._stopped.set()
+
+    def poll(self) -> bool:
+        """
+        Check for changes and generate again if any were found. Errors from parsing DSDL or rendering templates are
+        logged and the changes that caused them are retried by the next poll that finds further changes.
+
+        :return: True if outputs were generated.
+        """
+        args = self._parse_args()
+        if args is None:
+            return False
+        template_dirs = self._template_dirs(args)
+        snapshot = self._take_snapshot(
+            [Path(d) for d in args.root_namespace_directories_or_names if Path(d).is_dir()] + template_dirs
+        )
+        previous_snapshot = self._snapshot
+        if previous_snapshot is not None:
+            changed = {
+                path
+                for path in snapshot.keys() | previous_snapshot.keys()
+                if snapshot.get(path) != previous_snapshot.get(path)
+            }
+            if len(changed) == 0:
+                return False
+            self._classify_changes(changed, template_dirs)
+            if len(self._changed_dsdl) == 0 and len(self._changed_templates) == 0:
+                self._snapshot = snapshot
+                return False
+        self._snapshot = snapshot
+
+        self._parse_store.begin_run()
+        args.parse_store = self._parse_store
+        args.template_bytecode_cache = self._bytecode_cache
+        args.render_filter = self._create_render_filter()
+        try:
+            result = generate_all(**vars(args))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            _logger.error("Generation failed: %s", e)
+            _logger.debug("Generation failed.", exc_info=True)
+            return False
+
+        self._result = result
+        self._changed_dsdl.clear()
+        self._changed_templates.clear()
+        total = len(result.generated_files) + len(result.support_files)
+        _logger.info("Generated %d of %d files.", total - len(result.skipped_files), total)
+        return True
+
+    # +--[PRIVATE]--------------------------------------------------------------------------------------------------+
+    def _parse_args(self) -> Optional[argparse.Namespace]:
+        try:
+            return self._parser.parse_args(self._argv)
+        except SystemExit:
+            _logger.error("Invalid arguments: %s", " ".join(self._argv))
+            return None
+
+    @staticmethod
+    def _template_dirs(args: argparse.Namespace) -> List[Path]:
+        template_dirs: List[Path] = []
+        for templates_arg in ("templates_dir", "support_templates_dir"):
+            templates_dirs = getattr(args, templates_arg, None) or []
+            if not isinstance(templates_dirs, list):
+                templates_dirs = [templates_dirs]
+            template_dirs.extend(Path(templates_dir).resolve() for templates_dir in templates_dirs)
+        return template_dirs
+
+    @staticmethod
+    def _take_snapshot(directories: List[Path]) -> Dict[Path, Tuple[int, int]]:
+        """
+        The modification time and size of every file below the given directories.
+        """
+        snapshot: Dict[Path, Tuple[int, int]] = {}
+        for directory in directories:
+            for dir_path, _, file_names in os.walk(directory):
+                for file_name in file_names:
+                    file_path = Path(dir_path, file_name).resolve()
+                    try:
+                        stat = file_path.stat()
+                    except OSError:
+                        continue
+                    snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _classify_changes(self, changed: Set[Path], template_dirs: List[Path]) -> None:
+        dsdl_suffixes = getattr(self._parser, "DSDL_FILE_SUFFIXES", (".dsdl",))
+        for path in changed:
+            if any(template_dir in path.parents for template_dir in template_dirs):
+                _logger.info("Template changed: %s", path)
+                self._changed_templates.add(path)
+            elif path.suffix in dsdl_suffixes:
+                _logger.info("DSDL changed: %s", path)
+                self._changed_dsdl.add(path)
+
+    def _create_render_filter(self) -> Callable[[Path, Path], bool]:
+        """
+        Create a filter that selects the outputs affected by the changes found since the last successful generation.
+        """
+        previous = self._result
+        render_all = previous is None or any(
+            template not in self._output_templates.values() for template in self._changed_templates
+        )
+        affected_outputs: Set[Path] = set()
+        known_outputs: Set[Path] = set()
+        support_outputs: Set[Path] = set()
+        type_outputs: Set[Path] = set()
+        if previous is not None:
+            # Outputs are compared as plain paths since generatable paths also compare their types.
+            for output_path, target in previous.generator_targets.items():
+                for dsdl_type in [target.definition, *target.input_types]:
+                    if dsdl_type.source_file_path.resolve() in self._changed_dsdl:
+                        affected_outputs.add(Path(output_path))
+                        break
+            known_outputs.update(Path(p) for p in itertools.chain(previous.generated_files, previous.support_files))
+            support_outputs.update(Path(p) for p in previous.support_files)
+            type_outputs.update(Path(p) for p in previous.generator_targets.keys())
+        output_templates = self._output_templates
+        changed_templates = set(self._changed_templates)
+        dsdl_changed = len(self._changed_dsdl) > 0
+
+        def _render_filter(output_path: Path, template_path: Path) -> bool:
+            output_path = Path(output_path)
+            template_path = template_path.resolve()
+            output_templates[output_path] = template_path
+            if render_all or output_path not in known_outputs or not output_path.exists():
+                return True
+            if template_path in changed_templates or output_path in affected_outputs:
+                return True
+            if output_path in type_outputs or output_path in support_outputs:
+                return False
+            # Namespace and index files are generated from every type.
+            return dsdl_changed
+
+        return _render_filter
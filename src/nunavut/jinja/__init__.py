@@ -8,11 +8,19 @@ jinja-based :class:`~nunavut.generators.AbstractGenerator` implementation.
 """
 
 import abc
+import concurrent.futures
+import contextlib
+import contextvars
+import copy
 import datetime
-import io
+import filecmp
+import itertools
 import logging
+import multiprocessing
+import os
 import re
 import shutil
+import tempfile
 from pathlib import Path
 from typing import Any, Callable, Dict, Generator, Iterable, List, Mapping, Optional, TextIO, Tuple, Type, Union
 
@@ -22,12 +30,21 @@ import nunavut.lang
 
 from .._generators import AbstractGenerator
 from .._postprocessors import FilePostProcessor, LinePostProcessor, PostProcessor
+from .._profiling import GenerationProfile, active_profile, count, measure
 from .._utilities import TEMPLATE_SUFFIX, ResourceSearchPolicy, ResourceType, YesNoDefault
 from .environment import CodeGenEnvironment, CodeGenEnvironmentBuilder
+from .jinja2.bccache import BytecodeCache
 from .loaders import DEFAULT_TEMPLATE_PATH, DSDLSupportTemplateLoader, DSDLTemplateLoader
 
 logger = logging.getLogger(__name__)
 
+
+def _templates_dirs_as_list(templates_dir: Optional[Union[Path, List[Path]]]) -> Optional[List[Path]]:
+    if templates_dir is not None and not isinstance(templates_dir, list):
+        return [templates_dir]
+    return templates_dir
+
+
 # +---------------------------------------------------------------------------+
 # | JINJA : CodeGenerator
 # +---------------------------------------------------------------------------+
@@ -80,6 +97,24 @@ class CodeGenerator(AbstractGenerator):
     :type search_policy: ResourceSearchPolicy
     :param embed_auditing_info: If True then the generator will embed auditing information in the generated code.
     :type embed_auditing_info: bool
+    :param write_if_changed: If True then existing files are only replaced if their contents would change. Output is
+                                            rendered, and any file post-processors are run, on a temporary file next
+                                            to the existing one which is then compared to it. Unchanged files keep
+                                            their modification times and are listed in :attr:`skipped_files`.
+    :type write_if_changed: bool
+    :param template_cache_dir: If set, compiled templates are persisted in this directory and reused by later
+                                            generators instead of being compiled again. See
+                                            :class:`nunavut.jinja.environment.CodeGenBytecodeCache`.
+    :type template_cache_dir: Optional[Path]
+    :param template_bytecode_cache: A cache of compiled templates to share with other generators, for example a
+                                            :class:`nunavut.jinja.environment.CodeGenMemoryBytecodeCache`. If set,
+                                            ``template_cache_dir`` is ignored.
+    :type template_bytecode_cache: Optional[BytecodeCache]
+    :param render_filter: If set, this is called with the path of each file that would be generated and the path of
+                                            the template, or for copied support files the resource, it is generated
+                                            from. Files it returns False for are not generated and are listed in
+                                            :attr:`skipped_files`. This is not used for dry runs.
+    :type render_filter: Optional[Callable[[Path, Path], bool]]
     :raises RuntimeError: If any additional filter or test attempts to replace a built-in
                           or otherwise already defined filter or test.
     """
@@ -166,12 +201,19 @@ class CodeGenerator(AbstractGenerator):
         builtin_template_path: str = DEFAULT_TEMPLATE_PATH,
         search_policy: ResourceSearchPolicy = ResourceSearchPolicy.FIND_ALL,
         embed_auditing_info: bool = False,
+        write_if_changed: bool = False,
+        template_cache_dir: Optional[Path] = None,
+        template_bytecode_cache: Optional[BytecodeCache] = None,
+        render_filter: Optional[Callable[[Path, Path], bool]] = None,
         **kwargs: Any,
     ):
         super().__init__(namespace, resource_types, generate_namespace_types, **kwargs)
+        self._write_if_changed = write_if_changed
+        self._render_filter = render_filter
+        # Files waiting for a batched file post-processor, given as an index into the file post-processors.
+        self._deferred_files: List[Tuple[Path, int]] = []
 
-        if templates_dir is not None and not isinstance(templates_dir, list):
-            templates_dir = [templates_dir]
+        templates_dir = _templates_dirs_as_list(templates_dir)
 
         language_context = self._namespace.get_language_context()
         target_language = language_context.get_target_language()
@@ -179,32 +221,37 @@ class CodeGenerator(AbstractGenerator):
         if template_loader is None:
             template_loader = DSDLTemplateLoader
 
-        self._dsdl_template_loader = template_loader(
-            namespace=namespace,
-            resource_types=resource_types,
-            templates_dirs=templates_dir,
-            followlinks=followlinks,
-            builtin_template_path=builtin_template_path,
-            search_policy=search_policy,
-            **kwargs,
-        )
-
         self._post_processors = self._handle_post_processors(target_language, post_processors)
 
-        env_builder = (
-            CodeGenEnvironmentBuilder(self._dsdl_template_loader)
-            .set_trim_blocks(trim_blocks)
-            .set_lstrip_blocks(lstrip_blocks)
-        )
-        if additional_filters is not None:
-            env_builder.add_filters(**additional_filters)
-        if additional_tests is not None:
-            env_builder.add_tests(**additional_tests)
-        if additional_globals is not None:
-            env_builder.add_globals(**additional_globals)
-        env_builder.set_embed_auditing_info(embed_auditing_info)
+        with measure("environment"):
+            self._dsdl_template_loader = template_loader(
+                namespace=namespace,
+                resource_types=resource_types,
+                templates_dirs=templates_dir,
+                followlinks=followlinks,
+                builtin_template_path=builtin_template_path,
+                search_policy=search_policy,
+                **kwargs,
+            )
 
-        self._env = env_builder.create(language_context)
+            env_builder = (
+                CodeGenEnvironmentBuilder(self._dsdl_template_loader)
+                .set_trim_blocks(trim_blocks)
+                .set_lstrip_blocks(lstrip_blocks)
+            )
+            if additional_filters is not None:
+                env_builder.add_filters(**additional_filters)
+            if additional_tests is not None:
+                env_builder.add_tests(**additional_tests)
+            if additional_globals is not None:
+                env_builder.add_globals(**additional_globals)
+            env_builder.set_embed_auditing_info(embed_auditing_info)
+            env_builder.set_bytecode_cache_dir(template_cache_dir)
+            env_builder.set_bytecode_cache(template_bytecode_cache)
+            profile = active_profile()
+            env_builder.set_instrument_template_calls(profile is not None and profile.records_template_calls)
+
+            self._env = env_builder.create(language_context)
 
     @property
     def dsdl_loader(self) -> DSDLTemplateLoader:
@@ -237,6 +284,106 @@ class CodeGenerator(AbstractGenerator):
             else:
                 raise PermissionError("{output_path} exists and allow_overwrite is False.")
 
+    def _write_output(
+        self,
+        output_path: Path,
+        write_content: Callable[[Path], None],
+        allow_overwrite: bool,
+        file_pps: List["FilePostProcessor"],
+    ) -> Path:
+        """
+        Writes a file using ``write_content`` and then runs the file post-processors on it. If this generator was
+        created with ``write_if_changed`` and the file exists then the new content is produced in a temporary file
+        and the existing file is only replaced if the two differ. Batched post-processors are then run on each file
+        immediately since the comparison needs their output.
+        """
+        with measure("write"):
+            if not self._write_if_changed or not output_path.is_file():
+                self._handle_overwrite(output_path, allow_overwrite)
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                write_content(output_path)
+                count("files_written")
+                return self._run_file_post_processors(output_path, file_pps)
+
+            if not allow_overwrite:
+                self._handle_overwrite(output_path, allow_overwrite)
+
+            # The temporary file shares the directory and extension of the output so post-processors that depend on
+            # either (e.g. clang-format) behave the same as they would for the output file itself.
+            handle, temp_name = tempfile.mkstemp(
+                dir=output_path.parent, prefix=f".{output_path.stem}.", suffix=output_path.suffix
+            )
+            os.close(handle)
+            temp_path = Path(temp_name)
+            try:
+                write_content(temp_path)
+                temp_path.chmod(output_path.stat().st_mode | 0o220)
+                for file_pp in file_pps:
+                    with measure("file_post_processing", type(file_pp).__name__):
+                        temp_path = file_pp(temp_path)
+                if filecmp.cmp(temp_path, output_path, shallow=False):
+                    logger.debug("%s is unchanged.", output_path)
+                    self._skipped_files.append(output_path)
+                    count("files_unchanged")
+                else:
+                    self._handle_overwrite(output_path, allow_overwrite)
+                    os.replace(temp_path, output_path)
+                    count("files_written")
+            finally:
+                temp_path.unlink(missing_ok=True)
+                Path(temp_name).unlink(missing_ok=True)
+            return output_path
+
+    def _should_render(self, output_path: Path, template_path: Path) -> bool:
+        """
+        Applies the render filter, if any, to a file that is about to be generated. Files the filter excludes are
+        recorded as skipped.
+        """
+        if self._render_filter is None or self._render_filter(output_path, template_path):
+            return True
+        logger.debug("%s is not affected by any changes.", output_path)
+        self._skipped_files.append(output_path)
+        count("files_not_rendered")
+        return False
+
+    def _template_path(self, template_name: str) -> Path:
+        """
+        The file a template is loaded from or, for templates that are not loaded from files, its name.
+        """
+        template_file = self._env.get_template(template_name).filename
+        return Path(template_name if template_file is None else template_file)
+
+    def _run_file_post_processors(self, output_path: Path, file_pps: List["FilePostProcessor"], start: int = 0) -> Path:
+        """
+        Runs file post-processors, beginning at index ``start``, on a generated file. When a batched post-processor is
+        reached the file is deferred, along with all remaining post-processors, until
+        :meth:`_process_deferred_files` is called.
+        """
+        for pp_index in range(start, len(file_pps)):
+            if file_pps[pp_index].batched:
+                self._deferred_files.append((output_path, pp_index))
+                break
+            with measure("file_post_processing", type(file_pps[pp_index]).__name__):
+                output_path = file_pps[pp_index](output_path)
+        return output_path
+
+    def _process_deferred_files(self) -> None:
+        """
+        Hands all deferred files to their batched post-processors and then runs the remaining post-processors on each.
+        """
+        file_pps = [pp for pp in (self._post_processors or []) if isinstance(pp, FilePostProcessor)]
+        while len(self._deferred_files) > 0:
+            deferred_files: Dict[int, List[Path]] = {}
+            for output_path, pp_index in self._deferred_files:
+                deferred_files.setdefault(pp_index, []).append(output_path)
+            self._deferred_files.clear()
+            for pp_index, output_paths in sorted(deferred_files.items()):
+                logger.debug("Running %r on %d files.", file_pps[pp_index], len(output_paths))
+                with measure("file_post_processing", type(file_pps[pp_index]).__name__):
+                    processed_files = file_pps[pp_index].process_files(output_paths)
+                for output_path in processed_files:
+                    self._run_file_post_processors(output_path, file_pps, pp_index + 1)
+
     # +-----------------------------------------------------------------------+
     # | AbstractGenerator
     # +-----------------------------------------------------------------------+
@@ -262,22 +409,38 @@ class CodeGenerator(AbstractGenerator):
     # | PRIVATE
     # +-----------------------------------------------------------------------+
 
+    # Rendered text is buffered until at least this many characters are available before it is split into lines and
+    # handed to line post-processors.
+    _LINE_BATCH_SIZE = 64 * 1024
+
     @staticmethod
-    def _filter_and_write_line(
-        line_and_lineend: Tuple[str, str],
+    def _filter_and_write_lines(
+        text: str,
         output_file: TextIO,
         line_pps: List["LinePostProcessor"],
-    ) -> None:
+        ends_with_line: bool = False,
+    ) -> str:
+        """
+        Split text into lines, run them through all line post-processors as a batch, and write the results.
+
+        :param text: The text to process.
+        :param output_file: The file to write processed lines to.
+        :param line_pps: The line post-processors to apply in order.
+        :param ends_with_line: If True then any text after the last newline is processed as a line ending with a
+            newline that is not part of ``text``.
+        :return: Any text after the last newline that was not processed.
+        """
+        raw_lines = text.split("\n")
+        remainder = raw_lines.pop()
+        lines = [(line[:-1], "\r\n") if line.endswith("\r") else (line, "\n") for line in raw_lines]
+        if ends_with_line:
+            lines.append((remainder, "\n"))
+            remainder = ""
         for line_pp in line_pps:
-            line_and_lineend = line_pp(line_and_lineend)
-            if line_and_lineend is None:
-                raise ValueError(
-                    "line post processor must return a 2-tuple. To elide a line return a tuple of empty"
-                    "strings. None is not a valid value."
-                )
-
-        output_file.write(line_and_lineend[0])
-        output_file.write(line_and_lineend[1])
+            with measure("line_post_processing", type(line_pp).__name__):
+                lines = line_pp.process_lines(lines)
+        output_file.write("".join(itertools.chain.from_iterable(lines)))
+        return remainder
 
     @classmethod
     def _generate_with_line_buffer(
@@ -286,38 +449,44 @@ class CodeGenerator(AbstractGenerator):
         template_gen: Generator[str, None, None],
         line_pps: List["LinePostProcessor"],
     ) -> None:
-        newline_pattern = re.compile(r"\n|\r\n", flags=re.MULTILINE)
-        line_buffer = io.StringIO()
+        remainder = ""
+        parts: List[str] = []
+        parts_size = 0
         for part in template_gen:
-            search_pos = 0  # type: int
-            match_obj = newline_pattern.search(part, search_pos)
-            while True:
-                if search_pos < 0 or search_pos >= len(part):
-                    break
-                if match_obj is None:
-                    line_buffer.write(part[search_pos:])
-                    break
-
-                # We have a newline
-                line_buffer.write(part[search_pos : match_obj.start()])
-                newline_chars = part[match_obj.start() : match_obj.end()]
-                line = line_buffer.getvalue()  # type: str
-                line_buffer = io.StringIO()
-                cls._filter_and_write_line((line, newline_chars), output_file, line_pps)
-                search_pos = match_obj.end()
-                match_obj = newline_pattern.search(part, search_pos)
-        remainder = line_buffer.getvalue()
+            if len(part) == 0:
+                continue
+            if part[0] == "\n" and (parts[-1] if len(parts) > 0 else remainder).endswith("\r"):
+                # Lines end with "\n" or "\r\n" but, where rendered output is split between the two characters,
+                # the "\r" has always been treated as part of the line.
+                remainder = cls._filter_and_write_lines(remainder + "".join(parts), output_file, line_pps, True)
+                parts.clear()
+                parts_size = 0
+                part = part[1:]
+            parts.append(part)
+            parts_size += len(part)
+            if parts_size >= cls._LINE_BATCH_SIZE:
+                remainder = cls._filter_and_write_lines(remainder + "".join(parts), output_file, line_pps)
+                parts.clear()
+                parts_size = 0
+        remainder = cls._filter_and_write_lines(remainder + "".join(parts), output_file, line_pps)
         if len(remainder) > 0:
-            cls._filter_and_write_line((remainder, ""), output_file, line_pps)
+            lines = [(remainder, "")]
+            for line_pp in line_pps:
+                with measure("line_post_processing", type(line_pp).__name__):
+                    lines = line_pp.process_lines(lines)
+            output_file.write("".join(itertools.chain.from_iterable(lines)))
 
     def _generate_code(
         self,
         output_path: Path,
         template_gen: Generator[str, None, None],
         allow_overwrite: bool,
+        template_name: Optional[str] = None,
+        render_item: Optional[str] = None,
     ) -> None:
         """
-        Logic that should run from _generate_type iff is_dryrun is False.
+        Logic that should run from _generate_type iff is_dryrun is False. ``template_name`` and ``render_item``, which
+        defaults to the name of the output file, identify the render when profiling.
         """
 
         try:
@@ -327,8 +496,13 @@ class CodeGenerator(AbstractGenerator):
 
         from ..lang._common import UniqueNameGenerator  # pylint: disable=import-outside-toplevel
 
-        # reset the name generator state for this type
-        UniqueNameGenerator.reset()
+        # give this render its own name generator state
+        template_gen = UniqueNameGenerator.scoped(template_gen)
+        if active_profile() is not None:
+            # Rendering the whole file before writing any of it lets rendering be measured apart from writing.
+            with measure("render", render_item or output_path.name, template_name):
+                rendered = list(template_gen)
+            template_gen = (part for part in rendered)
 
         # Predetermine the post processor types.
         line_pps = []  # type: List['LinePostProcessor']
@@ -343,17 +517,16 @@ class CodeGenerator(AbstractGenerator):
                     raise ValueError(f"PostProcessor type {type(pp)} is unknown.")
         logger.debug("Using post-processors: %r %r", line_pps, file_pps)
 
-        self._handle_overwrite(output_path, allow_overwrite)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(str(output_path), "w", encoding="utf-8") as output_file:
-            if len(line_pps) > 0:
-                # The logic gets much more complex when doing line post-processing.
-                self._generate_with_line_buffer(output_file, template_gen, line_pps)
-            else:
-                for part in template_gen:
-                    output_file.write(part)
-        for file_pp in file_pps:
-            output_path = file_pp(output_path)
+        def _write_content(content_path: Path) -> None:
+            with open(str(content_path), "w", encoding="utf-8") as output_file:
+                if len(line_pps) > 0:
+                    # The logic gets much more complex when doing line post-processing.
+                    self._generate_with_line_buffer(output_file, template_gen, line_pps)
+                else:
+                    for part in template_gen:
+                        output_file.write(part)
+
+        self._write_output(output_path, _write_content, allow_overwrite, file_pps)
 
 
 # +---------------------------------------------------------------------------+
@@ -365,6 +538,16 @@ class DSDLCodeGenerator(CodeGenerator):
     """
     :class:`~CodeGenerator` implementation that generates code for a given set
     of DSDL types.
+
+    :param int jobs: The number of workers to render types with if ``render_processes`` or ``render_threads`` is set.
+        0 uses one worker per CPU and 1 renders all types in the current process.
+    :param bool render_processes: If True then types are rendered by ``jobs`` worker processes. Worker processes are
+        forked from the current process so each inherits this generator's fully configured environment rather than
+        building its own per type. Each worker still compiles the templates it uses, so this pays off for large sets
+        of types. Where ``fork`` is not available types are always rendered in the current process.
+    :param bool render_threads: If True then ``jobs`` threads in the current process are used to render types instead
+        of worker processes. All threads share this generator's environment. Each type is rendered with its own copy
+        of any post-processors.
     """
 
     # +-----------------------------------------------------------------------+
@@ -770,8 +953,19 @@ class DSDLCodeGenerator(CodeGenerator):
 
     # +-----------------------------------------------------------------------+
 
-    def __init__(self, namespace: nunavut.Namespace, resource_types: int = ResourceType.ANY.value, **kwargs: Any):
+    def __init__(
+        self,
+        namespace: nunavut.Namespace,
+        resource_types: int = ResourceType.ANY.value,
+        jobs: int = 1,
+        render_processes: bool = False,
+        render_threads: bool = False,
+        **kwargs: Any,
+    ):
         super().__init__(namespace, resource_types=resource_types, **kwargs)
+        self._jobs = jobs
+        self._render_processes = render_processes
+        self._render_threads = render_threads
         for test_name, test in self._create_all_dsdl_tests().items():
             self._env.add_test(test_name, test)
         self._env.add_conventional_methods_to_environment(self)
@@ -797,11 +991,36 @@ class DSDLCodeGenerator(CodeGenerator):
             # types that would have been generated.
             is_dryrun = True
         provider = self.namespace.get_all_types if self.generate_namespace_types else self.namespace.get_all_datatypes
-        for parsed_type, output_path in provider():
-            logger.info("Generating: %s", parsed_type)
-            generated.append(self._generate_type(parsed_type, output_path, is_dryrun, allow_overwrite))
+        work = list(provider())
+        if is_dryrun or self._render_filter is None:
+            render_work = work
+        else:
+            render_work = [
+                (parsed_type, output_path)
+                for parsed_type, output_path in work
+                if self._should_render(output_path, self._template_path(self.filter_type_to_template(parsed_type)))
+            ]
+        processes = min(self._jobs if self._jobs > 0 else (os.cpu_count() or 1), len(render_work))
+        parallel_method: Optional[Callable[[List[Tuple[Any, Path]], int, bool], List[Path]]]
+        if is_dryrun or processes <= 1:
+            parallel_method = None
+        elif self._render_threads:
+            parallel_method = self._generate_types_in_threads
+        elif self._render_processes and "fork" in multiprocessing.get_all_start_methods():
+            parallel_method = self._generate_types_in_pool
+        else:
+            parallel_method = None
+
+        if parallel_method is None:
+            for parsed_type, output_path in render_work:
+                logger.info("Generating: %s", parsed_type)
+                self._generate_type(parsed_type, output_path, is_dryrun, allow_overwrite)
+        else:
+            parallel_method(render_work, processes, allow_overwrite)
+        generated.extend(output_path for _, output_path in work)
 
         generated.extend(self._generate_index_files(is_dryrun, allow_overwrite))
+        self._process_deferred_files()
         return generated
 
     # +-----------------------------------------------------------------------+
@@ -870,6 +1089,55 @@ class DSDLCodeGenerator(CodeGenerator):
         all_tests.update(cls._create_instance_tests_for_type(pydsdl.Attribute))
         return all_tests
 
+    def _generate_types_in_pool(
+        self, work: List[Tuple[Any, Path]], processes: int, allow_overwrite: bool
+    ) -> List[Path]:
+        """
+        Render each type in a pool of forked worker processes. Workers are only sent indices into ``work`` and only
+        return whether the output was skipped, and any files deferred for batched post-processors, so no types or
+        environments are pickled. Results are returned in the order of ``work`` so the output is the same as when
+        rendering in the current process.
+        """
+        global _worker_state  # pylint: disable=global-statement
+        _worker_state = (self, work, allow_overwrite)
+        try:
+            with multiprocessing.get_context("fork").Pool(processes=processes) as pool:
+                # Several types per task amortize the cost of each round-trip to the workers.
+                chunksize = max(1, len(work) // (processes * 4))
+                profile = active_profile()
+                for work_index, (skipped, deferred_files, worker_profile) in enumerate(
+                    pool.imap(_generate_type_in_worker, range(len(work)), chunksize)
+                ):
+                    if skipped:
+                        self._skipped_files.append(work[work_index][1])
+                    self._deferred_files.extend(deferred_files)
+                    if profile is not None and worker_profile is not None:
+                        profile.merge(worker_profile)
+        finally:
+            _worker_state = None
+        return [output_path for _, output_path in work]
+
+    def _generate_types_in_threads(
+        self, work: List[Tuple[Any, Path]], threads: int, allow_overwrite: bool
+    ) -> List[Path]:
+        """
+        Render each type using a pool of threads. Results are returned in the order of ``work``.
+        """
+
+        def _generate_type_in_thread(work_item: Tuple[Any, Path]) -> Path:
+            parsed_type, output_path = work_item
+            logger.info("Generating: %s", parsed_type)
+            # Line post-processors may keep state between lines so each render gets its own.
+            renderer = copy.copy(self)
+            if self._post_processors is not None:
+                renderer._post_processors = [copy.copy(pp) for pp in self._post_processors]
+            return renderer._generate_type(parsed_type, output_path, False, allow_overwrite)
+
+        # Each render runs in a copy of the current context so that it is recorded in any active profile.
+        contexts = [contextvars.copy_context() for _ in work]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+            return list(executor.map(lambda c, w: c.run(_generate_type_in_thread, w), contexts, work))
+
     def _generate_type(
         self, input_type: pydsdl.CompositeType, output_path: Path, is_dryrun: bool, allow_overwrite: bool
     ) -> Path:
@@ -877,7 +1145,7 @@ class DSDLCodeGenerator(CodeGenerator):
         template = self._env.get_template(template_name)
         template_gen = template.generate(T=input_type)
         if not is_dryrun:
-            self._generate_code(output_path, template_gen, allow_overwrite)
+            self._generate_code(output_path, template_gen, allow_overwrite, template_name, str(input_type))
         return output_path
 
     def _generate_index_files(
@@ -904,11 +1172,49 @@ class DSDLCodeGenerator(CodeGenerator):
             if len(index_file.suffix) == 0:
                 index_file_output = index_file_output.with_suffix(target_extension)
             output_paths.append(index_file_output)
-            if not is_dryrun:
-                self._generate_code(index_file_output, template_gen, allow_overwrite)
+            if not is_dryrun and self._should_render(index_file_output, self._template_path(template_name.name)):
+                self._generate_code(index_file_output, template_gen, allow_overwrite, template_name.name)
         return output_paths
 
 
+_worker_state: Optional[Tuple[DSDLCodeGenerator, List[Tuple[Any, Path]], bool]] = None
+"""
+The generator, work list, and overwrite flag inherited by forked rendering workers.
+"""
+
+
+def _generate_type_in_worker(
+    work_index: int,
+) -> Tuple[bool, List[Tuple[Path, int]], Optional[Dict[str, Any]]]:
+    """
+    Renders one item of the work list held in :data:`_worker_state` within a forked worker process.
+
+    :return: True if the output was left untouched because it had not changed, the files deferred for batched
+        post-processors, which the parent process must run, and, if the parent process is profiling, what was
+        recorded while rendering.
+    """
+    if _worker_state is None:
+        raise RuntimeError("Rendering worker was started without a generator.")
+    generator, work, allow_overwrite = _worker_state
+    parsed_type, output_path = work[work_index]
+    logger.info("Generating: %s", parsed_type)
+    skipped_count = len(generator.skipped_files)
+    # The worker's copy of the parent's profile is replaced so only this render is sent back.
+    parent_profile = active_profile()
+    worker_profile = (
+        None if parent_profile is None else GenerationProfile(template_calls=parent_profile.records_template_calls)
+    )
+    with worker_profile.activate() if worker_profile is not None else contextlib.nullcontext():
+        generator._generate_type(parsed_type, output_path, False, allow_overwrite)  # pylint: disable=protected-access
+    deferred_files = list(generator._deferred_files)  # pylint: disable=protected-access
+    generator._deferred_files.clear()  # pylint: disable=protected-access
+    return (
+        len(generator.skipped_files) > skipped_count,
+        deferred_files,
+        None if worker_profile is None else worker_profile.as_dict(),
+    )
+
+
 # +---------------------------------------------------------------------------+
 # | JINJA : SupportGenerator
 # +---------------------------------------------------------------------------+
@@ -984,6 +1290,9 @@ class SupportGenerator(CodeGenerator):
 
         for resource in self.get_templates():
             target = (target_path / resource.name).with_suffix(target_language.extension)
+            if not is_dryrun and not self._should_render(target, resource):
+                generated.append(target)
+                continue
             logger.info("Generating support file: %s", target)
             if resource.suffix == TEMPLATE_SUFFIX:
                 self._generate_header(resource, target, is_dryrun, allow_overwrite)
@@ -991,6 +1300,7 @@ class SupportGenerator(CodeGenerator):
             else:
                 self._copy_header(resource, target, is_dryrun, allow_overwrite, line_pps, file_pps)
                 generated.append(target)
+        self._process_deferred_files()
         return generated
 
     # +-----------------------------------------------------------------------+
@@ -1001,7 +1311,7 @@ class SupportGenerator(CodeGenerator):
         template = self._env.get_template(template_path.name)
         template_gen = template.generate()
         if not is_dryrun:
-            self._generate_code(output_path, template_gen, allow_overwrite)
+            self._generate_code(output_path, template_gen, allow_overwrite, template_path.name)
         return output_path
 
     def _copy_header(
@@ -1014,14 +1324,14 @@ class SupportGenerator(CodeGenerator):
         file_pps: List["FilePostProcessor"],
     ) -> Path:
         if not is_dryrun:
-            self._handle_overwrite(target, allow_overwrite)
-            target.parent.mkdir(parents=True, exist_ok=True)
-            if len(line_pps) == 0:
-                shutil.copy(str(resource), str(target))
-            else:
-                self._copy_header_using_line_pps(resource, target, line_pps)
-            for file_pp in file_pps:
-                target = file_pp(target)
+
+            def _write_content(content_path: Path) -> None:
+                if len(line_pps) == 0:
+                    shutil.copy(str(resource), str(content_path))
+                else:
+                    self._copy_header_using_line_pps(resource, content_path, line_pps)
+
+            target = self._write_output(target, _write_content, allow_overwrite, file_pps)
         return target
 
     def _copy_header_using_line_pps(
@@ -1041,3 +1351,126 @@ class SupportGenerator(CodeGenerator):
                         resource_line_tuple = line_pp(resource_line_tuple)
                     target_file.write(resource_line_tuple[0])
                     target_file.write(resource_line_tuple[1])
+
+
+# +---------------------------------------------------------------------------+
+# | JINJA : Listing generators
+# +---------------------------------------------------------------------------+
+
+
+class DSDLCodeListingGenerator(AbstractGenerator):
+    """
+    Lists the files :class:`DSDLCodeGenerator` generates, and the templates it uses, without creating a template
+    environment or loading any template. This makes dry runs that only list files, like those a build system runs
+    when it is configured, cheaper. Nothing is ever written so ``generate_all`` always behaves as a dry run.
+
+    :param nunavut.Namespace namespace: The namespace to list the outputs of.
+    :param int resource_types: A bitmask of resources to generate. This can be a combination of ResourceType values.
+    :param templates_dir: Directories to load user templates from, as for :class:`DSDLCodeGenerator`.
+    :param bool followlinks: Argument passed on to the template loader.
+    :param ResourceSearchPolicy search_policy: How templates are searched for, as for :class:`DSDLCodeGenerator`.
+    :param Any kwargs: Arguments forwarded to :class:`~nunavut._generators.AbstractGenerator`. Arguments that only
+        change how files are rendered are ignored.
+    """
+
+    def __init__(
+        self,
+        namespace: nunavut.Namespace,
+        resource_types: int = ResourceType.ANY.value,
+        templates_dir: Optional[Union[Path, List[Path]]] = None,
+        followlinks: bool = False,
+        search_policy: ResourceSearchPolicy = ResourceSearchPolicy.FIND_ALL,
+        **kwargs: Any,
+    ):
+        super().__init__(namespace, resource_types, **kwargs)
+        self._dsdl_template_loader = DSDLTemplateLoader(
+            namespace=namespace,
+            templates_dirs=_templates_dirs_as_list(templates_dir),
+            followlinks=followlinks,
+            search_policy=search_policy,
+        )
+
+    def get_templates(self) -> Iterable[Path]:
+        if (self.resource_types & ResourceType.ONLY.value) == ResourceType.ONLY.value:
+            return []
+        return self._dsdl_template_loader.get_templates()
+
+    def generate_all(
+        self,
+        is_dryrun: bool = False,
+        allow_overwrite: bool = True,
+    ) -> Iterable[Path]:
+        listed = []  # type: List[Path]
+        provider = self.namespace.get_all_types if self.generate_namespace_types else self.namespace.get_all_datatypes
+        for parsed_type, output_path in provider():
+            # Missing templates are reported as DSDLCodeGenerator reports them, even though none are loaded.
+            if self._dsdl_template_loader.type_to_template(type(parsed_type)) is None:
+                raise RuntimeError(f"No template found for type {parsed_type}")
+            listed.append(output_path)
+
+        index_file_path = self.namespace.get_index_namespace().output_folder
+        target_extension = (
+            self.namespace.get_language_context()
+            .get_target_language()
+            .get_config_value(nunavut.lang.Language.WKCV_DEFINITION_FILE_EXTENSION)
+        )
+        for index_file in self.index_files:
+            if self._dsdl_template_loader.index_file_to_template(index_file) is None:
+                raise RuntimeError(f"No template found for index file {index_file}")
+            index_file_output = index_file_path / index_file
+            if len(index_file.suffix) == 0:
+                index_file_output = index_file_output.with_suffix(target_extension)
+            listed.append(index_file_output)
+        return listed
+
+
+class SupportListingGenerator(AbstractGenerator):
+    """
+    Lists the files :class:`SupportGenerator` generates, and the templates and support files it uses, without creating
+    a template environment or loading any template. Nothing is ever written so ``generate_all`` always behaves as a
+    dry run.
+
+    :param nunavut.Namespace namespace: The namespace to list the support outputs of.
+    :param int resource_types: A bitmask of resources to generate. This can be a combination of ResourceType values.
+    :param templates_dir: Directories to load user support templates from, as for :class:`SupportGenerator`.
+    :param bool followlinks: Argument passed on to the template loader.
+    :param ResourceSearchPolicy search_policy: How templates are searched for, as for :class:`SupportGenerator`.
+    :param Any kwargs: Arguments forwarded to :class:`~nunavut._generators.AbstractGenerator`. Arguments that only
+        change how files are rendered are ignored.
+    """
+
+    def __init__(
+        self,
+        namespace: nunavut.Namespace,
+        resource_types: int,
+        templates_dir: Optional[Union[Path, List[Path]]] = None,
+        followlinks: bool = False,
+        search_policy: ResourceSearchPolicy = ResourceSearchPolicy.FIND_ALL,
+        **kwargs: Any,
+    ):
+        super().__init__(namespace, resource_types, **kwargs)
+        self._dsdl_template_loader = DSDLSupportTemplateLoader(
+            namespace=namespace,
+            resource_types=resource_types,
+            templates_dirs=_templates_dirs_as_list(templates_dir),
+            followlinks=followlinks,
+            builtin_template_path="support",
+            search_policy=search_policy,
+        )
+        self._sub_folders = Path(*namespace.get_language_context().get_target_language().support_namespace)
+
+    def get_templates(self) -> Iterable[Path]:
+        if self.resource_types == 0:
+            return []
+        return self._dsdl_template_loader.get_templates()
+
+    def generate_all(
+        self,
+        is_dryrun: bool = False,
+        allow_overwrite: bool = True,
+    ) -> Iterable[Path]:
+        target_language = self.namespace.get_language_context().get_target_language()
+        target_path = Path(self.namespace.get_index_namespace().base_output_path) / self._sub_folders
+        return [
+            (target_path / resource.name).with_suffix(target_language.extension) for resource in self.get_templates()
+        ]
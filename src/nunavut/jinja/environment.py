@@ -10,11 +10,16 @@ Jinja environment for Nunavut code generation.
 """
 
 import datetime
+import hashlib
 import inspect
+import json
 import logging
+import os
 import platform
 import sys
+import tempfile
 import types
+from pathlib import Path
 from typing import (
     AbstractSet,
     Any,
@@ -31,11 +36,14 @@ from typing import (
     cast,
 )
 
+from nunavut._profiling import count, instrument_template_call, measure
 from nunavut._templates import LanguageEnvironment
+from nunavut._version import __version__
 from nunavut.lang import Language, LanguageClassLoader, LanguageContext
 
 from .extensions import JinjaAssert, UseQuery
-from .jinja2 import BaseLoader, Environment, StrictUndefined, select_autoescape
+from .jinja2 import BaseLoader, BytecodeCache, Environment, FileSystemBytecodeCache, StrictUndefined, select_autoescape
+from .jinja2.bccache import Bucket
 from .jinja2.ext import Extension
 from .jinja2.ext import do as jinja_do
 from .jinja2.ext import loopcontrols
@@ -148,6 +156,175 @@ class LanguageTemplateNamespace:
 # +---------------------------------------------------------------------------+
 # | JINJA : CodeGenEnvironment
 # +---------------------------------------------------------------------------+
+def _get_compile_settings(environment: Environment) -> Tuple[Any, ...]:
+    """
+    The environment settings that change how templates are compiled.
+    """
+    return (
+        environment.block_start_string,
+        environment.block_end_string,
+        environment.variable_start_string,
+        environment.variable_end_string,
+        environment.comment_start_string,
+        environment.comment_end_string,
+        environment.line_statement_prefix,
+        environment.line_comment_prefix,
+        environment.trim_blocks,
+        environment.lstrip_blocks,
+        environment.newline_sequence,
+        environment.keep_trailing_newline,
+        sorted(environment.extensions.keys()),
+    )
+
+
+class CodeGenBytecodeCache(FileSystemBytecodeCache):
+    """
+    Persistent cache of compiled templates shared between Nunavut invocations.
+
+    Jinja already discards cached bytecode if the template source checksum differs. This cache also keys each entry
+    on the Nunavut version and on the environment settings that change how templates are compiled, writes entries
+    atomically so concurrent generators can share a directory, and treats unreadable entries as misses.
+
+    .. invisible-code-block: python
+
+        from nunavut.jinja.environment import CodeGenBytecodeCache
+        from nunavut.lang import LanguageContextBuilder
+        from nunavut.jinja import CodeGenEnvironmentBuilder
+        from nunavut.jinja.jinja2 import DictLoader
+
+        lctx = LanguageContextBuilder().create()
+        cache_dir = gen_paths.out_dir / "template_cache"
+
+    .. code-block:: python
+
+        def _render() -> str:
+            env = (
+                CodeGenEnvironmentBuilder(DictLoader({"test": "Hello {{ 'World' }}"}))
+                .set_bytecode_cache_dir(cache_dir)
+                .create(lctx)
+            )
+            return env.get_template("test").render()
+
+        # The first environment compiles the template and stores the bytecode...
+        assert _render() == "Hello World"
+        assert len(list(cache_dir.glob("*.cache"))) == 1
+
+        # ...which later environments load instead of compiling the template again.
+        assert _render() == "Hello World"
+        assert len(list(cache_dir.glob("*.cache"))) == 1
+
+    .. warning::
+        Cached bytecode is executed when loaded. Only use cache directories that are not writable by untrusted parties.
+
+    :param Path directory: The directory to store compiled templates in. This is created if it does not exist.
+    """
+
+    def __init__(self, directory: Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        super().__init__(str(directory), "%s.cache")
+
+    @staticmethod
+    def get_codegen_cache_key(environment: Environment, name: str, filename: Optional[str]) -> str:
+        """
+        The key used for a template by Nunavut's bytecode caches. This combines the template's name and filename with
+        the Nunavut version and the environment settings that change how templates are compiled.
+        """
+        key = hashlib.sha256()
+        for key_part in (__version__, name, str(filename), repr(_get_compile_settings(environment))):
+            key.update(key_part.encode("utf-8"))
+            key.update(b"\0")
+        return key.hexdigest()
+
+    def get_bucket(self, environment: Environment, name: str, filename: Optional[str], source: str) -> Bucket:
+        bucket = Bucket(
+            environment, self.get_codegen_cache_key(environment, name, filename), self.get_source_checksum(source)
+        )
+        self.load_bytecode(bucket)
+        count("template_cache_hits" if bucket.code is not None else "template_cache_misses")
+        return bucket
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        try:
+            super().load_bytecode(bucket)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.debug("Ignoring unreadable template cache entry %s: %s", bucket.key, e)
+            bucket.reset()
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        # Write to a temporary file first so concurrent readers never see a partial entry.
+        handle, temp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as cache_file:
+                bucket.write_bytecode(cache_file)
+            os.replace(temp_name, self._get_cache_filename(bucket))
+        except OSError as e:
+            logger.debug("Failed to write template cache entry %s: %s", bucket.key, e)
+            Path(temp_name).unlink(missing_ok=True)
+
+
+class CodeGenMemoryBytecodeCache(BytecodeCache):
+    """
+    Cache of compiled templates kept in memory and shared by every environment it is given to. This is useful for
+    long-lived processes that create many environments, like ``nnvg --serve``. Entries use the same keys as
+    :class:`CodeGenBytecodeCache` and are recompiled whenever a template's source changes.
+
+    .. invisible-code-block: python
+
+        from nunavut.jinja.environment import CodeGenMemoryBytecodeCache
+        from nunavut.lang import LanguageContextBuilder
+        from nunavut.jinja import CodeGenEnvironmentBuilder
+        from nunavut.jinja.jinja2 import DictLoader
+
+        lctx = LanguageContextBuilder().create()
+
+    .. code-block:: python
+
+        cache = CodeGenMemoryBytecodeCache()
+        templates = {"test": "Hello {{ 'World' }}"}
+
+        def _render() -> str:
+            env = CodeGenEnvironmentBuilder(DictLoader(templates)).set_bytecode_cache(cache).create(lctx)
+            return env.get_template("test").render()
+
+        assert _render() == "Hello World"
+        assert len(cache) == 1
+
+        # Changed templates are compiled again.
+        templates["test"] = "Goodbye {{ 'World' }}"
+        assert _render() == "Goodbye World"
+        assert len(cache) == 1
+
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_bucket(self, environment: Environment, name: str, filename: Optional[str], source: str) -> Bucket:
+        bucket = Bucket(
+            environment,
+            CodeGenBytecodeCache.get_codegen_cache_key(environment, name, filename),
+            self.get_source_checksum(source),
+        )
+        self.load_bytecode(bucket)
+        count("template_cache_hits" if bucket.code is not None else "template_cache_misses")
+        return bucket
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        bytecode = self._entries.get(bucket.key)
+        if bytecode is not None:
+            # This leaves the bucket empty if the template's source has changed since it was stored.
+            bucket.bytecode_from_string(bytecode)
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        self._entries[bucket.key] = bucket.bytecode_to_string()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
 class CodeGenEnvironmentBuilder:
     """
     Builder class for creating a CodeGenEnvironment object for code generation.
@@ -168,6 +345,9 @@ class CodeGenEnvironmentBuilder:
         self._extensions = self.DEFAULT_JINJA_EXTENSIONS[:]
         self._allow_filter_test_or_use_query_overwrite = False
         self._embed_auditing_info = False
+        self._bytecode_cache_dir: Optional[Path] = None
+        self._bytecode_cache: Optional[BytecodeCache] = None
+        self._instrument_template_calls = False
 
     @property
     def loader(self) -> BaseLoader:
@@ -278,6 +458,42 @@ class CodeGenEnvironmentBuilder:
         self._embed_auditing_info = embed_auditing_info
         return self
 
+    def set_bytecode_cache_dir(self, bytecode_cache_dir: Optional[Path]) -> "CodeGenEnvironmentBuilder":
+        """
+        Set a directory to persist compiled templates in. See :class:`CodeGenBytecodeCache` for details.
+
+        :param Optional[Path] bytecode_cache_dir: The directory to use or None to disable the cache.
+        :return: The CodeGenEnvironmentBuilder object.
+        :rtype: CodeGenEnvironmentBuilder
+        """
+        self._bytecode_cache_dir = bytecode_cache_dir
+        return self
+
+    def set_bytecode_cache(self, bytecode_cache: Optional[BytecodeCache]) -> "CodeGenEnvironmentBuilder":
+        """
+        Set a cache of compiled templates to use, for example one shared with other environments. This takes
+        precedence over :meth:`set_bytecode_cache_dir`.
+
+        :param Optional[BytecodeCache] bytecode_cache: The cache to use or None to use the bytecode cache directory,
+            if set.
+        :return: The CodeGenEnvironmentBuilder object.
+        :rtype: CodeGenEnvironmentBuilder
+        """
+        self._bytecode_cache = bytecode_cache
+        return self
+
+    def set_instrument_template_calls(self, instrument_template_calls: bool) -> "CodeGenEnvironmentBuilder":
+        """
+        Set whether calls to the filters and tests the environment adds are counted and timed. Calls are recorded in
+        the active :class:`nunavut._profiling.GenerationProfile` if it was created to record template calls.
+
+        :param bool instrument_template_calls: Whether to instrument filters and tests.
+        :return: The CodeGenEnvironmentBuilder object.
+        :rtype: CodeGenEnvironmentBuilder
+        """
+        self._instrument_template_calls = instrument_template_calls
+        return self
+
     def create(self, lctx: LanguageContext) -> "CodeGenEnvironment":
         """
         Create a CodeGenEnvironment object.
@@ -295,6 +511,12 @@ class CodeGenEnvironmentBuilder:
             extensions=self._extensions,
             allow_filter_test_or_use_query_overwrite=self._allow_filter_test_or_use_query_overwrite,
             embed_auditing_info=self._embed_auditing_info,
+            bytecode_cache=(
+                self._bytecode_cache
+                if self._bytecode_cache is not None or self._bytecode_cache_dir is None
+                else CodeGenBytecodeCache(Path(self._bytecode_cache_dir))
+            ),
+            instrument_template_calls=self._instrument_template_calls,
         )
         env.set_language_context(lctx)
         return env
@@ -389,6 +611,28 @@ class CodeGenEnvironment(Environment):
         except RuntimeError:
             pass
 
+    Filters and tests can be instrumented to find the ones rendering spends the most time in (see
+    :meth:`CodeGenEnvironmentBuilder.set_instrument_template_calls`).
+
+    .. code-block:: python
+
+        from nunavut._profiling import GenerationProfile
+
+        e = (
+                CodeGenEnvironmentBuilder(DictLoader({'test': '{{ name | shout }}'}))
+                .add_filters(filter_shout=lambda name: name.upper())
+                .set_instrument_template_calls(True)
+                .create(lctx)
+            )
+
+        profile = GenerationProfile(template_calls=True)
+        with profile.activate():
+            assert 'CAT' == e.get_template('test').render(name='cat')
+
+        assert {'name': 'shout', 'calls': 1} == {
+            k: v for k, v in profile.as_dict()['template_calls']['filters'][0].items() if k != 'seconds'
+        }
+
     .. note:: Maintainer's Note
         This class should remain DSDL agnostic. It is, theoretically, applicable using Jinja with any compiler front-end
         input although, in practice, it will only ever be used with pydsdl AST.
@@ -411,6 +655,8 @@ class CodeGenEnvironment(Environment):
         extensions: Optional[List[Extension]],
         allow_filter_test_or_use_query_overwrite: bool,
         embed_auditing_info: bool = False,
+        bytecode_cache: Optional[BytecodeCache] = None,
+        instrument_template_calls: bool = False,
     ):  # pylint: disable=too-many-arguments
         super().__init__(
             loader=loader,  # nosec
@@ -424,6 +670,7 @@ class CodeGenEnvironment(Environment):
             trim_blocks=trim_blocks,
             auto_reload=False,
             cache_size=400,
+            bytecode_cache=bytecode_cache,
         )
         if additional_globals is not None:
             for global_name, global_value in additional_globals.items():
@@ -433,6 +680,7 @@ class CodeGenEnvironment(Environment):
 
         self._allow_replacements = allow_filter_test_or_use_query_overwrite
         self._embed_auditing_info = embed_auditing_info
+        self._instrument_template_calls = instrument_template_calls
 
         for global_namespace in self.RESERVED_GLOBAL_NAMESPACES:
             self.globals[global_namespace] = LanguageTemplateNamespace()
@@ -442,6 +690,8 @@ class CodeGenEnvironment(Environment):
         self._additional_filters = additional_filters
         self._additional_tests = additional_tests
         self._target_language: Optional[Language] = None
+        self._language_configuration: Dict[str, Dict[str, Any]] = {}
+        self._compile_signature: Optional[str] = None
 
     def set_language_context(self, lctx: LanguageContext) -> None:
         """
@@ -450,6 +700,8 @@ class CodeGenEnvironment(Environment):
         globals, options, filters, and tests.
         """
         self._target_language = lctx.get_target_language()
+        self._language_configuration = lctx.config.sections()
+        self._compile_signature = None
 
         self._update_language_support(lctx)
 
@@ -585,6 +837,72 @@ class CodeGenEnvironment(Environment):
             raise RuntimeError("No target language has been set.")
         return self._target_language
 
+    def compile(
+        self,
+        source: Any,
+        name: Optional[str] = None,
+        filename: Optional[str] = None,
+        raw: bool = False,
+        defer_init: bool = False,
+    ) -> Any:
+        """
+        Override of :meth:`Environment.compile` that records the time spent compiling each template in any active
+        :class:`nunavut._profiling.GenerationProfile`.
+        """
+        with measure("template_compile", name):
+            return super().compile(source, name, filename, raw, defer_init)
+
+    def get_compile_signature(self) -> str:
+        """
+        A digest of everything, other than a template's source, that can change how this environment compiles a
+        template: the environment settings, the filters and tests defined and how they are called, and the language
+        configuration, which filters Jinja evaluates while compiling templates may depend on. Templates compiled by
+        environments with the same signature are interchangeable.
+
+        .. invisible-code-block: python
+
+            from nunavut.lang import LanguageContextBuilder
+            from nunavut.jinja import CodeGenEnvironmentBuilder
+            from nunavut.jinja.jinja2 import DictLoader
+
+            c_context = LanguageContextBuilder().set_target_language("c").create()
+            py_context = LanguageContextBuilder().set_target_language("py").create()
+
+        .. code-block:: python
+
+            def _signature(lctx, trim_blocks: bool = False) -> str:
+                builder = CodeGenEnvironmentBuilder(DictLoader({})).set_trim_blocks(trim_blocks)
+                return builder.create(lctx).get_compile_signature()
+
+            assert _signature(c_context) == _signature(c_context)
+            assert _signature(c_context) != _signature(py_context)
+            assert _signature(c_context) != _signature(c_context, trim_blocks=True)
+
+        """
+        if self._compile_signature is None:
+            signature = hashlib.sha256()
+            for signature_part in (
+                __version__,
+                repr(_get_compile_settings(self)),
+                repr(
+                    sorted(
+                        (
+                            name,
+                            bool(getattr(f, "contextfilter", False)),
+                            bool(getattr(f, "evalcontextfilter", False)),
+                            bool(getattr(f, "environmentfilter", False)),
+                        )
+                        for name, f in self.filters.items()
+                    )
+                ),
+                repr(sorted(self.tests.keys())),
+                json.dumps(self._language_configuration, sort_keys=True, default=str),
+            ):
+                signature.update(signature_part.encode("utf-8"))
+                signature.update(b"\0")
+            self._compile_signature = signature.hexdigest()
+        return self._compile_signature
+
     @property
     def now_utc(self) -> datetime.datetime:
         """
@@ -661,10 +979,16 @@ class CodeGenEnvironment(Environment):
                 logger.info('Replacing "%s" which was already defined for this environment.', item_name)
         else:
             logger.debug("Adding %s to environment", item_name)
+        if self._instrument_template_calls:
+            if collection is self.filters:
+                item = instrument_template_call("filter", item_name, item)
+            elif collection is self.tests:
+                item = instrument_template_call("test", item_name, item)
         if isinstance(collection, LanguageTemplateNamespace):
             setattr(collection, item_name, item)
         else:
             collection[item_name] = item
+        self._compile_signature = None
 
     def _add_conventional_method_to_environment(
         self,
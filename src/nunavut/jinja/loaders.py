@@ -12,14 +12,30 @@ import importlib
 import itertools
 import logging
 from pathlib import Path
-from typing import Any, Callable, Deque, Dict, Iterable, List, Mapping, Optional, Tuple, Type, TypeVar, cast
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    cast,
+)
 
 import pydsdl
 
 from nunavut import Namespace as NunavutNamespace
+from nunavut._profiling import count
 from nunavut._utilities import TEMPLATE_SUFFIX, ResourceSearchPolicy
 
-from .jinja2 import BaseLoader, Environment, FileSystemLoader, PackageLoader, TemplateNotFound
+from .jinja2 import BaseLoader, Environment, FileSystemLoader, PackageLoader, Template, TemplateNotFound
+from .precompile import PRECOMPILED_TEMPLATES_DIR, get_precompiled_templates
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +68,9 @@ class DSDLTemplateLoader(BaseLoader):
                           templates from all loaders. If set to "FIND_FIRST" then the loader will only use the first
                           loader configured for both search and enumeration.
     :param str encoding: The encoding to use when reading templates from the filesystem.
+    :param Optional[Path] precompiled_templates_dir: Where to load precompiled versions of built-in templates from
+        (see :mod:`nunavut.jinja.precompile`). Built-in templates are loaded from here, instead of being compiled,
+        unless a template of the same name is found in ``templates_dirs``. If None, all templates are compiled.
     :param Any kwargs: Arguments forwarded to the :class:`jinja.jinja2.BaseLoader`.
     """
 
@@ -63,11 +82,16 @@ class DSDLTemplateLoader(BaseLoader):
         builtin_template_path: str = DEFAULT_TEMPLATE_PATH,
         search_policy: ResourceSearchPolicy = ResourceSearchPolicy.FIND_ALL,
         encoding: str = "utf-8",
+        precompiled_templates_dir: Optional[Path] = PRECOMPILED_TEMPLATES_DIR,
         **_: Any,
     ):
         super().__init__()
         self._encoding = encoding
         self._type_to_template_lookup_cache: Dict[pydsdl.Any, Path] = dict()
+        self._templates_base_path: Optional[Path] = None
+        self._precompiled_templates = (
+            None if precompiled_templates_dir is None else get_precompiled_templates(Path(precompiled_templates_dir))
+        )
 
         if templates_dirs is not None:
             for templates_dir_item in templates_dirs:
@@ -95,6 +119,26 @@ class DSDLTemplateLoader(BaseLoader):
 
     # --[ BaseLoader Overrides ]---------------------------------------------------------------------------------------
 
+    def load(
+        self,
+        environment: Environment,
+        name: str,
+        globals: Optional[MutableMapping[str, Any]] = None,  # pylint: disable=redefined-builtin
+    ) -> Template:
+        """
+        Override of :meth:`BaseLoader.load` that loads the precompiled version of built-in templates, if available,
+        instead of compiling them.
+        """
+        if self._precompiled_templates is not None:
+            source_path = self.get_builtin_template_path(name)
+            if source_path is not None:
+                template = self._precompiled_templates.load(environment, name, source_path, globals)
+                if template is not None:
+                    logger.debug("Loaded precompiled template %s", name)
+                    count("precompiled_templates_loaded")
+                    return template
+        return super().load(environment, name, globals)
+
     def get_source(self, environment: Environment, template: str) -> Tuple[Any, str, Callable[..., bool]]:
         """
         Override of :meth:`BaseLoader.get_source` that returns the sources of the template from the filesystem loader
@@ -203,18 +247,42 @@ class DSDLTemplateLoader(BaseLoader):
                 for template in Path(str(template_dir)).glob(f"**/*{TEMPLATE_SUFFIX}"):
                     files.add(template)
         if self._package_loader is not None:
-            templates_module = importlib.import_module(self._templates_package_name)
-            spec_perhaps = templates_module.__spec__
-            file_perhaps: Optional[str] = None
-            if spec_perhaps is not None:
-                file_perhaps = spec_perhaps.origin
-            if file_perhaps is None or file_perhaps == "builtin":
-                raise RuntimeError("Unknown template package origin?")
-            templates_base_path = Path(file_perhaps).parent
+            templates_base_path = self._get_templates_base_path()
             for t in map(Path, self._filter_template_list_by_suffix(self._package_loader.list_templates())):
                 files.add(templates_base_path / t)
         return sorted(files)
 
+    def get_builtin_template_path(self, name: str) -> Optional[Path]:
+        """
+        Find the built-in template a template name is loaded from.
+
+        .. invisible-code-block: python
+
+            from nunavut.jinja.loaders import DSDLTemplateLoader
+            from unittest.mock import MagicMock
+
+            mock_namespace = MagicMock()
+            mock_get_target_language = mock_namespace.get_language_context.return_value.get_target_language
+            mock_get_target_language.return_value.get_templates_package_name.return_value = 'nunavut.lang.c'
+
+            user_templates = gen_paths.out_dir / "user_templates"
+            user_templates.mkdir()
+            (user_templates / "StructureType.j2").write_text("{{ T }}")
+
+            l = DSDLTemplateLoader(namespace=mock_namespace, templates_dirs=[user_templates])
+            assert l.get_builtin_template_path("StructureType.j2") is None
+            assert l.get_builtin_template_path("UnionType.j2").name == "UnionType.j2"
+            assert l.get_builtin_template_path("Unknown.j2") is None
+
+        :param str name: The name of the template.
+        :return: The template's source file or None if the template is not built-in or is loaded from a templates
+            directory instead.
+        """
+        if self._is_in_templates_dirs(name) or self._package_loader is None:
+            return None
+        template_path = self._get_templates_base_path() / name
+        return template_path if template_path.is_file() else None
+
     def type_to_template(self, value_type: Type) -> Optional[Path]:
         """
         Given a type object, return a template used to generate code for the type.
@@ -267,6 +335,23 @@ class DSDLTemplateLoader(BaseLoader):
     # +----------------------------------------------------------------------------------------------------------------+
     # | PRIVATE
     # +----------------------------------------------------------------------------------------------------------------+
+    def _get_templates_base_path(self) -> Path:
+        if self._templates_base_path is None:
+            templates_module = importlib.import_module(self._templates_package_name)
+            spec_perhaps = templates_module.__spec__
+            file_perhaps: Optional[str] = None
+            if spec_perhaps is not None:
+                file_perhaps = spec_perhaps.origin
+            if file_perhaps is None or file_perhaps == "builtin":
+                raise RuntimeError("Unknown template package origin?")
+            self._templates_base_path = Path(file_perhaps).parent
+        return self._templates_base_path
+
+    def _is_in_templates_dirs(self, name: str) -> bool:
+        if self._fs_loader is None:
+            return False
+        return any((Path(str(template_dir)) / name).is_file() for template_dir in self._fs_loader.searchpath)
+
     @classmethod
     def _filter_template_list_by_suffix(cls, template_list: Iterable[str]) -> Iterable[str]:
         return filter(lambda x: Path(x).suffix == TEMPLATE_SUFFIX, template_list)
@@ -388,6 +473,15 @@ class DSDLSupportTemplateLoader(DSDLTemplateLoader):
 
         return contents, support_file.as_posix(), is_modified
 
+    def get_builtin_template_path(self, name: str) -> Optional[Path]:
+        """
+        Override of :meth:`DSDLTemplateLoader.get_builtin_template_path` that also finds support file templates.
+        """
+        builtin_template_path = super().get_builtin_template_path(name)
+        if builtin_template_path is not None or self._is_in_templates_dirs(name):
+            return builtin_template_path
+        return self.find_support_file(name)
+
     def list_templates(self) -> Iterable[str]:
         """
         Override of :meth:`DSDLTemplateLoader.list_templates` that returns an aggregate that loader's templates and
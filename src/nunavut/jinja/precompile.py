@@ -0,0 +1,316 @@
+#
+# Copyright (C) OpenCyphal Development Team  <opencyphal.org>
+# Copyright Amazon.com Inc. or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+"""
+Built-in templates compiled to Python modules ahead of time. Packaging Nunavut runs :func:`precompile_templates` to
+write these modules into the package so that generating code with the built-in templates does not lex, parse, or
+compile any of them. :class:`nunavut.jinja.loaders.DSDLTemplateLoader` loads the precompiled version of a built-in
+template if one exists that was compiled from the same source by an equivalent environment (see
+:meth:`nunavut.jinja.environment.CodeGenEnvironment.get_compile_signature`) and compiles the template as usual
+otherwise. Templates found in user template directories are always compiled as usual.
+
+To precompile the built-in templates into a directory run:
+
+.. code-block:: bash
+
+    python -m nunavut.jinja.precompile build/precompiled
+
+"""
+
+import argparse
+import contextvars
+import functools
+import hashlib
+import importlib.machinery
+import json
+import logging
+import sys
+import types
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, MutableMapping, Optional, Sequence, Tuple
+
+from nunavut._version import __version__
+
+from .jinja2 import Environment, Template, TemplateError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from nunavut.lang import LanguageContext
+
+logger = logging.getLogger(__name__)
+
+PRECOMPILED_TEMPLATES_DIR = Path(__file__).parent / "precompiled"
+"""
+Where packaged builds of Nunavut keep the precompiled built-in templates.
+"""
+
+INDEX_FILE_NAME = "index.json"
+"""
+Name of the file, within a precompiled templates directory, that lists the precompiled templates.
+"""
+
+_PACKAGE_DIR = Path(__file__).resolve().parent.parent
+
+
+class PrecompiledTemplates:
+    """
+    Templates compiled by :func:`precompile_templates`.
+
+    .. invisible-code-block: python
+
+        from pathlib import Path
+        from nunavut.jinja.precompile import PrecompiledTemplates
+
+    .. code-block:: python
+
+        # Directories without precompiled templates are treated as empty.
+        assert len(PrecompiledTemplates(Path("does_not_exist"))) == 0
+
+    :param Path directory: The directory :func:`precompile_templates` wrote the templates to.
+    """
+
+    FORMAT_VERSION = 1
+    """
+    Version of the index file format. Indexes with a different version are ignored.
+    """
+
+    def __init__(self, directory: Path):
+        self._directory = directory
+        self._index: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._code: Dict[str, types.CodeType] = {}
+        self._source_digests: Dict[Path, Tuple[int, int, str]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._get_index().values())
+
+    @property
+    def directory(self) -> Path:
+        """
+        The directory the templates are loaded from.
+        """
+        return self._directory
+
+    def load(
+        self,
+        environment: Environment,
+        name: str,
+        source_path: Path,
+        globals: Optional[MutableMapping[str, Any]] = None,  # pylint: disable=redefined-builtin
+    ) -> Optional[Template]:
+        """
+        Load the precompiled version of a built-in template.
+
+        :param Environment environment: The environment to load the template for.
+        :param str name: The name the template is loaded with.
+        :param Path source_path: The built-in template's source file.
+        :param globals: Globals for the template.
+        :return: The template or None if no template was precompiled from the same source, with the same name, by an
+            equivalent environment.
+        """
+        get_compile_signature = getattr(environment, "get_compile_signature", None)
+        if get_compile_signature is None:
+            return None
+        try:
+            key = source_path.resolve().relative_to(_PACKAGE_DIR).as_posix()
+        except ValueError:
+            return None
+        entries = self._get_index().get(key)
+        if entries is None:
+            return None
+        signature = get_compile_signature()
+        autoescape = bool(environment.autoescape(name) if callable(environment.autoescape) else environment.autoescape)
+        for entry in entries:
+            if entry["name"] == name and entry["signature"] == signature and entry["autoescape"] == autoescape:
+                break
+        else:
+            return None
+
+        try:
+            source_stat = source_path.stat()
+            if entry["source"] != self._get_source_digest(source_path, source_stat.st_mtime_ns, source_stat.st_size):
+                logger.debug("Not using precompiled %s since its source has changed.", key)
+                return None
+            code = self._get_code(entry["module"])
+        except (OSError, ImportError, SyntaxError, ValueError) as e:
+            logger.debug("Not using precompiled %s: %s", key, e)
+            return None
+
+        # As Template.from_code does but keeping the source as the template's file name.
+        namespace = {"environment": environment, "__file__": str(source_path)}
+        exec(code, namespace)  # pylint: disable=exec-used # nosec
+        template = environment.template_class._from_namespace(  # pylint: disable=protected-access
+            environment, namespace, {} if globals is None else globals
+        )
+        mtime_ns = source_stat.st_mtime_ns
+
+        def _is_up_to_date() -> bool:
+            try:
+                return source_path.stat().st_mtime_ns == mtime_ns
+            except OSError:
+                return False
+
+        template._uptodate = _is_up_to_date  # pylint: disable=protected-access
+        return template
+
+    # +--[PRIVATE]--------------------------------------------------------------------------------------------------+
+    def _get_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self._index is None:
+            self._index = {}
+            try:
+                index = json.loads((self._directory / INDEX_FILE_NAME).read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                return self._index
+            except (OSError, ValueError) as e:
+                logger.debug("Ignoring unreadable precompiled template index in %s: %s", self._directory, e)
+                return self._index
+            if index.get("format") == self.FORMAT_VERSION and index.get("version") == __version__:
+                self._index = index["templates"]
+        return self._index
+
+    def _get_source_digest(self, source_path: Path, mtime_ns: int, size: int) -> str:
+        recorded = self._source_digests.get(source_path)
+        if recorded is None or recorded[0] != mtime_ns or recorded[1] != size:
+            recorded = (mtime_ns, size, hashlib.sha256(source_path.read_bytes()).hexdigest())
+            self._source_digests[source_path] = recorded
+        return recorded[2]
+
+    def _get_code(self, module: str) -> types.CodeType:
+        code = self._code.get(module)
+        if code is None:
+            # The source file loader reuses, and writes, the module's cached bytecode like an import would.
+            module_name = f"{__name__}.{module}"
+            module_path = self._directory / f"{module}.py"
+            code = importlib.machinery.SourceFileLoader(module_name, str(module_path)).get_code(module_name)
+            if code is None:
+                raise ImportError(f"No code in {module_path}")
+            self._code[module] = code
+        return code
+
+
+@functools.lru_cache(maxsize=None)
+def get_precompiled_templates(directory: Path = PRECOMPILED_TEMPLATES_DIR) -> PrecompiledTemplates:
+    """
+    The precompiled templates in a directory. Templates are only read once per process for each directory.
+
+    :param Path directory: The directory :func:`precompile_templates` wrote the templates to.
+    """
+    return PrecompiledTemplates(directory)
+
+
+def _compile_template(environment: Environment, source: str, name: str, filename: str) -> Optional[str]:
+    """
+    Compile a template to Python source, or return None if compiling it evaluated a unique name filter. These filters
+    are evaluated when compiling if their arguments are constant so the names compiled into a template depend on what
+    else was compiled before it during the same render.
+    """
+    from nunavut.lang._common import UniqueNameGenerator  # pylint: disable=import-outside-toplevel
+
+    UniqueNameGenerator.reset()
+    module_source = environment.compile(source, name, filename, raw=True)
+    if len(UniqueNameGenerator.get_instance()._index_map) > 0:  # pylint: disable=protected-access
+        return None
+    return str(module_source)
+
+
+def _precompile_language_templates(
+    lctx: "LanguageContext", output_dir: Path, templates: Dict[str, List[Dict[str, Any]]]
+) -> int:
+    # pylint: disable=import-outside-toplevel
+    from nunavut._namespace import Namespace
+    from nunavut._utilities import ResourceType
+
+    from . import CodeGenerator, DSDLCodeGenerator, SupportGenerator
+
+    language_name = lctx.get_target_language().name
+    namespace = Namespace.Identity(output_dir, lctx)
+    generators: List[CodeGenerator] = [
+        DSDLCodeGenerator(namespace),
+        SupportGenerator(namespace, ResourceType.ANY.value),
+    ]
+    compiled = 0
+    for generator in generators:
+        environment = generator.environment
+        loader = generator.dsdl_loader
+        signature = environment.get_compile_signature()
+        for name in sorted(set(loader.list_templates())):
+            source_path = loader.get_builtin_template_path(name)
+            if source_path is None:
+                continue
+            key = source_path.resolve().relative_to(_PACKAGE_DIR).as_posix()
+            if any(e["name"] == name and e["signature"] == signature for e in templates.get(key, [])):
+                continue
+            source = source_path.read_text(encoding=loader.encoding)
+            try:
+                module_source = contextvars.copy_context().run(
+                    _compile_template, environment, source, name, f"nunavut/{key}"
+                )
+            except TemplateError as e:
+                logger.info("Not precompiling %s for %s: %s", key, language_name, e)
+                continue
+            if module_source is None:
+                logger.info("Not precompiling %s for %s: it generates unique names.", key, language_name)
+                continue
+            module = "tmpl_" + hashlib.sha256(f"{key}\0{name}\0{signature}".encode("utf-8")).hexdigest()[:32]
+            (output_dir / f"{module}.py").write_text(module_source, encoding="utf-8")
+            templates.setdefault(key, []).append(
+                {
+                    "name": name,
+                    "module": module,
+                    "signature": signature,
+                    "source": hashlib.sha256(source_path.read_bytes()).hexdigest(),
+                    "autoescape": bool(environment.autoescape(name)),
+                }
+            )
+            compiled += 1
+    return compiled
+
+
+def precompile_templates(output_dir: Path) -> int:
+    """
+    Compile the built-in templates of every language to Python modules. Each template is compiled by the same kind
+    of environment the generators create for the language with its default configuration. Templates that cannot be
+    compiled by these environments (for example because they use filters other generators add) and templates that
+    generate unique names while being compiled are skipped.
+
+    :param Path output_dir: The directory to write the modules and their index to. This is created if it does not
+        exist.
+    :return: The number of templates compiled.
+    """
+    from nunavut.lang import LanguageContextBuilder  # pylint: disable=import-outside-toplevel
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    templates: Dict[str, List[Dict[str, Any]]] = {}
+    compiled = 0
+    # Experimental languages add filters to every environment so templates are compiled with and without them.
+    for include_experimental in (False, True):
+        builder_args = {"include_experimental_languages": include_experimental}
+        for language_name in sorted(LanguageContextBuilder(**builder_args).create().get_supported_languages()):
+            lctx = LanguageContextBuilder(**builder_args).set_target_language(language_name).create()
+            compiled += _precompile_language_templates(lctx, output_dir, templates)
+    index = {"format": PrecompiledTemplates.FORMAT_VERSION, "version": __version__, "templates": templates}
+    (output_dir / INDEX_FILE_NAME).write_text(json.dumps(index, indent=1, sort_keys=True), encoding="utf-8")
+    logger.info("Precompiled %d templates into %s", compiled, output_dir)
+    return compiled
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Entry point for ``python -m nunavut.jinja.precompile OUTPUT_DIR``.
+    """
+    parser = argparse.ArgumentParser(description="Precompile Nunavut's built-in templates.")
+    parser.add_argument(
+        "output_dir",
+        nargs="?",
+        type=Path,
+        default=PRECOMPILED_TEMPLATES_DIR,
+        help="Directory to write the precompiled templates to. Defaults to the directory Nunavut loads them from.",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(stream=sys.stderr, level=logging.INFO, format="%(message)s")
+    precompile_templates(args.output_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,7 @@
 This package contains modules that provide specific support for generating
 source for various languages using templates.
 """
+import contextvars
 import functools
 import pathlib
 import re
@@ -137,9 +138,50 @@ class UniqueNameGenerator:
     """
     Functor used by template filters to obtain a unique name within a given template.
     This should be made available as a private global within each template.
+
+    The current instance is held in a :class:`contextvars.ContextVar` rather than in a process-wide global so that
+    templates rendered concurrently, on different threads or interleaved on one thread using :meth:`scoped`, each
+    see their own names.
+
+    .. invisible-code-block: python
+
+        from nunavut.lang._common import UniqueNameGenerator
+
+    .. code-block:: python
+
+        def _render(base_token):
+            yield UniqueNameGenerator.get_instance()("c", base_token, "_", "_")
+            yield UniqueNameGenerator.get_instance()("c", base_token, "_", "_")
+
+        # Two interleaved renders do not share an index.
+        first = UniqueNameGenerator.scoped(_render("foo"))
+        second = UniqueNameGenerator.scoped(_render("foo"))
+        assert [next(first), next(second), next(first), next(second)] == ["_foo0_", "_foo0_", "_foo1_", "_foo1_"]
+
+    .. invisible-code-block: python
+
+        import threading
+
+        barrier = threading.Barrier(2)
+        rendered = {}
+
+        def _render_on_thread(key):
+            names = []
+            for name in UniqueNameGenerator.scoped(_render("foo")):
+                names.append(name)
+                barrier.wait(timeout=10)
+            rendered[key] = names
+
+        threads = [threading.Thread(target=_render_on_thread, args=(key,)) for key in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert rendered == {"a": ["_foo0_", "_foo1_"], "b": ["_foo0_", "_foo1_"]}
+
     """
 
-    _singleton: typing.Optional["UniqueNameGenerator"] = None
+    _current: "contextvars.ContextVar[UniqueNameGenerator]" = contextvars.ContextVar("UniqueNameGenerator")
 
     def __init__(self) -> None:
         self._index_map: typing.Dict[str, typing.Dict[str, int]] = {}
@@ -147,18 +189,36 @@ class UniqueNameGenerator:
     @classmethod
     def reset(cls) -> None:
         """
-        Resets the singleton instance of the UniqueNameGenerator.
+        Replaces the UniqueNameGenerator instance for the current context with a new one.
         """
-        cls._singleton = cls()
+        cls._current.set(cls())
 
     @classmethod
     def get_instance(cls) -> "UniqueNameGenerator":
         """
-        Returns the singleton instance of the UniqueNameGenerator.
+        Returns the UniqueNameGenerator instance for the current context.
         """
-        if cls._singleton is None:
-            raise RuntimeError("No UniqueNameGenerator has been created. Please use reset to create.")
-        return cls._singleton
+        try:
+            return cls._current.get()
+        except LookupError:
+            raise RuntimeError("No UniqueNameGenerator has been created. Please use reset to create.") from None
+
+    @classmethod
+    def scoped(cls, template_gen: typing.Iterator[str]) -> typing.Generator[str, None, None]:
+        """
+        Wraps a template render so that every step of it runs in its own copy of the current context with a new
+        UniqueNameGenerator.
+
+        :param template_gen: A generator returned by :meth:`jinja2.Template.generate`.
+        :return: A generator yielding the same values as ``template_gen``.
+        """
+        context = contextvars.copy_context()
+        context.run(cls.reset)
+        while True:
+            try:
+                yield context.run(next, template_gen)
+            except StopIteration:
+                return
 
     def __call__(self, key: str, base_token: str, prefix: str, suffix: str) -> str:
         """
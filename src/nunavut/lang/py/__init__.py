@@ -379,6 +379,57 @@ def filter_numpy_scalar_type(t: pydsdl.Any) -> str:
     return "_np_.object_"
 
 
+_STRUCT_FORMAT_CHARACTERS: Dict[tuple[type, int], str] = {
+    (pydsdl.SignedIntegerType, 8): "b",
+    (pydsdl.SignedIntegerType, 16): "h",
+    (pydsdl.SignedIntegerType, 32): "i",
+    (pydsdl.SignedIntegerType, 64): "q",
+    (pydsdl.UnsignedIntegerType, 8): "B",
+    (pydsdl.UnsignedIntegerType, 16): "H",
+    (pydsdl.UnsignedIntegerType, 32): "I",
+    (pydsdl.UnsignedIntegerType, 64): "Q",
+    (pydsdl.FloatType, 16): "e",
+    (pydsdl.FloatType, 32): "f",
+    (pydsdl.FloatType, 64): "d",
+}
+
+
+def filter_struct_format_runs(
+    t: pydsdl.StructureType,
+) -> list[tuple[str, list[tuple[pydsdl.Field, pydsdl.BitLengthSet]]]]:
+    """
+    Groups the fields of a structure, with their offsets, for serialization. Each run of two or more consecutive
+    byte-aligned integer and float fields of standard bit length is grouped with the little-endian :mod:`struct`
+    format that packs the run, for example ``<HIf``. Every other field is in a group of its own with an empty format.
+    """
+    groups: list[tuple[str, list[tuple[pydsdl.Field, pydsdl.BitLengthSet]]]] = []
+    run: list[tuple[pydsdl.Field, pydsdl.BitLengthSet]] = []
+    run_format = "<"
+
+    def end_run() -> None:
+        nonlocal run, run_format
+        if len(run) > 1:
+            groups.append((run_format, run))
+        else:
+            groups.extend(("", [run_field]) for run_field in run)
+        run, run_format = [], "<"
+
+    for field, offset in t.iterate_fields_with_offsets():
+        format_character = None
+        if offset.is_aligned_at_byte():
+            format_character = _STRUCT_FORMAT_CHARACTERS.get(
+                (type(field.data_type), getattr(field.data_type, "bit_length", 0))
+            )
+        if format_character is None:
+            end_run()
+            groups.append(("", [(field, offset)]))
+        else:
+            run.append((field, offset))
+            run_format += format_character
+    end_run()
+    return groups
+
+
 def filter_newest_minor_version_aliases(tys: Iterable[pydsdl.CompositeType]) -> list[tuple[str, pydsdl.CompositeType]]:
     """
     Implementation of https://github.com/OpenCyphal/nunavut/issues/193
@@ -15,7 +15,7 @@ from nunavut._utilities import (
     iter_package_resources,
 )
 
-__version__ = "1.0.0"
+__version__ = "1.2.0"
 """Version of the Python support module."""
 
 
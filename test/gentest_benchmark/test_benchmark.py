@@ -0,0 +1,109 @@
+#
+# Copyright (C) OpenCyphal Development Team  <opencyphal.org>
+# Copyright Amazon.com Inc. or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+"""
+Smoke tests of the code generation benchmark under the benchmark directory.
+"""
+import importlib
+import json
+from pathlib import Path
+from typing import Any
+
+import pydsdl
+import pytest
+
+
+@pytest.fixture
+def benchmark_modules(gen_paths: Any, monkeypatch: pytest.MonkeyPatch) -> Any:
+    """
+    The benchmark's modules, which are not part of the nunavut package.
+    """
+    monkeypatch.syspath_prepend(str(gen_paths.root_dir / Path("benchmark")))
+    return (
+        importlib.import_module("synthetic_dsdl"),
+        importlib.import_module("bench_generation"),
+        importlib.import_module("bench_micro"),
+    )
+
+
+@pytest.mark.parametrize("shape", ["struct", "array", "union", "mixed"])
+def test_synthetic_tree(gen_paths: Any, benchmark_modules: Any, shape: str) -> None:
+    """
+    Synthetic trees of each shape are valid DSDL and the same for the same parameters.
+    """
+    synthetic_dsdl, _, _ = benchmark_modules
+    spec = synthetic_dsdl.SyntheticTreeSpec(types=40, depth=2, fan_in=3, shape=shape, service_ratio=0.2)
+    root_dir = synthetic_dsdl.generate_tree(spec, gen_paths.out_dir / Path("first"))
+    types = pydsdl.read_namespace(str(root_dir), [])
+    assert len(types) == 40
+    assert {t.full_namespace for t in types} == {f"synthetic.ns0_{i}.ns1_{j}" for i in range(2) for j in range(2)}
+
+    again_dir = synthetic_dsdl.generate_tree(spec, gen_paths.out_dir / Path("again"))
+    for dsdl_file in root_dir.rglob("*.dsdl"):
+        assert dsdl_file.read_text() == (again_dir / dsdl_file.relative_to(root_dir)).read_text()
+
+
+def test_benchmark_results(gen_paths: Any, benchmark_modules: Any) -> None:
+    """
+    The benchmark writes results that can be compared against earlier results.
+    """
+    _, bench_generation, _ = benchmark_modules
+    results_path = gen_paths.out_dir / Path("results.json")
+    bench_args = [
+        "--languages",
+        "c",
+        "--jobs",
+        "2",
+        "--render-modes",
+        "serial",
+        "threads",
+        "--repeat",
+        "1",
+        "--shapes",
+        "struct",
+        "--types",
+        "10",
+        "--public-regulated-data-types",
+        (gen_paths.out_dir / Path("missing")).as_posix(),
+        "--work-dir",
+        (gen_paths.out_dir / Path("work")).as_posix(),
+        "--output",
+        results_path.as_posix(),
+    ]
+    assert 0 == bench_generation.main(bench_args)
+
+    results = json.loads(results_path.read_text())
+    assert [r["render_mode"] for r in results["results"]] == ["serial", "threads"]
+    for result in results["results"]:
+        assert (result["tree"], result["language"], result["jobs"], result["types"]) == (
+            "synthetic-struct-t10-d2-f3",
+            "c",
+            2,
+            10,
+        )
+        assert result["files_written"] > 10
+        assert result["throughput"]["parse_types_per_second"] > 0
+        assert result["throughput"]["render_items_per_second"] > 0
+
+    assert bench_generation.compare_results(results, results, 0.1) == []
+    results["results"][1]["wall_seconds"] *= 2
+    regressions = bench_generation.compare_results(results, json.loads(results_path.read_text()), 0.1)
+    assert [name for name, _, _, _ in regressions] == ["synthetic-struct-t10-d2-f3 c -j 2 threads"]
+
+
+def test_micro_benchmark_results(gen_paths: Any, benchmark_modules: Any) -> None:
+    """
+    The microbenchmarks run and write their timings without checking them.
+    """
+    _, _, bench_micro = benchmark_modules
+    results_path = gen_paths.out_dir / Path("micro.json")
+    micro_args = ["--namespaces", "2", "20", "--lookups", "10", "--lines", "100", "--output", results_path.as_posix()]
+    assert 0 == bench_micro.main(micro_args)
+
+    results = json.loads(results_path.read_text())
+    assert [r["namespaces"] for r in results["output_path_lookup"]] == [2, 20]
+    assert all(r["seconds_per_lookup"] > 0 for r in results["output_path_lookup"])
+    assert results["line_post_processing"]["lines"] == 100
+    assert results["line_post_processing"]["line_buffer_lines_per_second"] > 0
@@ -421,3 +421,32 @@ def test_filter_to_template_unique(gen_paths):
         actual = foo_file.read()
 
     assert expected == actual
+
+
+def test_python_filter_struct_format_runs(tmp_path):  # type: ignore
+    from nunavut.lang.py import filter_struct_format_runs
+
+    root_path = tmp_path / Path("runs")
+    root_path.mkdir()
+    (root_path / Path("Sample.1.0.dsdl")).write_text(
+        "uint8 a\nint16 b\nfloat32 c\nbool d\nvoid7\nuint64 e\nuint5 f\nint8 g\nvoid3\nfloat16 h\nint8 i\n"
+        "uint32 j\nuint8[2] k\nfloat64 l\nsaturated int32 m\n@sealed\n"
+    )
+    (test_subject,) = read_namespace(str(root_path), [])
+
+    runs = filter_struct_format_runs(test_subject)
+    assert [(fmt, [f.name for f, _ in fields]) for fmt, fields in runs] == [
+        ("<Bhf", ["a", "b", "c"]),
+        ("", ["d"]),
+        ("", [""]),
+        ("", ["e"]),
+        ("", ["f"]),
+        ("", ["g"]),  # Not byte-aligned.
+        ("", [""]),
+        ("<ebI", ["h", "i", "j"]),
+        ("", ["k"]),
+        ("<di", ["l", "m"]),
+    ]
+    assert [offset for _, fields in runs for _, offset in fields] == [
+        offset for _, offset in test_subject.iterate_fields_with_offsets()
+    ]
@@ -10,7 +10,7 @@ from pathlib import Path
 import pytest
 from pydsdl import FrontendError, read_namespace
 
-from nunavut._namespace import build_namespace_tree
+from nunavut._namespace import Namespace, build_namespace_tree
 from nunavut.jinja import DSDLCodeGenerator
 from nunavut.lang import LanguageContextBuilder
 
@@ -85,3 +85,63 @@ def test_same_type_different_paths(gen_paths, run_nnvg_main):  # type: ignore
     completed = result.stdout.decode("utf-8").split(";")
     completed_wo_empty = sorted([Path(i) for i in completed if len(i) > 0])
     assert expected_output == completed_wo_empty
+
+
+def test_three_roots_parallel_rendering(gen_paths):  # type: ignore
+    """ Verifies that rendering types across multiple processes produces the same output as rendering serially.
+    """
+    root_namespaces = [str(gen_paths.dsdl_dir / Path(name)) for name in ("scotec", "huckco", "esmeinc")]
+    language_context = LanguageContextBuilder(include_experimental_languages=True).set_target_language("js").create()
+
+    outputs = {}
+    for jobs in (1, 2):
+        out_dir = gen_paths.out_dir / Path(f"jobs_{jobs}")
+        index = Namespace.Identity(out_dir, language_context)
+        for root_namespace in root_namespaces:
+            Namespace.read_namespace(index, root_namespace, root_namespaces, allow_unregulated_fixed_port_id=True)
+        generator = DSDLCodeGenerator(
+            index, templates_dir=gen_paths.templates_dir, jobs=jobs, render_processes=jobs > 1
+        )
+        generated = list(generator.generate_all(False))
+        assert len(generated) == 3
+        outputs[jobs] = [(Path(p).relative_to(out_dir), Path(p).read_text(encoding="utf-8")) for p in generated]
+
+    assert outputs[1] == outputs[2]
+
+
+def test_three_roots_thread_rendering(gen_paths):  # type: ignore
+    """ Verifies that rendering types across threads produces the same output as rendering serially.
+    """
+    root_namespaces = [str(gen_paths.dsdl_dir / Path(name)) for name in ("scotec", "huckco", "esmeinc")]
+    language_context = LanguageContextBuilder(include_experimental_languages=True).set_target_language("js").create()
+
+    outputs = {}
+    for jobs, render_threads in ((1, False), (3, True)):
+        out_dir = gen_paths.out_dir / Path(f"jobs_{jobs}")
+        index = Namespace.Identity(out_dir, language_context)
+        for root_namespace in root_namespaces:
+            Namespace.read_namespace(index, root_namespace, root_namespaces, allow_unregulated_fixed_port_id=True)
+        generator = DSDLCodeGenerator(
+            index, templates_dir=gen_paths.templates_dir, jobs=jobs, render_threads=render_threads
+        )
+        generated = list(generator.generate_all(False))
+        outputs[jobs] = [(Path(p).relative_to(out_dir), Path(p).read_text(encoding="utf-8")) for p in generated]
+
+    assert outputs[1] == outputs[3]
+
+
+def test_three_roots_serial_rendering_by_default(gen_paths, monkeypatch):  # type: ignore
+    """ Verifies that a jobs count alone does not move rendering into worker processes.
+    """
+    root_namespaces = [str(gen_paths.dsdl_dir / Path(name)) for name in ("scotec", "huckco", "esmeinc")]
+    language_context = LanguageContextBuilder(include_experimental_languages=True).set_target_language("js").create()
+    index = Namespace.Identity(gen_paths.out_dir, language_context)
+    for root_namespace in root_namespaces:
+        Namespace.read_namespace(index, root_namespace, root_namespaces, allow_unregulated_fixed_port_id=True)
+
+    def _no_pool(*args, **kwargs):  # type: ignore
+        raise AssertionError("rendering must stay in the main process unless render_processes is set")
+
+    monkeypatch.setattr(DSDLCodeGenerator, "_generate_types_in_pool", _no_pool)
+    generator = DSDLCodeGenerator(index, templates_dir=gen_paths.templates_dir, jobs=4)
+    assert len(list(generator.generate_all(False))) == 3
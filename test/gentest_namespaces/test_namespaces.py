@@ -7,10 +7,15 @@
 """Tests for the namespace module."""
 
 import json
+import multiprocessing.pool
+import os
+import shutil
+import threading
+import time
 from copy import copy
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Tuple
+from typing import Any, List, Tuple
 from unittest.mock import MagicMock
 
 import pytest
@@ -18,7 +23,14 @@ from pydsdl import Any as AnyPydsdlType
 from pydsdl import CompositeType, Version
 
 from nunavut import DSDLCodeGenerator, ResourceSearchPolicy, YesNoDefault
-from nunavut._namespace import Generatable, Namespace, build_namespace_tree
+from nunavut._caches import PersistentParseResultStore
+from nunavut._namespace import (
+    Generatable,
+    Namespace,
+    ParseResultStore,
+    _read_files_strategy,
+    build_namespace_tree,
+)
 from nunavut.lang import Language, LanguageContext, LanguageContextBuilder
 
 # -- FIXTURES AND HELPER FUNCTIONS ---------------------------------------------------
@@ -231,6 +243,40 @@ def test_add_types(gen_paths: Any) -> None:
     assert index.find_output_path_for_type(aves3) == chordata.find_output_path_for_type(aves3)
 
 
+def test_find_output_path_for_type_does_not_search(gen_paths: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify that output path lookups are answered from the index without walking the namespace tree."""
+    lctx = LanguageContextBuilder().set_target_language("c").create()
+
+    def _make_type(namespace_components: List[str], short_name: str) -> Any:
+        dsdl_type = MagicMock(spec=CompositeType)
+        dsdl_type.full_namespace = ".".join(namespace_components)
+        dsdl_type.namespace_components = namespace_components
+        dsdl_type.short_name = short_name
+        dsdl_type.full_name = f"{dsdl_type.full_namespace}.{short_name}"
+        dsdl_type.version = MagicMock(spec=Version)
+        dsdl_type.version.major = 1
+        dsdl_type.version.minor = 0
+        dsdl_type.source_file_path_to_root = gen_paths.out_dir / Path(namespace_components[0])
+        dsdl_type.source_file_path = gen_paths.out_dir / Path(*namespace_components) / Path(f"{short_name}.1.0.dsdl")
+        return dsdl_type
+
+    index = Namespace.Identity(gen_paths.out_dir, lctx)
+    types = [_make_type(["animalia", f"genus{i}"], "Species") for i in range(10)]
+    Namespace.add_types(index, [(t, []) for t in types])
+    expected = dict(index.get_all_datatypes())
+    assert len(expected) == len(types)
+
+    def _no_search(*args: Any, **kwargs: Any) -> Any:
+        raise AssertionError("find_output_path_for_type must not walk the namespace tree.")
+
+    for method in ("get_nested_namespaces", "get_nested_namespace", "get_root_namespace", "get_all_datatypes"):
+        monkeypatch.setattr(Namespace, method, _no_search)
+    for dsdl_type in types:
+        assert index.find_output_path_for_type(dsdl_type) == expected[dsdl_type]
+    # An equivalent type parsed separately is found by its name and version.
+    assert index.find_output_path_for_type(_make_type(["animalia", "genus9"], "Species")) == expected[types[-1]]
+
+
 def test_read_with_non_index_value(gen_paths: Any) -> None:
     """Test the read_files method with a bad value."""
 
@@ -259,6 +305,212 @@ def test_read_with_non_index_value(gen_paths: Any) -> None:
         Namespace.read_files(animalia_root, root_namespace_dir, None)
 
 
+def test_read_files_parses_each_file_once(gen_paths: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify that types discovered as dependencies are not parsed again when they are also targets."""
+    import pydsdl
+
+    real_read_files = pydsdl.read_files
+    read_files_targets = []
+
+    def _counting_read_files(dsdl_files, *args, **kwargs):  # type: ignore
+        read_files_targets.append(Path(dsdl_files).name)
+        return real_read_files(dsdl_files, *args, **kwargs)
+
+    monkeypatch.setattr(pydsdl, "read_files", _counting_read_files)
+
+    timer = gen_paths.dsdl_dir / Path("scotec") / Path("mcu") / Path("Timer.0.1.dsdl")
+    timestamp = gen_paths.dsdl_dir / Path("uavcan") / Path("time") / Path("SynchronizedTimestamp.1.0.dsdl")
+    root_namespaces = [gen_paths.dsdl_dir / Path("uavcan"), gen_paths.dsdl_dir / Path("scotec")]
+    lctx = LanguageContextBuilder().set_target_language("c").create()
+    parse_store = ParseResultStore()
+
+    index = Namespace.read_files(gen_paths.out_dir, lctx, timer, root_namespaces, jobs=1, parse_store=parse_store)
+    assert read_files_targets == ["Timer.0.1.dsdl"]
+    assert len(list(index.get_all_datatypes())) == 2
+    assert timestamp in parse_store
+
+    # The dependency is now a target but it was already parsed during this run.
+    Namespace.read_files(index, [timer, timestamp], root_namespaces, jobs=1, parse_store=parse_store)
+    assert read_files_targets == ["Timer.0.1.dsdl"]
+    assert parse_store.hits > 0
+
+    for dsdl_type, generatable in index.get_all_datatypes():
+        if dsdl_type.short_name == "Timer":
+            assert [str(t) for t in generatable.input_types] == ["uavcan.time.SynchronizedTimestamp.1.0"]
+        else:
+            assert generatable.input_types == []
+
+
+def _write_constant_only_dependency(dsdl_dir: Path) -> Tuple[Path, Path, Path]:
+    """
+    Write ns.C.1.0, which contains ns.A.1.0, whose only reference to ns.B.1.0 is a constant in an array capacity.
+    """
+    ns_dir = dsdl_dir / Path("ns")
+    ns_dir.mkdir(parents=True)
+    b = ns_dir / Path("B.1.0.dsdl")
+    b.write_text("uint8 LIMIT = 7\n@sealed\n")
+    a = ns_dir / Path("A.1.0.dsdl")
+    a.write_text("uint8[<=ns.B.1.0.LIMIT] data\n@sealed\n")
+    c = ns_dir / Path("C.1.0.dsdl")
+    c.write_text("ns.A.1.0 a\n@sealed\n")
+    return a, b, c
+
+
+def test_read_files_constant_only_dependency(gen_paths: Any) -> None:
+    """Verify that types parsed as dependencies keep inputs they only reference from constant expressions."""
+    _, _, c = _write_constant_only_dependency(gen_paths.out_dir / Path("dsdl"))
+    lctx = LanguageContextBuilder().set_target_language("c").create()
+
+    index = Namespace.read_files(gen_paths.out_dir, lctx, c, [c.parent], jobs=1)
+    inputs = {str(t): [str(i) for i in g.input_types] for t, g in index.get_all_datatypes()}
+    assert sorted(inputs["ns.C.1.0"]) == ["ns.A.1.0", "ns.B.1.0"]
+    assert inputs["ns.A.1.0"] == ["ns.B.1.0"]
+
+
+def test_read_files_dependency_inputs_exclude_siblings(gen_paths: Any) -> None:
+    """Verify that types parsed as dependencies do not take on the other dependencies of the type that found them."""
+    ns_dir = gen_paths.out_dir / Path("dsdl") / Path("ns")
+    ns_dir.mkdir(parents=True)
+    (ns_dir / Path("B.1.0.dsdl")).write_text("uint8 b\n@sealed\n")
+    (ns_dir / Path("C.1.0.dsdl")).write_text("uint8 c\n@sealed\n")
+    top = ns_dir / Path("Top.1.0.dsdl")
+    top.write_text("ns.B.1.0 b\nns.C.1.0 c\n@sealed\n")
+    lctx = LanguageContextBuilder().set_target_language("c").create()
+
+    index = Namespace.read_files(gen_paths.out_dir, lctx, top, [ns_dir], jobs=1)
+    inputs = {str(t): [str(i) for i in g.input_types] for t, g in index.get_all_datatypes()}
+    assert sorted(inputs["ns.Top.1.0"]) == ["ns.B.1.0", "ns.C.1.0"]
+    assert inputs["ns.B.1.0"] == []
+    assert inputs["ns.C.1.0"] == []
+
+
+def test_read_files_streams_work(gen_paths: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify that new reads are submitted as soon as any outstanding read completes."""
+    import pydsdl
+
+    real_read_files = pydsdl.read_files
+    started = []
+    others_started = threading.Semaphore(0)
+
+    def _slow_uart_read_files(dsdl_files, *args, **kwargs):  # type: ignore
+        name = Path(dsdl_files).name
+        started.append(name)
+        if name == "Uart.0.2.dsdl":
+            # Only finishes once both other files were read which requires a completed read to free up a slot.
+            for _ in range(2):
+                assert others_started.acquire(timeout=10), "Reads were not submitted while another was outstanding."
+        else:
+            others_started.release()
+        return real_read_files(dsdl_files, *args, **kwargs)
+
+    monkeypatch.setattr(pydsdl, "read_files", _slow_uart_read_files)
+
+    files = [
+        gen_paths.dsdl_dir / Path("uavcan") / Path("time") / Path("SynchronizedTimestamp.1.0.dsdl"),
+        gen_paths.dsdl_dir / Path("scotec") / Path("mcu") / Path("Uart.0.2.dsdl"),
+        gen_paths.dsdl_dir / Path("scotec") / Path("typedef") / Path("str") / Path("ATOMIC_TYPE.0.1.dsdl"),
+    ]
+    root_namespaces = [gen_paths.dsdl_dir / Path("uavcan"), gen_paths.dsdl_dir / Path("scotec")]
+    lctx = LanguageContextBuilder().set_target_language("c").create()
+    index = Namespace.Identity(gen_paths.out_dir, lctx)
+    args = (root_namespaces, None, None, False)
+
+    with multiprocessing.pool.ThreadPool(processes=2) as pool:
+        _read_files_strategy(index, pool.apply_async, files, 0, False, args, ParseResultStore(), max_in_flight=2)
+
+    assert sorted(started) == sorted(f.name for f in files)
+    assert len(list(index.get_all_datatypes())) == 3
+
+
+def test_persistent_parse_cache(gen_paths: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify that a warm parse cache skips the pydsdl frontend and that changed dependencies invalidate entries."""
+    import pydsdl
+
+    real_read_files = pydsdl.read_files
+    read_files_targets = []
+
+    def _counting_read_files(dsdl_files, *args, **kwargs):  # type: ignore
+        read_files_targets.append(Path(dsdl_files).name)
+        return real_read_files(dsdl_files, *args, **kwargs)
+
+    monkeypatch.setattr(pydsdl, "read_files", _counting_read_files)
+
+    dsdl_dir = gen_paths.out_dir / Path("dsdl")
+    shutil.copytree(gen_paths.dsdl_dir / Path("uavcan"), dsdl_dir / Path("uavcan"))
+    shutil.copytree(gen_paths.dsdl_dir / Path("scotec"), dsdl_dir / Path("scotec"))
+    timer = dsdl_dir / Path("scotec") / Path("mcu") / Path("Timer.0.1.dsdl")
+    timestamp = dsdl_dir / Path("uavcan") / Path("time") / Path("SynchronizedTimestamp.1.0.dsdl")
+    root_namespaces = [dsdl_dir / Path("uavcan"), dsdl_dir / Path("scotec")]
+    cache_dir = gen_paths.out_dir / Path("cache")
+    lctx = LanguageContextBuilder().set_target_language("c").create()
+
+    def _read() -> Namespace:
+        parse_store = PersistentParseResultStore(cache_dir, lookup_directories=root_namespaces)
+        return Namespace.read_files(gen_paths.out_dir, lctx, timer, root_namespaces, jobs=1, parse_store=parse_store)
+
+    cold_index = _read()
+    assert read_files_targets == ["Timer.0.1.dsdl"]
+
+    warm_index = _read()
+    assert read_files_targets == ["Timer.0.1.dsdl"]
+    assert [str(t) for t, _ in warm_index.get_all_datatypes()] == [str(t) for t, _ in cold_index.get_all_datatypes()]
+
+    # Changing a dependency invalidates the entries that depend upon it.
+    timestamp.write_text(timestamp.read_text() + "\n# changed\n")
+    _read()
+    assert read_files_targets == ["Timer.0.1.dsdl", "Timer.0.1.dsdl"]
+
+    # A different context uses different entries.
+    assert PersistentParseResultStore(cache_dir, lookup_directories=root_namespaces[:1]).get(timer) is None
+
+
+def test_persistent_parse_cache_constant_only_dependency(gen_paths: Any) -> None:
+    """Verify that entries are invalidated by changes to files only referenced from constant expressions."""
+    a, b, c = _write_constant_only_dependency(gen_paths.out_dir / Path("dsdl"))
+    cache_dir = gen_paths.out_dir / Path("cache")
+    lctx = LanguageContextBuilder().set_target_language("c").create()
+
+    def _read(target: Path) -> Any:
+        parse_store = PersistentParseResultStore(cache_dir, lookup_directories=[c.parent])
+        index = Namespace.read_files(gen_paths.out_dir, lctx, target, [c.parent], jobs=1, parse_store=parse_store)
+        return {str(t): t for t, _ in index.get_all_datatypes()}
+
+    # Warm the cache with entries for all three types.
+    assert "ns.A.1.0" in _read(c)
+
+    b.write_text(b.read_text().replace("LIMIT = 7", "LIMIT = 9"))
+    assert str(_read(a)["ns.A.1.0"].fields[0].data_type) == "saturated uint8[<=9]"
+
+    # A new file in a lookup directory may change how references resolve so it starts a new set of entries.
+    assert PersistentParseResultStore(cache_dir, lookup_directories=[c.parent]).get(a) is not None
+    (c.parent / Path("B.1.1.dsdl")).write_text("uint8 LIMIT = 3\n@sealed\n")
+    assert PersistentParseResultStore(cache_dir, lookup_directories=[c.parent]).get(a) is None
+
+
+def test_persistent_parse_cache_eviction(gen_paths: Any) -> None:
+    """Verify that eviction removes entries by age and then by size."""
+    timer = gen_paths.dsdl_dir / Path("scotec") / Path("mcu") / Path("Timer.0.1.dsdl")
+    root_namespaces = [gen_paths.dsdl_dir / Path("uavcan"), gen_paths.dsdl_dir / Path("scotec")]
+    cache_dir = gen_paths.out_dir / Path("cache")
+    lctx = LanguageContextBuilder().set_target_language("c").create()
+
+    parse_store = PersistentParseResultStore(cache_dir, lookup_directories=root_namespaces)
+    Namespace.read_files(gen_paths.out_dir, lctx, timer, root_namespaces, jobs=1, parse_store=parse_store)
+    entries = sorted(parse_store.cache_dir.glob("*/*.pickle"))
+    assert len(entries) == 2
+    assert parse_store.evict() == 0
+
+    # Make one entry look old and evict it by age.
+    old_time = time.time() - 2 * 24 * 60 * 60
+    os.utime(entries[0], (old_time, old_time))
+    assert PersistentParseResultStore(cache_dir, max_age_seconds=24 * 60 * 60).evict() == 1
+    assert not entries[0].exists()
+
+    # Then evict the rest by size.
+    assert PersistentParseResultStore(cache_dir, max_size_bytes=1).evict() == 1
+    assert not entries[1].exists()
+
+
 def test_generatable_constructor():  # type: ignore
     """Test the Generatable constructor."""
     path = Path("test")
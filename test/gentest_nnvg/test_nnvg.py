@@ -7,17 +7,31 @@
 """
 Tests similar to test_nnvg_legacy.py but written after the 3.0 refactor.
 """
+import io
+import itertools
 import json
 import os
+import re
+import shutil
+import socket
 import subprocess
+import sys
+import tempfile
+import threading
 from argparse import ArgumentError
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Dict, List
 
 import pydsdl
 import pytest
 
+import nunavut._caches
+import nunavut._generators
+import nunavut._postprocessors
 import nunavut._version
+import nunavut.jinja.jinja2
+import nunavut.jinja.precompile
+import nunavut.cli.runners
 from nunavut.lang import LanguageContextBuilder, UnsupportedLanguageError
 from nunavut.lang._language import LanguageClassLoader
 
@@ -965,3 +979,734 @@ def test_colon_syntax(gen_paths: Any, run_nnvg_main: Callable) -> None:
     completed = result.stdout.decode("utf-8").split(";")
     completed_wo_empty = sorted([Path(i) for i in completed if len(i) > 0])
     assert expected_output == completed_wo_empty
+
+
+@pytest.mark.parametrize("use_env", [True, False])
+def test_parse_cache_dir(gen_paths: Any, run_nnvg_main: Callable, use_env: bool) -> None:
+    """
+    Verifies that nnvg populates and reuses a parse cache when one is provided.
+    """
+    cache_dir = gen_paths.out_dir / Path("parse_cache")
+    nnvg_args = [
+        "--no-target-namespaces",
+        "--outdir",
+        gen_paths.out_dir.as_posix(),
+        "--target-language",
+        "c",
+        "--omit-serialization-support",
+        "--list-outputs",
+        (gen_paths.dsdl_dir / Path("herringtec") / Path("Carp.1.0.dsdl")).as_posix(),
+        "--lookup-dir",
+        (gen_paths.dsdl_dir / Path("herringtec")).as_posix(),
+    ]
+    env = {}
+    if use_env:
+        env["NUNAVUT_PARSE_CACHE_DIR"] = cache_dir.as_posix()
+    else:
+        nnvg_args += ["--parse-cache-dir", cache_dir.as_posix()]
+
+    cold_result = run_nnvg_main(gen_paths, nnvg_args, env=env)
+    assert 0 == cold_result.returncode
+    assert len(list(cache_dir.glob("parse/*/*.pickle"))) > 0
+
+    warm_result = run_nnvg_main(gen_paths, nnvg_args, env=env)
+    assert 0 == warm_result.returncode
+    assert cold_result.stdout == warm_result.stdout
+
+
+def test_write_if_changed(gen_paths: Any, run_nnvg_main: Callable) -> None:
+    """
+    Verifies that --write-if-changed leaves unchanged outputs, including support files, untouched.
+    """
+    dsdl_dir = gen_paths.out_dir / Path("dsdl") / Path("herringtec")
+    dsdl_dir.mkdir(parents=True)
+    for dsdl_file in (gen_paths.dsdl_dir / Path("herringtec")).glob("*.dsdl"):
+        (dsdl_dir / dsdl_file.name).write_text(dsdl_file.read_text())
+    out_dir = gen_paths.out_dir / Path("out")
+
+    nnvg_args = [
+        "--outdir",
+        out_dir.as_posix(),
+        "--target-language",
+        "c",
+        "--write-if-changed",
+        dsdl_dir.as_posix(),
+    ]
+
+    assert 0 == run_nnvg_main(gen_paths, nnvg_args).returncode
+    outputs = sorted(out_dir.glob("**/*.h"))
+    assert len(outputs) > 2
+    # Set the modification times in the past so any rewrite is detectable.
+    for output in outputs:
+        os.utime(output, (1, 1))
+
+    assert 0 == run_nnvg_main(gen_paths, nnvg_args).returncode
+    assert sorted(out_dir.glob("**/*.h")) == outputs
+    assert [output.stat().st_mtime for output in outputs] == [1] * len(outputs)
+    assert [p for p in out_dir.glob("**/.*")] == []
+
+    carp = dsdl_dir / Path("Carp.1.0.dsdl")
+    carp.write_text(carp.read_text().replace("gill_count", "fin_count"))
+    result = nunavut.generate_all(
+        "c", [carp, dsdl_dir / Path("Timer.2.1.dsdl")], [dsdl_dir], out_dir, write_if_changed=True
+    )
+    rewritten = [output for output in outputs if output.stat().st_mtime != 1]
+    assert [output.name for output in rewritten] == ["Carp_1_0.h"]
+    assert len(result.skipped_files) == len(outputs) - 1
+
+
+def test_template_cache_dir(gen_paths: Any, run_nnvg_main: Callable) -> None:
+    """
+    Verifies that --template-cache-dir persists compiled templates without changing the generated output.
+    """
+    cache_dir = gen_paths.out_dir / Path("template_cache")
+    outputs = []
+    for run in ("cold", "warm"):
+        out_dir = gen_paths.out_dir / Path(run)
+        nnvg_args = [
+            "--outdir",
+            out_dir.as_posix(),
+            "--target-language",
+            "c",
+            "--template-cache-dir",
+            cache_dir.as_posix(),
+            (gen_paths.dsdl_dir / Path("herringtec")).as_posix(),
+        ]
+        assert 0 == run_nnvg_main(gen_paths, nnvg_args).returncode
+        outputs.append({p.relative_to(out_dir): p.read_text() for p in out_dir.glob("**/*.h")})
+        if run == "cold":
+            cached = {p: p.stat().st_mtime_ns for p in cache_dir.glob("*.cache")}
+            assert len(cached) > 0
+
+    assert len(outputs[0]) > 0
+    assert outputs[0] == outputs[1]
+    # The warm run loaded every template from the cache so nothing was written again.
+    assert {p: p.stat().st_mtime_ns for p in cache_dir.glob("*.cache")} == cached
+
+
+def test_list_manifest(gen_paths: Any, run_nnvg_main: Callable, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Verifies that --list-manifest reuses a recorded listing until the inputs change.
+    """
+    dsdl_dir = gen_paths.out_dir / Path("dsdl") / Path("herringtec")
+    dsdl_dir.mkdir(parents=True)
+    for dsdl_file in (gen_paths.dsdl_dir / Path("herringtec")).glob("*.dsdl"):
+        (dsdl_dir / dsdl_file.name).write_text(dsdl_file.read_text())
+    manifest = gen_paths.out_dir / Path("manifest.json")
+
+    nnvg_args = [
+        "--outdir",
+        (gen_paths.out_dir / Path("out")).as_posix(),
+        "--target-language",
+        "c",
+        "--dry-run",
+        "--list-inputs",
+        "--list-outputs",
+        "--list-format",
+        "json",
+        "--list-manifest",
+        manifest.as_posix(),
+        dsdl_dir.as_posix(),
+    ]
+
+    def _list() -> Any:
+        result = run_nnvg_main(gen_paths, nnvg_args)
+        assert 0 == result.returncode
+        return json.loads(result.stdout.decode("utf-8"))
+
+    expected = _list()
+    assert manifest.exists()
+
+    generate_all_calls = []
+    real_generate_all = nunavut._generators.generate_all
+
+    def _counting_generate_all(*args: Any, **kwargs: Any) -> Any:
+        generate_all_calls.append(args)
+        return real_generate_all(*args, **kwargs)
+
+    monkeypatch.setattr(nunavut._generators, "generate_all", _counting_generate_all)
+
+    # Nothing changed so nothing is parsed.
+    assert _list() == expected
+    assert len(generate_all_calls) == 0
+
+    # Touching a file without changing it does not invalidate the listing.
+    carp = dsdl_dir / Path("Carp.1.0.dsdl")
+    os.utime(carp, (1, 1))
+    assert _list() == expected
+    assert len(generate_all_calls) == 0
+
+    # Nor do arguments that only change how files are rendered.
+    nnvg_args[:0] = ["--embed-auditing-info", "--pp-trim-trailing-whitespace", "--file-mode", "0o640"]
+    assert _list() == expected
+    assert len(generate_all_calls) == 0
+    del nnvg_args[:4]
+
+    # Different arguments or a new type do.
+    nnvg_args.insert(0, "--omit-serialization-support")
+    assert _list()["outputs"] != expected["outputs"]
+    assert len(generate_all_calls) == 1
+    nnvg_args.pop(0)
+    (dsdl_dir / Path("Sprat.1.0.dsdl")).write_text("@sealed\n")
+    listing = _list()
+    assert len(generate_all_calls) == 2
+    assert len(listing["outputs"]) == len(expected["outputs"]) + 1
+    assert _list() == listing
+    assert len(generate_all_calls) == 2
+
+
+@pytest.mark.parametrize(
+    "language_args",
+    [
+        ["-l", "c"],
+        ["-l", "c", "--templates-dir", "{templates}", "--index-file", "index", "--omit-serialization-support"],
+        ["-l", "cpp", "--include-experimental-languages", "--generate-support", "only"],
+        ["-l", "py", "--generate-namespace-types"],
+    ],
+)
+def test_list_manifest_without_templates(
+    gen_paths: Any, run_nnvg_main: Callable, monkeypatch: pytest.MonkeyPatch, language_args: List[str]
+) -> None:
+    """
+    Verifies that recording a --list-manifest lists the same files as a dry run without one, without creating a
+    template environment, and keeps the parse results next to the manifest for the next time it is recorded.
+    """
+    templates_dir = gen_paths.out_dir / Path("templates")
+    templates_dir.mkdir()
+    (templates_dir / Path("Any.j2")).write_text("{{ T }}\n")
+    (templates_dir / Path("index.j2")).write_text("{{ N }}\n")
+    nnvg_args = [
+        *(arg.format(templates=templates_dir.as_posix()) for arg in language_args),
+        "--outdir",
+        (gen_paths.out_dir / Path("out")).as_posix(),
+        "--dry-run",
+        "--list-inputs",
+        "--list-outputs",
+        "--list-format",
+        "json",
+        "--lookup-dir",
+        (gen_paths.dsdl_dir / Path("scotec")).as_posix(),
+        (gen_paths.dsdl_dir / Path("uavcan")).as_posix(),
+    ]
+
+    def _list(*extra_args: str) -> Any:
+        result = run_nnvg_main(gen_paths, [*extra_args, *nnvg_args])
+        assert 0 == result.returncode
+        listing = json.loads(result.stdout.decode("utf-8"))
+        return {key: sorted(paths) for key, paths in listing.items()}
+
+    expected = _list()
+    assert len(expected["outputs"]) > 0
+
+    def _no_environment(*_: Any) -> Any:
+        raise AssertionError("A template environment was created to record a listing.")
+
+    monkeypatch.setattr(nunavut.jinja.CodeGenEnvironmentBuilder, "create", _no_environment)
+    manifest = gen_paths.out_dir / Path("manifest.json")
+    monkeypatch.delenv("NUNAVUT_PARSE_CACHE_DIR", raising=False)
+    assert _list("--list-manifest", manifest.as_posix()) == expected
+    assert manifest.exists()
+    assert any(manifest.with_suffix(".parse_cache").iterdir())
+
+
+@pytest.mark.parametrize("job_file_suffix", [".json", ".toml"])
+def test_job_file(
+    gen_paths: Any, run_nnvg_main: Callable, monkeypatch: pytest.MonkeyPatch, job_file_suffix: str
+) -> None:
+    """
+    Verifies that --job-file runs several jobs in one process, sharing parse results, and lists their combined outputs.
+    """
+    dsdl_dir = gen_paths.dsdl_dir / Path("herringtec")
+    jobs = [
+        {
+            "args": [
+                "-l",
+                language,
+                "--include-experimental-languages",
+                "--outdir",
+                (gen_paths.out_dir / Path(language)).as_posix(),
+                dsdl_dir.as_posix(),
+            ]
+        }
+        for language in ("c", "cpp")
+    ]
+    job_file = gen_paths.out_dir / Path("jobs").with_suffix(job_file_suffix)
+    if job_file_suffix == ".toml":
+        pytest.importorskip("tomllib")
+        job_file.write_text(
+            "".join("[[jobs]]\nargs = [{}]\n".format(", ".join(json.dumps(a) for a in job["args"])) for job in jobs)
+        )
+    else:
+        job_file.write_text(json.dumps({"jobs": jobs}))
+
+    parse_stores = []
+    real_create_parse_store = nunavut._generators.create_parse_store
+
+    def _recording_create_parse_store(*args: Any, **kwargs: Any) -> Any:
+        parse_stores.append(real_create_parse_store(*args, **kwargs))
+        return parse_stores[-1]
+
+    monkeypatch.setattr(nunavut._generators, "create_parse_store", _recording_create_parse_store)
+
+    result = run_nnvg_main(gen_paths, ["--job-file", job_file, "--list-outputs", "--list-format", "json"])
+    assert 0 == result.returncode
+    listing = json.loads(result.stdout.decode("utf-8"))
+    assert [job["args"] for job in listing["jobs"]] == [job["args"] for job in jobs]
+    assert listing["outputs"] == listing["jobs"][0]["outputs"] + listing["jobs"][1]["outputs"]
+    assert any(output.endswith("Carp_1_0.h") for output in listing["jobs"][0]["outputs"])
+    assert any(output.endswith("Carp_1_0.hpp") for output in listing["jobs"][1]["outputs"])
+
+    # Both jobs parse the same DSDL so the second job finds everything already parsed.
+    assert len(parse_stores) == 1
+    assert parse_stores[0].hits > 0
+    assert not (gen_paths.out_dir / Path("c")).exists()
+
+    assert 0 == run_nnvg_main(gen_paths, ["--job-file", job_file]).returncode
+    assert all(Path(output).exists() for output in listing["outputs"])
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Requires Unix domain sockets.")
+def test_serve_and_connect(gen_paths: Any) -> None:
+    """
+    Verifies that a server started by --serve runs requests sent with --connect, reuses parse results between them,
+    and picks up changed DSDL.
+    """
+    from nunavut.cli import _make_parser
+    from nunavut.cli.client import forward
+    from nunavut.cli.parsers import NunavutArgumentParser
+    from nunavut.cli.server import GenerationServer
+
+    dsdl_dir = gen_paths.out_dir / Path("herringtec")
+    shutil.copytree(gen_paths.dsdl_dir / Path("herringtec"), dsdl_dir)
+    out_dir = gen_paths.out_dir / Path("generated")
+    args = ["-l", "c", "--outdir", out_dir.as_posix(), dsdl_dir.as_posix()]
+
+    # Socket paths are limited to around 100 bytes so the socket cannot go in the, deeply nested, output directory.
+    with tempfile.TemporaryDirectory() as socket_dir:
+        socket_path = str(Path(socket_dir) / Path("nnvg.sock"))
+        with GenerationServer(socket_path, _make_parser(NunavutArgumentParser)) as server:
+            server_thread = threading.Thread(target=server.serve_forever)
+            server_thread.start()
+            try:
+
+                def _request(request_args: List[str]) -> str:
+                    stdout = io.StringIO()
+                    assert 0 == forward(socket_path, request_args, stdout, io.StringIO())
+                    return stdout.getvalue()
+
+                listing = _request(args + ["--list-outputs"])
+                assert "Carp_1_0.h" in listing
+                assert not out_dir.exists()
+
+                _request(args)
+                carp_header = out_dir / Path("herringtec", "Carp_1_0.h")
+                assert carp_header.exists()
+                assert "whisker_count" not in carp_header.read_text()
+
+                # Everything was parsed by the first request.
+                (parse_store,) = server._parse_stores.values()  # pylint: disable=protected-access
+                assert parse_store.hits > 0
+                assert _request(args + ["--list-outputs"]) == listing
+
+                (dsdl_dir / Path("Carp.1.0.dsdl")).write_text("uint8 whisker_count\n@sealed\n")
+                _request(args)
+                assert "whisker_count" in carp_header.read_text()
+
+                # Invalid arguments are reported to the client and do not stop the server.
+                stderr = io.StringIO()
+                assert 0 != forward(socket_path, ["--no-such-option"], io.StringIO(), stderr)
+                assert "--no-such-option" in stderr.getvalue()
+                assert "Carp_1_0.h" in _request(args + ["--list-outputs"])
+            finally:
+                server.shutdown()
+                server_thread.join()
+        assert not Path(socket_path).exists()
+
+
+def test_connect_arguments(gen_paths: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Verifies that --connect is validated like any other argument and that only the option itself is removed from the
+    arguments sent to the server.
+    """
+    import nunavut.cli.client
+
+    with pytest.raises(SystemExit) as exit_info:
+        nunavut.cli.runners.main(["--connect"])
+    assert exit_info.value.code == 2
+
+    forwarded = []
+
+    def _forward(socket_path: str, args: List[str]) -> int:
+        forwarded.append((socket_path, args))
+        return 0
+
+    monkeypatch.setattr(nunavut.cli.client, "forward", _forward)
+    args = ["-l", "c", "--outdir", gen_paths.out_dir.as_posix(), "--pp-run-program-arg=--connect"]
+    assert 0 == nunavut.cli.runners.main(args[:2] + ["--connect", "nnvg.sock"] + args[2:])
+    assert forwarded == [("nnvg.sock", args)]
+
+
+def test_watch_regenerates_affected_outputs(gen_paths: Any) -> None:
+    """
+    Verifies that --watch only renders the outputs affected by each change to DSDL or templates.
+    """
+    from nunavut.cli import _make_parser
+    from nunavut.cli.parsers import NunavutArgumentParser
+    from nunavut.cli.watch import WatchRunner
+
+    dsdl_dir = gen_paths.out_dir / Path("pond")
+    dsdl_dir.mkdir()
+    (dsdl_dir / Path("Fin.1.0.dsdl")).write_text("uint8 rays\n@sealed\n")
+    (dsdl_dir / Path("Koi.1.0.dsdl")).write_text("Fin.1.0 fin\n@sealed\n")
+    (dsdl_dir / Path("Lily.1.0.dsdl")).write_text("uint8 petals\n@sealed\n")
+    templates_dir = gen_paths.out_dir / Path("pond_templates")
+    templates_dir.mkdir()
+    (templates_dir / Path("StructureType.j2")).write_text("{% include 'fields.j2' %}\n")
+    (templates_dir / Path("fields.j2")).write_text("{{ T.full_name }}{% for f in T.fields %} {{ f.name }}{% endfor %}")
+    out_dir = gen_paths.out_dir / Path("pond_out")
+
+    watcher = WatchRunner(
+        _make_parser(NunavutArgumentParser),
+        ["--watch", "-l", "c", "--templates-dir", str(templates_dir), "--outdir", str(out_dir), str(dsdl_dir)],
+    )
+    assert watcher.poll()
+    assert not watcher.poll()
+
+    def _output(name: str) -> Path:
+        return out_dir / Path("pond", f"{name}_1_0.h")
+
+    def _rendered() -> List[str]:
+        assert watcher.result is not None
+        skipped = set(watcher.result.skipped_files)
+        return sorted(p.stem for p in watcher.result.generated_files if p not in skipped)
+
+    assert _output("Koi").read_text() == "pond.Koi fin\n"
+
+    # Koi is built from Fin so both are rendered again.
+    (dsdl_dir / Path("Fin.1.0.dsdl")).write_text("uint8 rays\nuint8 spines\n@sealed\n")
+    assert watcher.poll()
+    assert _rendered() == ["Fin_1_0", "Koi_1_0"]
+    assert _output("Fin").read_text() == "pond.Fin rays spines\n"
+    support_files = watcher.result.support_files if watcher.result is not None else []
+    assert len(support_files) > 0
+    assert set(support_files) <= set(watcher.result.skipped_files if watcher.result is not None else [])
+
+    # Deleted outputs are rendered again.
+    _output("Lily").unlink()
+    (dsdl_dir / Path("Lily.1.0.dsdl")).write_text("uint8 petals\nuint8 pads\n@sealed\n")
+    assert watcher.poll()
+    assert _rendered() == ["Lily_1_0"]
+
+    # Templates that are only included by other templates affect every output.
+    (templates_dir / Path("fields.j2")).write_text("{{ T.short_name }}{% for f in T.fields %} {{ f.name }}{% endfor %}")
+    assert watcher.poll()
+    assert _rendered() == ["Fin_1_0", "Koi_1_0", "Lily_1_0"]
+    assert _output("Koi").read_text() == "Koi fin\n"
+
+    # Errors are logged and the change is retried along with the next one.
+    (dsdl_dir / Path("Fin.1.0.dsdl")).write_text("not valid dsdl\n")
+    assert not watcher.poll()
+    (dsdl_dir / Path("Fin.1.0.dsdl")).write_text("uint8 rays\n@sealed\n")
+    assert watcher.poll()
+    assert _rendered() == ["Fin_1_0", "Koi_1_0"]
+    assert _output("Fin").read_text() == "Fin rays\n"
+
+    with pytest.raises(SystemExit):
+        _make_parser(NunavutArgumentParser).parse_args(["--watch", "--list-outputs", "-l", "c", str(dsdl_dir)])
+
+
+def test_incremental(gen_paths: Any, run_nnvg_main: Callable) -> None:
+    """
+    Verifies that --incremental only renders outputs whose inputs or settings changed since the last run.
+    """
+    dsdl_dir = gen_paths.out_dir / Path("pond")
+    dsdl_dir.mkdir()
+    (dsdl_dir / Path("Fin.1.0.dsdl")).write_text("uint8 rays\n@sealed\n")
+    (dsdl_dir / Path("Koi.1.0.dsdl")).write_text("Fin.1.0 fin\n@sealed\n")
+    (dsdl_dir / Path("Lily.1.0.dsdl")).write_text("uint8 petals\n@sealed\n")
+    out_dir = gen_paths.out_dir / Path("out")
+    target_files = sorted(dsdl_dir.glob("*.dsdl"))
+
+    def _rendered(**kwargs: Any) -> List[str]:
+        result = nunavut.generate_all("c", target_files, [dsdl_dir], out_dir, incremental=True, **kwargs)
+        skipped = set(result.skipped_files)
+        return sorted(p.name for p in itertools.chain(result.generated_files, result.support_files) if p not in skipped)
+
+    everything = ["Fin_1_0.h", "Koi_1_0.h", "Lily_1_0.h", "serialization.h"]
+    assert _rendered() == everything
+    assert (out_dir / Path(nunavut._caches.GenerationGraph.FILE_NAME)).is_file()
+    assert _rendered() == []
+
+    # Koi is built from Fin so both are rendered again.
+    (dsdl_dir / Path("Fin.1.0.dsdl")).write_text("uint8 rays\nuint8 spines\n@sealed\n")
+    assert _rendered() == ["Fin_1_0.h", "Koi_1_0.h"]
+    assert "spines" in (out_dir / Path("pond", "Fin_1_0.h")).read_text()
+
+    # Deleted or edited outputs are generated again.
+    (out_dir / Path("pond", "Lily_1_0.h")).unlink()
+    with (out_dir / Path("pond", "Koi_1_0.h")).open("a") as koi_header:
+        koi_header.write("// edited\n")
+    assert _rendered() == ["Koi_1_0.h", "Lily_1_0.h"]
+
+    # Other settings render everything again.
+    assert _rendered(language_options={"enable_serialization_asserts": True}) == everything
+    assert _rendered(language_options={"enable_serialization_asserts": True}) == []
+
+    # Dry runs neither use nor change the graph.
+    assert (
+        0
+        == run_nnvg_main(
+            gen_paths, ["--incremental", "--dry-run", "-l", "c", "-O", str(out_dir), str(dsdl_dir)]
+        ).returncode
+    )
+    assert _rendered(language_options={"enable_serialization_asserts": True}) == []
+
+
+def test_incremental_post_processors(gen_paths: Any) -> None:
+    """
+    Verifies that --incremental compares post-processors by their cache_key and generates everything again for
+    post-processors that do not provide one.
+    """
+    dsdl_dir = gen_paths.out_dir / Path("pond")
+    dsdl_dir.mkdir()
+    (dsdl_dir / Path("Fin.1.0.dsdl")).write_text("uint8 rays\n@sealed\n")
+    out_dir = gen_paths.out_dir / Path("out")
+
+    class _Touch(nunavut._postprocessors.FilePostProcessor):
+        def __init__(self, on_file: Callable[[Path], None]):
+            self._on_file = on_file
+
+        def __call__(self, generated: Path) -> Path:
+            self._on_file(generated)
+            return generated
+
+    class _KeyedTouch(_Touch):
+        def cache_key(self) -> Any:
+            return "touch"
+
+    def _rendered(post_processor: nunavut._postprocessors.PostProcessor) -> List[str]:
+        result = nunavut.generate_all(
+            "c",
+            [dsdl_dir / Path("Fin.1.0.dsdl")],
+            [dsdl_dir],
+            out_dir,
+            incremental=True,
+            post_processors=[post_processor],
+        )
+        skipped = set(result.skipped_files)
+        return sorted(p.name for p in itertools.chain(result.generated_files, result.support_files) if p not in skipped)
+
+    everything = ["Fin_1_0.h", "serialization.h"]
+    assert _rendered(nunavut._postprocessors.LimitEmptyLines(1)) == everything
+    assert _rendered(nunavut._postprocessors.LimitEmptyLines(1)) == []
+    assert _rendered(nunavut._postprocessors.LimitEmptyLines(2)) == everything
+
+    # Post-processors holding objects whose repr differs from run to run are compared by their cache_key.
+    assert _rendered(_KeyedTouch(lambda _: None)) == everything
+    assert _rendered(_KeyedTouch(lambda _: None)) == []
+
+    # Without a cache_key nothing is known about a post-processor's settings.
+    assert _rendered(_Touch(lambda _: None)) == everything
+    assert _rendered(_Touch(lambda _: None)) == everything
+
+
+def test_incremental_constant_only_dependency(gen_paths: Any) -> None:
+    """
+    Verifies that --incremental renders a type again when a file it only references from a constant expression
+    changes, even if the type was only generated as a dependency of the target.
+    """
+    dsdl_dir = gen_paths.out_dir / Path("ns")
+    dsdl_dir.mkdir()
+    (dsdl_dir / Path("B.1.0.dsdl")).write_text("uint8 LIMIT = 7\n@sealed\n")
+    (dsdl_dir / Path("A.1.0.dsdl")).write_text("uint8[<=ns.B.1.0.LIMIT] data\n@sealed\n")
+    (dsdl_dir / Path("C.1.0.dsdl")).write_text("ns.A.1.0 a\n@sealed\n")
+    out_dir = gen_paths.out_dir / Path("out")
+
+    def _rendered() -> List[str]:
+        result = nunavut.generate_all("c", [dsdl_dir / Path("C.1.0.dsdl")], [dsdl_dir], out_dir, incremental=True)
+        skipped = set(result.skipped_files)
+        return sorted(p.name for p in result.generated_files if p not in skipped)
+
+    assert _rendered() == ["A_1_0.h", "B_1_0.h", "C_1_0.h"]
+    assert _rendered() == []
+
+    (dsdl_dir / Path("B.1.0.dsdl")).write_text("uint8 LIMIT = 9\n@sealed\n")
+    assert "A_1_0.h" in _rendered()
+    assert "data.count > 9U" in (out_dir / Path("ns", "A_1_0.h")).read_text()
+
+
+def test_startup_imports(gen_paths: Any) -> None:
+    """
+    Startup benchmark, using ``python -X importtime``, verifying that commands which do not generate anything do not
+    import pydsdl, Jinja, or the language support.
+    """
+    dsdl_dir = gen_paths.dsdl_dir / Path("herringtec")
+    manifest = gen_paths.out_dir / Path("manifest.json")
+    list_args = ["--dry-run", "--list-outputs", "--list-manifest", manifest.as_posix(), dsdl_dir.as_posix()]
+
+    def _import_times(args: List[str]) -> Dict[str, int]:
+        """
+        The cumulative import time, in microseconds, of every module imported by nnvg.
+        """
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "nunavut", *args],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        import_times = {}
+        for line in result.stderr.decode("utf-8").splitlines():
+            fields = line.split("|")
+            if line.startswith("import time:") and fields[1].strip().isdigit():
+                import_times[fields[2].strip()] = int(fields[1])
+        return import_times
+
+    heavy_modules = {"pydsdl", "nunavut._generators", "nunavut._namespace", "nunavut.jinja", "nunavut.lang"}
+
+    version_imports = _import_times(["--version"])
+    assert "nunavut.cli.runners" in version_imports
+    assert heavy_modules.isdisjoint(version_imports)
+
+    # Recording the manifest generates a listing but reading it back does not.
+    assert "nunavut.jinja" in _import_times(list_args)
+    manifest_imports = _import_times(list_args)
+    assert "nunavut._manifest" in manifest_imports
+    assert heavy_modules.isdisjoint(manifest_imports)
+
+
+def test_precompiled_templates(gen_paths: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Verifies that precompiled built-in templates generate the same code as compiling the templates, and that
+    templates overridden by a templates directory are still compiled.
+    """
+    precompiled_dir = gen_paths.out_dir / Path("precompiled")
+    assert nunavut.jinja.precompile.precompile_templates(precompiled_dir) > 0
+
+    dsdl_dir = gen_paths.out_dir / Path("pond")
+    dsdl_dir.mkdir()
+    (dsdl_dir / Path("Fin.1.0.dsdl")).write_text("uint8 rays\nfloat32[<=4] spines\n@sealed\n")
+    (dsdl_dir / Path("Koi.1.0.dsdl")).write_text("@union\nuint8 scales\nFin.1.0 fin\n@extent 64 * 8\n")
+    user_templates = gen_paths.out_dir / Path("user_templates")
+    user_templates.mkdir()
+    (user_templates / Path("StructureType.j2")).write_text("// {{ T.full_name }}\n")
+
+    compiled: List[str] = []
+    compile_template = nunavut.jinja.jinja2.Environment.compile
+
+    def _counting_compile(self: Any, source: str, name: Any = None, *args: Any, **kwargs: Any) -> Any:
+        compiled.append(name)
+        return compile_template(self, source, name, *args, **kwargs)
+
+    monkeypatch.setattr(nunavut.jinja.jinja2.Environment, "compile", _counting_compile)
+
+    def _deterministic(text: str) -> str:
+        # Python outputs embed pickled models, which are not the same from one run to the next.
+        text = re.sub(r"_restore_constant_\(\n(?:\s*'.*\n)+\s*\)", "_restore_constant_(...)", text)
+        return "\n".join(line for line in text.splitlines() if "Generated at" not in line)
+
+    def _generate(language: str, out_name: str, **kwargs: Any) -> Dict[str, str]:
+        compiled.clear()
+        result = nunavut.generate_all(
+            language, sorted(dsdl_dir.glob("*.dsdl")), [dsdl_dir], gen_paths.out_dir / Path(out_name), **kwargs
+        )
+        return {
+            Path(p).name: _deterministic(Path(p).read_text())
+            for p in itertools.chain(result.generated_files, result.support_files)
+        }
+
+    for language in ("c", "py"):
+        precompiled_outputs = _generate(language, f"{language}_precompiled", precompiled_templates_dir=precompiled_dir)
+        assert compiled == []
+        assert precompiled_outputs == _generate(language, f"{language}_compiled", precompiled_templates_dir=None)
+        assert len(compiled) > 0
+
+    user_outputs = _generate("c", "c_user", precompiled_templates_dir=precompiled_dir, templates_dir=[user_templates])
+    assert compiled == ["StructureType.j2"]
+    assert user_outputs["Fin_1_0.h"] == "// pond.Fin"
+
+
+def test_profile_report(gen_paths: Any, run_nnvg_main: Callable) -> None:
+    """
+    Verifies that --profile-report writes the time spent in each phase of generation and cache counters as JSON.
+    """
+    dsdl_dir = gen_paths.out_dir / Path("pond")
+    dsdl_dir.mkdir()
+    (dsdl_dir / Path("Fin.1.0.dsdl")).write_text("uint8 rays\n@sealed\n")
+    (dsdl_dir / Path("Koi.1.0.dsdl")).write_text("Fin.1.0 fin\n@sealed\n")
+    cache_dir = gen_paths.out_dir / Path("template_cache")
+    report_path = gen_paths.out_dir / Path("profile.json")
+
+    def _report() -> Dict[str, Any]:
+        nnvg_args = [
+            "-l",
+            "c",
+            "-j",
+            "1",
+            "--outdir",
+            (gen_paths.out_dir / Path("out")).as_posix(),
+            "--template-cache-dir",
+            cache_dir.as_posix(),
+            "--profile-report",
+            report_path.as_posix(),
+            dsdl_dir.as_posix(),
+        ]
+        assert 0 == run_nnvg_main(gen_paths, nnvg_args).returncode
+        return dict(json.loads(report_path.read_text()))
+
+    report = _report()
+    phases = report["phases"]
+    assert report["runs"]["calls"] == 1
+    for phase in ("parse", "namespace", "environment", "template_compile", "render", "line_post_processing", "write"):
+        assert phases[phase]["calls"] > 0, phase
+        assert phases[phase]["wall_seconds"] >= 0
+    # Dependencies are parsed along with the files that use them so only some files appear as parse items.
+    assert len(phases["parse"]["items"]) > 0
+    assert set(phases["parse"]["items"]) <= {
+        (dsdl_dir / Path(f)).resolve().as_posix() for f in ("Fin.1.0.dsdl", "Koi.1.0.dsdl")
+    }
+    assert {"pond.Fin.1.0", "pond.Koi.1.0", "serialization.h"} == set(phases["render"]["items"])
+    assert "StructureType.j2" in phases["render"]["templates"]
+    assert report["counters"]["files_written"] == 3
+    assert report["counters"]["template_cache_misses"] > 0
+
+    # Templates compiled by the first run are loaded from the template cache by the second.
+    report = _report()
+    assert "template_compile" not in report["phases"]
+    assert report["counters"]["template_cache_hits"] > 0
+    assert "template_cache_misses" not in report["counters"]
+
+    # The API records several runs in one profile.
+    profile = nunavut.GenerationProfile()
+    for _ in range(2):
+        nunavut.generate_all("c", [], [dsdl_dir], gen_paths.out_dir / Path("api"), profile=profile)
+    assert profile.as_dict()["runs"]["calls"] == 2
+
+
+def test_profile_template_calls(gen_paths: Any, run_nnvg_main: Callable) -> None:
+    """
+    Verifies that --profile-template-calls ranks the filters and tests templates called by the time spent in them.
+    """
+    dsdl_dir = gen_paths.out_dir / Path("pond")
+    dsdl_dir.mkdir()
+    (dsdl_dir / Path("Fin.1.0.dsdl")).write_text("uint8 rays\n@sealed\n")
+    report_path = gen_paths.out_dir / Path("profile.json")
+    nnvg_args = [
+        "-l",
+        "c",
+        "--outdir",
+        (gen_paths.out_dir / Path("out")).as_posix(),
+        "--profile-template-calls",
+        "--profile-report",
+        report_path.as_posix(),
+        dsdl_dir.as_posix(),
+    ]
+    assert 0 == run_nnvg_main(gen_paths, nnvg_args).returncode
+
+    template_calls = json.loads(report_path.read_text())["template_calls"]
+    filter_names = [f["name"] for f in template_calls["filters"]]
+    assert "includes" in filter_names
+    assert "full_reference_name" in filter_names
+    assert len(template_calls["tests"]) > 0
+    for ranked in template_calls.values():
+        assert all(f["calls"] > 0 for f in ranked)
+        assert [f["seconds"] for f in ranked] == sorted((f["seconds"] for f in ranked), reverse=True)
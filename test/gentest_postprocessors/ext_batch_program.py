@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) OpenCyphal Development Team  <opencyphal.org>
+# Copyright Amazon.com Inc. or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+"""
+    Command-line script to test batched nunavut.postprocessors.ExternalProgramEditInPlace
+
+    usage: ext_batch_program.py --log [log file] [generated file]...
+"""
+import sys
+import pathlib
+
+
+def main() -> int:
+
+    if len(sys.argv) <= 3 or sys.argv[1] != '--log':
+        return -2
+
+    generated_files = sys.argv[3:]
+
+    for generated_file in generated_files:
+        if not pathlib.Path(generated_file).exists():
+            raise ValueError('Generated file {} does not exist?'.format(generated_file))
+        with open(generated_file, 'w') as generated_fp:
+            generated_fp.write('{"ext":"changed"}\n')
+
+    # One line per invocation listing every file it was given.
+    with open(sys.argv[2], 'a') as log_fp:
+        log_fp.write(';'.join(generated_files) + '\n')
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
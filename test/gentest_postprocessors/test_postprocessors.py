@@ -3,9 +3,12 @@
 # Copyright (C) 2018-2019  OpenCyphal Development Team  <opencyphal.org>
 # This software is distributed under the terms of the MIT License.
 #
+import io
+import itertools
 import json
 import os
 import pathlib
+import random
 import re
 import stat
 import subprocess
@@ -26,8 +29,10 @@ def _test_common_namespace(
     target_language: str = "js",
     extension: str = ".json",
     additional_config: typing.Optional[typing.Mapping[str, str]] = None,
+    root_namespace_dir: typing.Optional[pathlib.Path] = None,
 ) -> nunavut.Namespace:
-    root_namespace_dir = gen_paths.dsdl_dir / pathlib.Path("uavcan")
+    if root_namespace_dir is None:
+        root_namespace_dir = gen_paths.dsdl_dir / pathlib.Path("uavcan")
     root_namespace = str(root_namespace_dir)
     lctx = (
         LanguageContextBuilder(include_experimental_languages=True)
@@ -39,9 +44,7 @@ def _test_common_namespace(
         ln_package_name = "nunavut.lang.{}".format(target_language)
         for name, value in additional_config.items():
             lctx.config.set(ln_package_name, name, value)
-    return build_namespace_tree(
-        pydsdl.read_namespace(root_namespace, []), root_namespace_dir, gen_paths.out_dir, lctx
-    )
+    return build_namespace_tree(pydsdl.read_namespace(root_namespace, []), root_namespace_dir, gen_paths.out_dir, lctx)
 
 
 def _assert_no_empty_lines(outfile):  # type: ignore
@@ -340,6 +343,87 @@ def test_limit_empty_lines_by_ln_config_cmd_line_less(gen_paths):  # type: ignor
     _assert_no_empty_lines(_test_common_post_condition(gen_paths, namespace))
 
 
+def _streaming_line_buffer(  # type: ignore
+    output_file: typing.TextIO,
+    template_gen: typing.Iterable[str],
+    line_pps: typing.List[nunavut._postprocessors.LinePostProcessor],
+) -> None:
+    """
+    The line-at-a-time implementation that CodeGenerator's batched line buffer must remain byte-identical to.
+    """
+
+    def _filter_and_write_line(line_and_lineend):  # type: ignore
+        for line_pp in line_pps:
+            line_and_lineend = line_pp(line_and_lineend)
+        output_file.write(line_and_lineend[0])
+        output_file.write(line_and_lineend[1])
+
+    newline_pattern = re.compile(r"\n|\r\n", flags=re.MULTILINE)
+    line_buffer = io.StringIO()
+    for part in template_gen:
+        search_pos = 0
+        match_obj = newline_pattern.search(part, search_pos)
+        while search_pos < len(part):
+            if match_obj is None:
+                line_buffer.write(part[search_pos:])
+                break
+            line_buffer.write(part[search_pos : match_obj.start()])
+            _filter_and_write_line((line_buffer.getvalue(), part[match_obj.start() : match_obj.end()]))
+            line_buffer = io.StringIO()
+            search_pos = match_obj.end()
+            match_obj = newline_pattern.search(part, search_pos)
+    if len(line_buffer.getvalue()) > 0:
+        _filter_and_write_line((line_buffer.getvalue(), ""))
+
+
+def _random_rendered_parts(seed: int, line_count: int) -> typing.List[str]:
+    """
+    Lines with trailing whitespace, runs of empty lines, and mixed line endings split into random parts, including
+    parts that split "\r\n" line endings.
+    """
+    rng = random.Random(seed)
+    content = []
+    for _ in range(line_count):
+        content.append(
+            rng.choice(["", "", "", "    ", "\t", "int a;", "  x = 1;  ", "\u00a0y\u2003", "z\r"])
+            + rng.choice(["\n", "\n", "\n", "\r\n"])
+        )
+    content.append(rng.choice(["", "tail  ", "\r"]))
+    text = "".join(content)
+    parts = []
+    pos = 0
+    while pos < len(text):
+        size = rng.choice([0, 1, 2, 5, 16, 200])
+        parts.append(text[pos : pos + size])
+        pos += size
+    return parts
+
+
+@pytest.mark.parametrize(
+    "make_line_pps",
+    [
+        lambda: [nunavut._postprocessors.TrimTrailingWhitespace()],
+        lambda: [nunavut._postprocessors.LimitEmptyLines(1)],
+        lambda: [nunavut._postprocessors.TrimTrailingWhitespace(), nunavut._postprocessors.LimitEmptyLines(0)],
+        lambda: [nunavut._postprocessors.LimitEmptyLines(2), nunavut._postprocessors.TrimTrailingWhitespace()],
+    ],
+)
+def test_line_buffer_matches_streaming(make_line_pps):  # type: ignore
+    """
+    Verifies that batched line post-processing is byte-identical to processing one line at a time, including the
+    state LimitEmptyLines carries from one generated file to the next.
+    """
+    streaming_pps = make_line_pps()
+    batched_pps = make_line_pps()
+    for seed in range(20):
+        parts = _random_rendered_parts(seed, 300)
+        expected = io.StringIO()
+        _streaming_line_buffer(expected, iter(parts), streaming_pps)
+        actual = io.StringIO()
+        nunavut.jinja.CodeGenerator._generate_with_line_buffer(actual, iter(parts), batched_pps)
+        assert actual.getvalue() == expected.getvalue(), "seed {}".format(seed)
+
+
 def test_pp_trim_trailing_whitespace(gen_paths, run_nnvg):  # type: ignore
     """Verify the --pp-trim-trailing-whitespace argument of nnvg."""
     outfile = (
@@ -496,6 +580,69 @@ def test_external_edit_in_place_fail(gen_paths):  # type: ignore
     generator.generate_all(False, True)
 
 
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_external_edit_in_place_batch(gen_paths, jobs):  # type: ignore
+    """
+    Test that a batched ExternalProgramEditInPlace runs the program once for many files and that post-processors
+    after it still run afterwards.
+    """
+    root_namespace_dir = gen_paths.out_dir / pathlib.Path("dsdl") / pathlib.Path("uavcan")
+    (root_namespace_dir / pathlib.Path("test")).mkdir(parents=True)
+    for type_name in ("A", "B", "C"):
+        (root_namespace_dir / pathlib.Path("test") / pathlib.Path("{}.1.0.dsdl".format(type_name))).write_text(
+            "bool testing\n@sealed\n"
+        )
+    namespace = _test_common_namespace(gen_paths, root_namespace_dir=root_namespace_dir)
+    ext_program = gen_paths.test_dir / pathlib.Path("ext_batch_program.py")
+    log = gen_paths.out_dir / pathlib.Path("ext_batch_program.log")
+    edit_in_place = nunavut._postprocessors.ExternalProgramEditInPlace(
+        [str(ext_program), "--log", str(log)], batch=True, jobs=jobs
+    )
+    generator = nunavut.jinja.DSDLCodeGenerator(
+        namespace,
+        templates_dir=gen_paths.templates_dir,
+        post_processors=[edit_in_place, nunavut._postprocessors.SetFileMode(0o444)],
+    )
+    generated = list(generator.generate_all(False, True))
+    assert len(generated) == 3
+
+    invocations = [line.split(";") for line in log.read_text().splitlines()]
+    assert len(invocations) == jobs
+    assert sorted(itertools.chain(*invocations)) == sorted(str(p) for p in generated)
+    for output in generated:
+        assert json.loads(output.read_text())["ext"] == "changed"
+        assert output.stat().st_mode & 0o777 == 0o444
+
+
+def test_external_edit_in_place_batch_respects_arg_max(gen_paths, monkeypatch):  # type: ignore
+    """
+    Test that batched invocations are split so that none exceeds the operating system's command line length limit.
+    """
+    ext_program = gen_paths.test_dir / pathlib.Path("ext_batch_program.py")
+    log = gen_paths.out_dir / pathlib.Path("ext_batch_program.log")
+    generated = []
+    for i in range(40):
+        generated.append(gen_paths.out_dir / pathlib.Path("generated_{:02}.json".format(i)))
+        generated[-1].write_text("{}")
+    edit_in_place = nunavut._postprocessors.ExternalProgramEditInPlace(
+        [str(ext_program), "--log", str(log)], batch=True, jobs=1
+    )
+    command_line_size = sum(
+        edit_in_place._arg_size(arg) for arg in edit_in_place._run_args([])  # pylint: disable=protected-access
+    )
+    environment_size = sum(
+        edit_in_place._arg_size("{}={}".format(k, v)) for k, v in os.environ.items()  # pylint: disable=protected-access
+    )
+    paths_size = edit_in_place._arg_size(str(generated[0])) * 10  # pylint: disable=protected-access
+    arg_max = command_line_size + environment_size + edit_in_place._ARG_MAX_HEADROOM + paths_size
+    monkeypatch.setattr(nunavut._postprocessors.ExternalProgramEditInPlace, "_arg_max", classmethod(lambda _: arg_max))
+
+    assert edit_in_place.process_files(generated) == generated
+    invocations = [line.split(";") for line in log.read_text().splitlines()]
+    assert [len(invocation) for invocation in invocations] == [10, 10, 10, 10]
+    assert list(itertools.chain(*invocations)) == [str(p) for p in generated]
+
+
 def test_pp_run_program(gen_paths, run_nnvg):  # type: ignore
     outfile = (
         gen_paths.out_dir
@@ -553,3 +700,48 @@ def test_pp_run_program_w_arg(gen_paths, run_nnvg):  # type: ignore
 
     with pytest.raises(subprocess.CalledProcessError):
         run_nnvg(gen_paths, nnvg_args0, raise_called_process_error=True)
+
+
+def test_pp_run_program_batch(gen_paths, run_nnvg):  # type: ignore
+    """
+    Test that --pp-run-program-batch collects files rendered by worker processes into a single invocation.
+    """
+    root_namespace_dir = gen_paths.out_dir / pathlib.Path("dsdl") / pathlib.Path("uavcan")
+    (root_namespace_dir / pathlib.Path("test")).mkdir(parents=True)
+    for type_name in ("A", "B", "C", "D"):
+        (root_namespace_dir / pathlib.Path("test") / pathlib.Path("{}.1.0.dsdl".format(type_name))).write_text(
+            "bool testing\n@sealed\n"
+        )
+    out_dir = gen_paths.out_dir / pathlib.Path("out")
+    log = gen_paths.out_dir / pathlib.Path("ext_batch_program.log")
+
+    nnvg_args0 = [
+        "--templates",
+        str(gen_paths.templates_dir),
+        "-O",
+        str(out_dir),
+        "-e",
+        ".json",
+        "-l",
+        "js",
+        "-Xlang",
+        "--jobs",
+        "2",
+        "--pp-run-program",
+        str(gen_paths.test_dir / pathlib.Path("ext_batch_program.py")),
+        "--pp-run-program-arg=--log",
+        "--pp-run-program-arg={}".format(log),
+        "--pp-run-program-batch",
+        str(root_namespace_dir),
+    ]
+
+    run_nnvg(gen_paths, nnvg_args0)
+
+    outputs = sorted(out_dir.glob("**/*.json"))
+    assert len(outputs) == 4
+    invocations = [line.split(";") for line in log.read_text().splitlines()]
+    assert len(invocations) == 2
+    assert sorted(pathlib.Path(p).resolve() for p in itertools.chain(*invocations)) == [p.resolve() for p in outputs]
+    for output in outputs:
+        assert json.loads(output.read_text())["ext"] == "changed"
+        assert output.stat().st_mode & 0o777 == 0o444
@@ -6,6 +6,8 @@
 """
 Test the generation of serialization support generically and for python.
 """
+import ast
+import importlib
 from pathlib import Path
 
 import pytest
@@ -83,3 +85,66 @@ def test_gen_with_serialization_complex(gen_paths, lang_key):  # type: ignore
     assert 7 == len(result.generator_targets)
     assert 7 == len(result.generated_files)
     assert 1 == len(result.support_files)
+
+
+def test_py_serialized_size_static_fields(gen_paths, monkeypatch):  # type: ignore
+    """
+    A structure whose maximum size is too large to use as its serialized size, but whose fields are each small enough
+    to be counted at their maximum size, must still produce a valid _serialized_size_() in Python.
+    """
+    root_namespace_dir = gen_paths.dsdl_dir / Path("sized")
+    result = generate_all(
+        "py",
+        [root_namespace_dir / Path("Two.1.0.dsdl")],
+        root_namespace_dir,
+        gen_paths.out_dir,
+    )
+
+    generated = gen_paths.out_dir / Path("sized", "Two_1_0.py")
+    assert generated in [Path(p) for p in result.generated_files]
+    ast.parse(generated.read_text(encoding="utf-8"))
+
+    monkeypatch.syspath_prepend(str(gen_paths.out_dir))
+    two_type = importlib.import_module("sized").Two_1_0
+    two = two_type(a=[1, 2, 3], b=[])
+    assert two._serialized_size_() == (7 + 2 * (8 + 100 * 8)) // 8
+    data = b"".join(importlib.import_module("nunavut_support").serialize(two))
+    assert len(data) <= two._serialized_size_()
+
+
+def test_py_serialize_leaves_gathered_arrays_out_of_buffer(gen_paths, monkeypatch):  # type: ignore
+    """
+    The buffer that serialize() allocates must not have room for the large byte-aligned arrays that it references
+    rather than copies, including those of delimited nested objects, while arrays that are not byte-aligned are still
+    copied into it.
+    """
+    root_namespace_dir = gen_paths.dsdl_dir / Path("gathered")
+    generate_all("py", [root_namespace_dir / Path("Frame.1.0.dsdl")], root_namespace_dir, gen_paths.out_dir)
+
+    monkeypatch.syspath_prepend(str(gen_paths.out_dir))
+    gathered = importlib.import_module("gathered")
+    nunavut_support = importlib.import_module("nunavut_support")
+    frame = gathered.Frame_1_0(
+        chunk=gathered.Chunk_1_0(data=bytes(range(256)) * 4),
+        flag=True,
+        tail=bytes(300),
+        samples=list(range(1000)),
+    )
+    full_size = frame._serialized_size_()
+    assert full_size >= 4 + 2 + 1024 + 2 + 300 + 1 + 2 + 2000
+    assert frame._serialized_size_(True) == full_size - 1024 - 2000
+
+    allocated = []
+    new = nunavut_support.Serializer.new
+    monkeypatch.setattr(nunavut_support.Serializer, "new", lambda size: allocated.append(size) or new(size))
+    fragments = list(nunavut_support.serialize(frame))
+    assert allocated == [frame._serialized_size_(True)]
+    assert len(fragments) > 1
+
+    data = b"".join(fragments)
+    assert data == bytes(nunavut_support.serialize_into(frame, bytearray(full_size + 1)))
+    decoded = nunavut_support.deserialize(gathered.Frame_1_0, [memoryview(data)])
+    assert bytes(decoded.chunk.data) == bytes(range(256)) * 4
+    assert decoded.flag
+    assert bytes(decoded.tail) == bytes(300)
+    assert decoded.samples.tolist() == list(range(1000))
@@ -102,6 +102,30 @@ def test_random(compiled: list[GeneratedPackageInfo], caplog: Any) -> None:
         ), f"Serialization performance issues detected in type {ty}"
 
 
+def test_random_batch(compiled: list[GeneratedPackageInfo]) -> None:
+    from nunavut_support import get_class, serialize, serialize_many, deserialize_many
+
+    for info in compiled:
+        for model in expand_service_types(info.models):
+            if model.extent > 8 * _MAX_EXTENT_BYTES:
+                continue
+            dtype = get_class(model)
+            objects = [make_random_object(model) for _ in range(_NUM_RANDOM_SAMPLES)]
+            buffer, offsets = serialize_many(objects)
+            assert len(offsets) == len(objects) + 1
+            for index, obj in enumerate(objects):
+                assert bytes(buffer[offsets[index] : offsets[index + 1]]) == b"".join(serialize(obj))
+
+            for restored in (
+                deserialize_many(dtype, buffer, offsets),
+                deserialize_many(dtype, [bytes(buffer[a:b]) for a, b in zip(offsets[:-1], offsets[1:])]),
+            ):
+                assert len(restored) == len(objects)
+                for obj, d in zip(objects, restored):
+                    assert d is not None
+                    assert are_close(model, obj, d), f"{obj} != {d}"
+
+
 def _test_type(model: pydsdl.CompositeType, num_random_samples: int) -> _TypeTestStatistics:
     from nunavut_support import get_class, get_model, deserialize
 